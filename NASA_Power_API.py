@@ -1,37 +1,22 @@
-import requests
-import csv
+import argparse
 
-# Define the API endpoint and parameters
-url = "https://power.larc.nasa.gov/api/temporal/daily/point"
-params = {
-    "parameters": "ALLSKY_SFC_SW_DWN,T2M",  # solar radiation, temperature
-    "community": "RE",
-    "latitude": 40,
-    "longitude": -105,
-    "start": "20240912",  # YYYYMMDD
-    "end": "20250912",
-    "format": "JSON"
-}
+from nasa_power import BASE_URL, CACHE_PATH, NasaPowerClient
 
-# Make the GET request
-response = requests.get(url, params=params)
+# Site and period used by the training pipeline
+LATITUDE, LONGITUDE = 40, -105
+START, END = "20240912", "20250912"  # YYYYMMDD
 
-if response.status_code == 200:
-    data = response.json()
-    
-    # Extract daily data
-    daily_data = data["properties"]["parameter"]
-    solar = daily_data["ALLSKY_SFC_SW_DWN"]
-    temp = daily_data["T2M"]
-    
-    # Write data to CSV
-    with open("nasa_power_data.csv", mode="w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(["Date", "Solar_Radiation", "Temperature"])
-        
-        for date in solar.keys():
-            writer.writerow([date, solar[date], temp[date]])
-    
-    print("CSV file 'nasa_power_data.csv' has been created successfully.")
+parser = argparse.ArgumentParser(description="Download NASA POWER daily data to nasa_power_data.csv")
+parser.add_argument("--base-url", default=BASE_URL, help="API host (e.g. the nasa_power_stub.py server)")
+parser.add_argument("--cache", default=CACHE_PATH)
+args = parser.parse_args()
+
+client = NasaPowerClient(args.base_url, args.cache)
+try:
+    data = client.fetch([(LATITUDE, LONGITUDE)], START, END)
+except Exception as e:
+    print(f"Error: {e}")
 else:
-    print(f"Error: {response.status_code}")
\ No newline at end of file
+    # Fill values (-999) come back as missing and are written as empty cells
+    data[["Date", "Solar_Radiation", "Temperature"]].to_csv("nasa_power_data.csv", index=False)
+    print(f"CSV file 'nasa_power_data.csv' has been created successfully ({client.requests_made} requests).")
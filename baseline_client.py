@@ -0,0 +1,246 @@
+# Async, pooled client for the backend /baseline-16day endpoint.
+# Fetches baselines for many locations concurrently over one shared
+# connection pool. Each location's response is cached on disk with a TTL
+# (the upstream forecast changes hourly, not per request); once it goes
+# stale it is revalidated with If-None-Match / If-Modified-Since, so an
+# unchanged forecast comes back as a body-less 304.
+#
+# resolution="hourly" asks for the raw hourly arrays as a columnar JSON
+# payload (timestamp_utc, ghi_w_m2, temperature_C) instead of daily means.
+#
+# Uses aiohttp when it is installed; otherwise requests calls run in worker
+# threads over a pooled requests.Session, bounded by the same semaphore.
+#
+#   python baseline_client.py "San Francisco, CA" 40,-105 --out-dir baselines
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from io import StringIO
+
+import pandas as pd
+
+BASELINE_URL = "https://quantam-stack.onrender.com/baseline-16day"
+CACHE_DIR = ".baseline_cache"
+DEFAULT_TTL = 3600  # seconds
+MAX_CONNECTIONS = 8
+HOURLY_PARAMS = {'resolution': 'hourly', 'format': 'json'}
+HOURLY_COLUMNS = ['timestamp_utc', 'ghi_w_m2', 'temperature_C']
+
+
+def location_params(location):
+    """Query parameters for a location name, a (lat, lon) pair or None (server default)."""
+    if location is None:
+        return {}
+    if isinstance(location, str):
+        parts = location.split(",")
+        if len(parts) == 2:
+            try:
+                return {'lat': float(parts[0]), 'lon': float(parts[1])}
+            except ValueError:
+                pass
+        return {'location': location}
+    if isinstance(location, dict):
+        return dict(location)
+    lat, lon = location
+    return {'lat': float(lat), 'lon': float(lon)}
+
+
+class BaselineCache:
+    """One JSON file per (url, location): body plus validators and fetch time."""
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key(url, params):
+        return hashlib.sha1(f"{url}|{json.dumps(params, sort_keys=True)}".encode()).hexdigest()[:20]
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key, entry):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+class BaselineClient:
+    def __init__(self, url=BASELINE_URL, ttl=DEFAULT_TTL, cache_dir=CACHE_DIR,
+                 max_connections=MAX_CONNECTIONS, timeout=30):
+        self.url = url
+        self.ttl = ttl
+        self.cache = BaselineCache(cache_dir)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.stats = {'fresh': 0, 'revalidated': 0, 'downloaded': 0, 'stale_fallback': 0}
+        self._session = None  # requests.Session for the threaded transport
+
+    # ---- transports ----
+    async def _get_aiohttp(self, session, params, headers):
+        async with session.get(self.url, params=params, headers=headers) as response:
+            return response.status, dict(response.headers), await response.text()
+
+    def _get_requests(self, params, headers):
+        response = self._session.get(self.url, params=params, headers=headers, timeout=self.timeout)
+        return response.status_code, dict(response.headers), response.text
+
+    async def _get(self, session, limit, params, headers):
+        async with limit:
+            if session is not None:
+                return await self._get_aiohttp(session, params, headers)
+            return await asyncio.to_thread(self._get_requests, params, headers)
+
+    def _open_requests_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        if self._session is None:
+            adapter = HTTPAdapter(pool_connections=self.max_connections, pool_maxsize=self.max_connections)
+            self._session = requests.Session()
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+
+    # ---- fetching ----
+    async def _fetch_one(self, session, limit, params):
+        key = self.cache.key(self.url, params)
+        entry = self.cache.get(key)
+        now = time.time()
+        if entry is not None and now - entry['fetched_at'] < self.ttl:
+            self.stats['fresh'] += 1
+            return entry['body']
+
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            status, response_headers, body = await self._get(session, limit, params, headers)
+            if status not in (200, 304):
+                raise RuntimeError(f"Backend error {status} for {params or 'default location'}: {body[:200]}")
+        except Exception:
+            if entry is None:
+                raise
+            # Serve the last good baseline rather than failing the whole cycle
+            self.stats['stale_fallback'] += 1
+            return entry['body']
+
+        if status == 304 and entry is not None:
+            self.stats['revalidated'] += 1
+            entry['fetched_at'] = now
+        else:
+            self.stats['downloaded'] += 1
+            entry = {
+                'body': body,
+                'etag': response_headers.get('ETag') or response_headers.get('Etag'),
+                'last_modified': response_headers.get('Last-Modified'),
+                'fetched_at': now,
+            }
+        self.cache.put(key, entry)
+        return entry['body']
+
+    async def fetch_many_async(self, locations, resolution='daily'):
+        """Raw baseline body for every location, fetched concurrently."""
+        extra = HOURLY_PARAMS if resolution == 'hourly' else {}
+        all_params = [{**location_params(location), **extra} for location in locations]
+        # Duplicate locations share a single request
+        unique = {json.dumps(params, sort_keys=True): params for params in all_params}
+        limit = asyncio.Semaphore(self.max_connections)
+        try:
+            import aiohttp
+        except ImportError:
+            aiohttp = None
+
+        if aiohttp is not None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                bodies = await asyncio.gather(*(self._fetch_one(session, limit, p) for p in unique.values()))
+        else:
+            self._open_requests_session()
+            bodies = await asyncio.gather(*(self._fetch_one(None, limit, p) for p in unique.values()))
+
+        by_key = dict(zip(unique, bodies))
+        return [by_key[json.dumps(params, sort_keys=True)] for params in all_params]
+
+    def fetch_many(self, locations, resolution='daily'):
+        """Baseline DataFrame per location.
+
+        daily:  Date, ghi_w_m2, temperature_C (daily means), lat, lon
+        hourly: timestamp_utc, ghi_w_m2, temperature_C, lat, lon
+        lat/lon are the site the backend resolved the location to.
+        """
+        locations = list(locations)
+        bodies = asyncio.run(self.fetch_many_async(locations, resolution))
+        if resolution != 'hourly':
+            frames = [pd.read_csv(StringIO(body)) for body in bodies]
+            for location, frame in zip(locations, frames):
+                # Older backends send no coordinates with the daily CSV; a "lat,lon" location is its own site
+                params = location_params(location)
+                if 'lat' not in frame.columns and 'lat' in params and 'lon' in params:
+                    frame['lat'], frame['lon'] = params['lat'], params['lon']
+            return frames
+        frames = []
+        for body in bodies:
+            payload = json.loads(body)
+            frame = pd.DataFrame({col: payload[col] for col in HOURLY_COLUMNS})
+            frame['timestamp_utc'] = pd.to_datetime(frame['timestamp_utc'])
+            frame[['ghi_w_m2', 'temperature_C']] = frame[['ghi_w_m2', 'temperature_C']].astype(float)
+            if 'lat' in payload and 'lon' in payload:
+                frame['lat'], frame['lon'] = payload['lat'], payload['lon']
+            frames.append(frame)
+        return frames
+
+    def fetch(self, location=None, resolution='daily'):
+        return self.fetch_many([location], resolution)[0]
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch 16-day baselines for many locations")
+    parser.add_argument("locations", nargs="*", help='Location names or "lat,lon" (default: server default)')
+    parser.add_argument("--url", default=os.environ.get("BASELINE_URL", BASELINE_URL))
+    parser.add_argument("--resolution", choices=["daily", "hourly"], default="daily")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL)
+    parser.add_argument("--connections", type=int, default=MAX_CONNECTIONS)
+    parser.add_argument("--out-dir", default=".")
+    args = parser.parse_args(argv)
+
+    locations = args.locations or [None]
+    client = BaselineClient(args.url, args.ttl, max_connections=args.connections)
+    started = time.perf_counter()
+    frames = client.fetch_many(locations, args.resolution)
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for location, frame in zip(locations, frames):
+        name = "default" if location is None else "".join(c if c.isalnum() else "_" for c in location)
+        suffix = "_hourly" if args.resolution == "hourly" else ""
+        path = os.path.join(args.out_dir, f"baseline_16day{suffix}_{name}.csv")
+        frame.to_csv(path, index=False)
+        print(f"✅ {location or 'default location'}: {len(frame)} rows -> {path}")
+    print(f"📊 {len(locations)} locations in {elapsed:.2f}s {client.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,208 @@
+# Batched multi-site, multi-configuration forecasting.
+# Builds the features of every (system, hour) pair as stacked columns and
+# calls model.predict once per chunk instead of once per site; each chunk
+# is assembled straight into the model's input buffer (inference.Predictor).
+#
+#   python batch_forecast.py systems.csv weather.csv --out-prefix batch
+#
+# systems.csv: system_id, lat, lon, tilt_deg, azimuth_deg, num_panels,
+#              panel_area_m2, panel_efficiency[, site_id]
+# weather.csv: timestamp_utc, ghi_w_m2, temperature_C[, site_id]
+#              (without site_id the same weather is shared by every system)
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import BASE_FEATURES, compute_features, daily_nasa_proxies
+from inference import Predictor
+from model_registry import load_active
+from rollups import rollup
+from solar_geometry import DEFAULT_LAT, DEFAULT_LON
+
+DEFAULT_SYSTEM = {
+    "lat": DEFAULT_LAT,
+    "lon": DEFAULT_LON,
+    "tilt_deg": 30,
+    "azimuth_deg": 180,
+    "num_panels": 20,
+    "panel_area_m2": 1.6,
+    "panel_efficiency": 0.2,
+}
+DEFAULT_FEATURES = BASE_FEATURES[:5]
+SYSTEM_COLUMNS = ['lat', 'lon', 'tilt_deg', 'azimuth_deg', 'num_panels', 'panel_area_m2', 'panel_efficiency']
+CHUNK_ROWS = 250_000
+
+
+def _prepare_systems(systems):
+    systems = pd.DataFrame(systems).reset_index(drop=True)
+    if 'system_id' not in systems.columns:
+        systems['system_id'] = [f"sys_{i+1}" for i in range(len(systems))]
+    for col, default in DEFAULT_SYSTEM.items():
+        if col not in systems.columns:
+            systems[col] = default
+        systems[col] = systems[col].fillna(default)
+    return systems
+
+
+def _weather_columns(weather, site_key='site_id'):
+    # Raw weather inputs; without NASA daily columns they are derived from
+    # the hourly rows per site and day, exactly as `predict --hourly` does
+    timestamps = weather['timestamp_utc'].to_numpy(dtype='datetime64[ns]')
+    ghi = weather['ghi_w_m2'].to_numpy(dtype=float)
+    temp = weather['temperature_C'].to_numpy(dtype=float)
+    solar, daily_temp = None, None
+    if 'Solar_Radiation' not in weather or 'Temperature' not in weather:
+        groups = weather[site_key].to_numpy() if site_key in weather else None
+        solar, daily_temp = daily_nasa_proxies(timestamps, ghi, temp, groups)
+    return {
+        'timestamp_utc': timestamps,
+        'ghi_w_m2': ghi,
+        'temperature_C': temp,
+        'Solar_Radiation': weather['Solar_Radiation'].to_numpy(dtype=float) if 'Solar_Radiation' in weather else solar,
+        'Temperature': weather['Temperature'].to_numpy(dtype=float) if 'Temperature' in weather else daily_temp,
+    }
+
+
+def _gather_index(systems, weather, site_key):
+    # Row indices into `weather` for every stacked (system, hour) row,
+    # plus the owning system index of each stacked row.
+    if site_key not in weather.columns:
+        n_hours = len(weather)
+        system_idx = np.repeat(np.arange(len(systems)), n_hours)
+        weather_idx = np.tile(np.arange(n_hours), len(systems))
+        return system_idx, weather_idx
+
+    if site_key not in systems.columns:
+        raise ValueError(f"weather has '{site_key}' but systems does not")
+    site_codes, site_values = pd.factorize(weather[site_key])
+    order = np.argsort(site_codes, kind='stable')
+    counts = np.bincount(site_codes, minlength=len(site_values))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    system_sites = site_values.get_indexer(systems[site_key])
+    if (system_sites < 0).any():
+        missing = systems.loc[system_sites < 0, site_key].unique().tolist()
+        raise ValueError(f"No weather rows for sites: {missing}")
+
+    per_system = counts[system_sites]
+    system_idx = np.repeat(np.arange(len(systems)), per_system)
+    offsets = np.arange(per_system.sum()) - np.repeat(np.cumsum(per_system) - per_system, per_system)
+    weather_idx = order[np.repeat(starts[system_sites], per_system) + offsets]
+    return system_idx, weather_idx
+
+
+def feature_columns(systems, weather, features, site_key='site_id'):
+    """Every feature as one array over the stacked (system, hour) rows, plus the row index."""
+    systems = _prepare_systems(systems)
+    weather = pd.DataFrame(weather)
+    weather['timestamp_utc'] = pd.to_datetime(weather['timestamp_utc'])
+    sort_keys = [site_key, 'timestamp_utc'] if site_key in weather.columns else ['timestamp_utc']
+    weather = weather.sort_values(sort_keys, kind='stable').reset_index(drop=True)
+    system_idx, weather_idx = _gather_index(systems, weather, site_key)
+
+    columns = {name: values[weather_idx] for name, values in _weather_columns(weather, site_key).items()}
+    for col in SYSTEM_COLUMNS:
+        columns[col] = systems[col].to_numpy(dtype=float)[system_idx]
+    columns.update(compute_features(columns, features))
+
+    missing = [col for col in features if col not in columns]
+    if missing:
+        raise ValueError(f"Missing model features: {missing}")
+
+    # Same median fill as the single-site pipeline, column by column
+    for col in features:
+        values = np.asarray(columns[col])
+        if values.dtype.kind == 'f':
+            nan_mask = np.isnan(values)
+            if nan_mask.any():
+                columns[col] = np.where(nan_mask, np.nanmedian(values), values)
+
+    index = pd.DataFrame({
+        'system_id': systems['system_id'].to_numpy()[system_idx],
+        'timestamp_utc': columns['timestamp_utc'],
+    })
+    return columns, index
+
+
+def build_feature_matrix(systems, weather, features, site_key='site_id', dtype=np.float64):
+    """Stack every system's hours into one (rows x features) matrix."""
+    columns, index = feature_columns(systems, weather, features, site_key)
+    X = np.empty((len(index), len(features)), dtype=dtype)
+    for j, col in enumerate(features):
+        X[:, j] = columns[col]
+    return X, index
+
+
+def predict_chunked(model, X, features, chunk_rows=CHUNK_ROWS):
+    return Predictor(model, features, chunk_rows).predict_matrix(X)
+
+
+def aggregate_totals(hourly, tz=None):
+    # Daily/weekly/monthly per system plus fleet_* totals, one bincount each
+    return rollup(hourly['timestamp_utc'], hourly['predicted_ac_kwh'], hourly['system_id'], tz=tz)
+
+
+def forecast_batch(model, features, systems, weather, site_key='site_id', chunk_rows=CHUNK_ROWS, residual=False,
+                   tz=None):
+    """Hourly, daily, weekly and monthly forecasts for every system and the fleet.
+
+    residual=True for models trained on measured - physics (physics_kwh is then
+    one of the features and is added back to the prediction). tz rolls up by
+    local calendar days (timestamps are UTC).
+    """
+    # A Predictor (validated at model load, buffers reused) can be passed as the model
+    predictor = model if isinstance(model, Predictor) else Predictor(model, features, chunk_rows)
+    columns, hourly = feature_columns(systems, weather, predictor.features, site_key)
+    predictions = predictor.predict(columns)
+    if residual:
+        predictions += columns['physics_kwh']
+    hourly['predicted_ac_kwh'] = predictions
+    result = {'hourly': hourly}
+    result.update(aggregate_totals(hourly, tz))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batched multi-system solar forecast")
+    parser.add_argument("systems", help="CSV of system configurations")
+    parser.add_argument("weather", help="CSV of hourly weather (optionally per site_id)")
+    parser.add_argument("--model", help="Model file (default: the current registry version, else trained_model.joblib)")
+    parser.add_argument("--metadata", help="Metadata file (default: as --model, else model_metadata.json)")
+    parser.add_argument("--site-key", default="site_id")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--out-prefix", default="batch_forecast")
+    parser.add_argument("--tz", help="Roll up by local days in this timezone, e.g. America/Los_Angeles")
+    args = parser.parse_args(argv)
+
+    print("📦 Loading trained model...")
+    try:
+        model, model_metadata = load_active(args.model, args.metadata)
+        features = model_metadata['features']
+        # Feature order and feature set are checked once, here
+        model = Predictor(model, features, args.chunk_rows, metadata=model_metadata)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    systems = pd.read_csv(args.systems)
+    weather = pd.read_csv(args.weather)
+    print(f"🔮 Forecasting {len(systems)} systems x {len(weather)} weather rows...")
+
+    started = time.perf_counter()
+    result = forecast_batch(model, features, systems, weather, args.site_key, args.chunk_rows,
+                            residual=model_metadata.get('target') == 'residual', tz=args.tz)
+    elapsed = time.perf_counter() - started
+    rows = len(result['hourly'])
+    print(f"✅ Predicted {rows} system-hours in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    for name, frame in result.items():
+        path = f"{args.out_prefix}_{name}.csv"
+        frame.to_csv(path, index=False)
+        print(f"✅ Saved: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
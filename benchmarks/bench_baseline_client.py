@@ -0,0 +1,91 @@
+# Baseline fan-out against a local mock of /baseline-16day (with latency).
+# Compares one blocking requests.get per location (the old scripts) with
+# the pooled async client: cold, within TTL, and revalidated via ETag.
+#
+#   python -m benchmarks.bench_baseline_client --locations 40 --latency 0.2
+import argparse
+import hashlib
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import requests
+
+from baseline_client import BaselineClient
+
+
+def start_mock(latency):
+    counts = {'200': 0, '304': 0}
+    lock = threading.Lock()
+
+    class MockHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            days = pd.date_range("2025-01-01", periods=16, freq="D")
+            seed = int(hashlib.sha1(json.dumps(query, sort_keys=True).encode()).hexdigest()[:6], 16)
+            body = "Date,ghi_w_m2,temperature_C\n" + "".join(
+                f"{day:%Y-%m-%d},{200 + (seed + i) % 150},{10 + (seed + i) % 15}\n" for i, day in enumerate(days)
+            )
+            etag = f'W/"{hashlib.sha1(body.encode()).hexdigest()[:16]}"'
+            time.sleep(latency)
+            status = 304 if self.headers.get("If-None-Match") == etag else 200
+            with lock:
+                counts[str(status)] += 1
+            payload = b"" if status == 304 else body.encode()
+            self.send_response(status)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/baseline-16day", counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locations", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock server delay per request (s)")
+    parser.add_argument("--connections", type=int, default=8)
+    args = parser.parse_args()
+
+    server, url, counts = start_mock(args.latency)
+    locations = [(30 + i * 0.5, -120 + i * 0.25) for i in range(args.locations)]
+    results = {}
+
+    started = time.perf_counter()
+    for lat, lon in locations:
+        requests.get(url, params={'lat': lat, 'lon': lon}, timeout=30).raise_for_status()
+    results['serial_requests_s'] = round(time.perf_counter() - started, 3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = BaselineClient(url, ttl=3600, cache_dir=tmp, max_connections=args.connections)
+        for label in ('cold', 'within_ttl'):
+            started = time.perf_counter()
+            frames = client.fetch_many(locations)
+            results[f'{label}_s'] = round(time.perf_counter() - started, 3)
+        client.ttl = 0  # everything stale: conditional requests, 304s
+        started = time.perf_counter()
+        frames = client.fetch_many(locations)
+        results['revalidate_s'] = round(time.perf_counter() - started, 3)
+        client.close()
+        results['client_stats'] = client.stats
+        results['rows_per_location'] = len(frames[0])
+    server.shutdown()
+
+    print(json.dumps({'locations': args.locations, 'latency_s': args.latency,
+                      'connections': args.connections, **results, 'server_responses': counts}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
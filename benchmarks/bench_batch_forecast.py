@@ -0,0 +1,67 @@
+# Throughput of the batched forecaster as the fleet grows.
+#
+#   python -m benchmarks.bench_batch_forecast --systems 10 100 1000
+#
+# Rows/s should stay roughly flat: cost scales with stacked rows, not with
+# the number of sites.
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from batch_forecast import forecast_batch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_fleet(n_systems, n_sites, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'system_id': [f"sys_{i+1}" for i in range(n_systems)],
+        'site_id': rng.integers(0, n_sites, n_systems),
+        'tilt_deg': rng.choice([10, 15, 20, 25, 30], n_systems),
+        'azimuth_deg': rng.choice([150, 170, 180, 190, 210], n_systems),
+        'num_panels': rng.integers(8, 40, n_systems),
+        'panel_area_m2': rng.uniform(1.6, 2.2, n_systems),
+        'panel_efficiency': rng.uniform(0.15, 0.22, n_systems),
+    })
+
+
+def make_weather(n_sites, hourly):
+    scale = np.linspace(0.6, 1.2, n_sites)
+    return pd.concat(
+        [hourly.assign(site_id=i, ghi_w_m2=hourly['ghi_w_m2'] * scale[i]) for i in range(n_sites)],
+        ignore_index=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--systems", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--sites", type=int, default=50)
+    args = parser.parse_args()
+
+    model = joblib.load(os.path.join(ROOT, "trained_model.joblib"))
+    with open(os.path.join(ROOT, "model_metadata.json")) as f:
+        features = json.load(f)['features']
+    hourly = pd.read_csv(os.path.join(ROOT, "baseline_16day_hourly_improved.csv"),
+                         usecols=['timestamp_utc', 'ghi_w_m2', 'temperature_C'])
+    weather = make_weather(args.sites, hourly)
+
+    results = []
+    for n_systems in args.systems:
+        systems = make_fleet(n_systems, args.sites)
+        started = time.perf_counter()
+        result = forecast_batch(model, features, systems, weather)
+        elapsed = time.perf_counter() - started
+        rows = len(result['hourly'])
+        results.append({'systems': n_systems, 'rows': rows, 'seconds': elapsed, 'rows_per_s': rows / elapsed})
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# joblib.load vs. the memory-mapped flat forest: load time, RSS per worker,
+# predictions/s and output parity.
+#
+#   python -m benchmarks.bench_forest_export --workers 4 --rows 100000
+import argparse
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from forest_export import FlatForest, export_forest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(ROOT, "trained_model.joblib")
+
+
+def rss_kb():
+    # Resident set size split into file-backed (shareable) and anonymous pages
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS", "RssAnon", "RssFile")):
+                key, value = line.split(":")
+                fields[key] = int(value.split()[0])
+    return fields
+
+
+def make_rows(features, n_rows, seed=42):
+    hourly = pd.read_csv(os.path.join(ROOT, "baseline_16day_hourly_improved.csv"))
+    base = hourly.reindex(columns=features).fillna(0.0).to_numpy(dtype=float)
+    rng = np.random.default_rng(seed)
+    rows = base[rng.integers(0, len(base), n_rows)]
+    return rows * rng.uniform(0.8, 1.2, rows.shape)
+
+
+def worker(engine, layout, X, queue):
+    warnings.filterwarnings("ignore")
+    before = rss_kb()
+    started = time.perf_counter()
+    model = FlatForest(**layout) if engine == "flat" else joblib.load(MODEL_PATH)
+    load_s = time.perf_counter() - started
+    started = time.perf_counter()
+    predictions = model.predict(X)
+    predict_s = time.perf_counter() - started
+    after = rss_kb()
+    queue.put({
+        'engine': engine,
+        'load_s': load_s,
+        'predict_rows_per_s': len(X) / predict_s,
+        'rss_delta_kb': after['VmRSS'] - before['VmRSS'],
+        'anon_delta_kb': after.get('RssAnon', 0) - before.get('RssAnon', 0),
+        'checksum': float(predictions.sum()),
+    })
+
+
+def run(engine, layout, X, workers):
+    queue = mp.Queue()
+    procs = [mp.Process(target=worker, args=(engine, layout, X, queue)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    model = joblib.load(MODEL_PATH)
+    features = list(model.feature_names_in_)
+    X = make_rows(features, args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        layout = export_forest(model, os.path.join(tmp, "forest.npy"))
+        reference = model.predict(pd.DataFrame(X, columns=features))
+        flat = FlatForest(**layout).predict(X)
+
+        summary = {
+            'max_abs_diff': float(np.abs(reference - flat).max()),
+            'joblib_bytes': os.path.getsize(MODEL_PATH),
+            'flat_bytes': os.path.getsize(layout['path']),
+        }
+        mp.set_start_method("spawn", force=True)
+        for engine in ("joblib", "flat"):
+            results = run(engine, layout, X, args.workers)
+            summary[engine] = {
+                key: float(np.mean([r[key] for r in results]))
+                for key in ('load_s', 'predict_rows_per_s', 'rss_delta_kb', 'anon_delta_kb')
+            }
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Zero-downtime model swaps in the prediction server.
+#
+#   python -m benchmarks.bench_hot_swap --swaps 10 --concurrency 8
+#
+# Publishes two versions of the bundled model (the full forest and a
+# half-size one) into a temporary registry, starts an in-process server
+# watching it and keeps it under concurrent /predict load while the CURRENT
+# pointer is flipped back and forth. Reports failed requests (expected 0),
+# the watcher's load+swap time and the time from activate() until requests
+# are answered by the new version.
+import argparse
+import copy
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import joblib
+
+from benchmarks.bench_prediction_server import load_payload, percentile, post
+from model_registry import ModelRegistry
+from prediction_server import PredictionService, make_handler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_registry(root):
+    with open(os.path.join(ROOT, "model_metadata.json"), "r") as f:
+        metadata = json.load(f)
+    metadata.pop('flat_model', None)
+    model = joblib.load(os.path.join(ROOT, "trained_model.joblib"))
+    registry = ModelRegistry(root, keep=5, sync_legacy=False)
+    registry.publish(model, {**metadata, 'model_version': None})
+    if hasattr(model, 'estimators_'):
+        smaller = copy.copy(model)
+        smaller.estimators_ = model.estimators_[:max(1, len(model.estimators_) // 2)]
+        smaller.n_estimators = len(smaller.estimators_)
+        model = smaller
+    registry.publish(model, {**metadata, 'model_version': None})
+    return registry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--swaps", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=0.05, help="Watcher poll interval (s)")
+    parser.add_argument("--dwell", type=float, default=1.0, help="Seconds under load between swaps")
+    args = parser.parse_args(argv)
+
+    body = json.dumps(load_payload()).encode("utf-8")
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = build_registry(os.path.join(tmp, "model_versions"))
+        service = PredictionService(registry=registry)
+        watcher = service.watch(args.interval)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/predict"
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        results = {'ok': 0, 'failed': 0, 'errors': []}
+        seen = []  # (time answered, version)
+
+        def client():
+            while not stop.is_set():
+                try:
+                    version = json.loads(post(url, body))['model_version']
+                    with lock:
+                        results['ok'] += 1
+                        seen.append((time.perf_counter(), version))
+                except Exception as e:
+                    with lock:
+                        results['failed'] += 1
+                        results['errors'].append(str(e))
+
+        clients = [threading.Thread(target=client) for _ in range(args.concurrency)]
+        for thread in clients:
+            thread.start()
+
+        time.sleep(args.dwell)
+        versions = registry.versions()
+        swap_seconds, cutover_seconds = [], []
+        for i in range(args.swaps):
+            target = versions[i % 2]
+            activated = time.perf_counter()
+            registry.activate(target)
+            while watcher.version != target:
+                time.sleep(0.001)
+            swap_seconds.append(watcher.last_swap_seconds)
+            time.sleep(args.dwell)
+            with lock:
+                answered = [t for t, v in seen if v == target and t > activated]
+            if answered:
+                cutover_seconds.append(min(answered) - activated)
+
+        stop.set()
+        for thread in clients:
+            thread.join()
+        server.shutdown()
+        server.server_close()
+        watcher.stop()
+
+    report = {
+        'swaps': args.swaps,
+        'concurrency': args.concurrency,
+        'requests_ok': results['ok'],
+        'requests_failed': results['failed'],
+        'errors': sorted(set(results['errors']))[:5],
+        'load_and_swap_ms': {
+            'p50': round(statistics.median(swap_seconds) * 1000, 2),
+            'max': round(max(swap_seconds) * 1000, 2),
+        },
+        'activate_to_new_version_ms': {
+            'p50': round(statistics.median(cutover_seconds) * 1000, 2) if cutover_seconds else None,
+            'p95': round(percentile(cutover_seconds, 95) * 1000, 2) if cutover_seconds else None,
+        },
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if results['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+# Per-call inference overhead: the old `model.predict(frame[features])`
+# DataFrame path vs. inference.Predictor filling its reused float32 buffer
+# straight from the feature columns.
+#
+#   python -m benchmarks.bench_inference --rows 384 100000 [--repeat 5]
+#
+# For the pickled forest and its flat memory-mapped export, reports rows/s
+# (best of --repeat), the tracemalloc peak of one warmed-up predict call
+# (the Predictor's buffer already exists) and the largest difference
+# between the two paths' predictions.
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from features import INPUT_COLUMNS, compute_features
+from forest_export import FlatForest, export_forest
+from inference import Predictor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(ROOT, "trained_model.joblib")
+
+
+def make_frame(n_rows, features, seed=42):
+    # Forecast-shaped rows: the baseline's mixed bool/int64/float64 columns plus non-feature columns,
+    # with every model feature recomputed from the inputs (the CSV predates some of them)
+    hourly = pd.read_csv(os.path.join(ROOT, "baseline_16day_hourly_improved.csv"))
+    rng = np.random.default_rng(seed)
+    frame = hourly.iloc[rng.integers(0, len(hourly), n_rows)].reset_index(drop=True)
+    frame['ghi_w_m2'] = frame['ghi_w_m2'] * rng.uniform(0.8, 1.2, n_rows)
+    frame['timestamp_utc'] = pd.to_datetime(frame['timestamp_utc'])
+    columns = {col: frame[col].to_numpy() for col in INPUT_COLUMNS if col in frame.columns}
+    for name, values in compute_features(columns, features).items():
+        frame[name] = values
+    return frame
+
+
+def measure(call, repeat):
+    call()  # warm-up: sizes the Predictor's buffer
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        seconds.append(time.perf_counter() - started)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    predictions = call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(seconds), peak, predictions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[384, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+
+    model = joblib.load(MODEL_PATH)
+    features = list(model.feature_names_in_)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engines = {
+            'sklearn': model,
+            'flat': FlatForest(**export_forest(model, os.path.join(tmp, "forest.npy"))),
+        }
+        for rows in args.rows:
+            frame = make_frame(rows, features)
+            for engine, estimator in engines.items():
+                predictor = Predictor(estimator, features)
+                before_s, before_peak, before = measure(lambda: estimator.predict(frame[features]), args.repeat)
+                after_s, after_peak, after = measure(lambda: predictor.predict(frame), args.repeat)
+                results.append({
+                    'engine': engine,
+                    'rows': rows,
+                    'before_rows_per_s': round(rows / before_s),
+                    'after_rows_per_s': round(rows / after_s),
+                    'before_peak_alloc_kb': round(before_peak / 1024, 1),
+                    'after_peak_alloc_kb': round(after_peak / 1024, 1),
+                    'max_abs_diff': float(np.abs(before - after).max()),
+                })
+    print(json.dumps({'input_dtype': np.dtype(Predictor(model, features).dtype).name, 'results': results},
+                     indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,47 @@
+# Per-call overhead of the run-report hooks left in the pipelines.
+#
+#   python -m benchmarks.bench_instrumentation --calls 200000
+#
+# Disabled: report.stage() returns the shared no-op stage. Enabled: a timed
+# stage with RSS readings; --trace-memory adds the tracemalloc bookkeeping.
+import argparse
+import json
+import tempfile
+import time
+
+from instrumentation import RunReport
+
+
+def per_call_ns(report, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        with report.stage("bench") as stage:
+            stage.rows = 1
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        disabled = per_call_ns(RunReport("bench", enabled=False, out_dir=tmp), args.calls)
+        enabled_calls = max(args.calls // 10, 1)
+        enabled = per_call_ns(RunReport("bench", enabled=True, out_dir=tmp), enabled_calls)
+        traced_report = RunReport("bench", enabled=True, trace_memory=True, out_dir=tmp)
+        traced = per_call_ns(traced_report, enabled_calls)
+        import tracemalloc
+
+        tracemalloc.stop()
+    print(json.dumps({
+        'calls': args.calls,
+        'disabled_ns_per_stage': round(disabled),
+        'enabled_ns_per_stage': round(enabled),
+        'trace_memory_ns_per_stage': round(traced),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,52 @@
+# NASA POWER client against the local stub: cold fan-out across many sites,
+# then an overlapping window that should only download the missing days.
+#
+#   python -m benchmarks.bench_nasa_power --sites 50
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from nasa_power import NasaPowerClient
+from nasa_power_stub import start_stub
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sites", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    sites = list(zip(rng.uniform(25, 49, args.sites).round(2), rng.uniform(-124, -67, args.sites).round(2)))
+    server, base_url, state = start_stub(fail_every=args.fail_every)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = NasaPowerClient(base_url, os.path.join(tmp, "cache.sqlite"),
+                                 max_workers=args.workers, backoff=0.01)
+        runs = {}
+        for label, start, end in [('cold', "20240912", "20250312"),
+                                  ('overlap', "20250101", "20250912"),
+                                  ('warm', "20240912", "20250912")]:
+            before = client.requests_made
+            started = time.perf_counter()
+            frame = client.fetch(sites, start, end)
+            runs[label] = {
+                'seconds': round(time.perf_counter() - started, 4),
+                'site_days': len(frame),
+                'requests': client.requests_made - before,
+            }
+        client.cache.close()
+    server.shutdown()
+
+    print(json.dumps({'sites': args.sites, 'workers': args.workers,
+                      'server_requests': state.requests, **runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
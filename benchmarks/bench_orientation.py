@@ -0,0 +1,56 @@
+# Orientation optimizer over a year of hourly weather with the trained model.
+#
+#   python -m benchmarks.bench_orientation --tilt-step 5 --azimuth-step 15 [--screen-hours 0]
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from forest_export import load_model
+from orientation_optimizer import SCREEN_HOURS, optimize_orientation
+
+
+def synthetic_year(seed=42, utc_offset=-8):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range("2024-01-01", periods=8760, freq="h")
+    doy = timestamps.dayofyear.to_numpy()
+    local_hour = (timestamps.hour.to_numpy() + utc_offset) % 24
+    clear_sky = np.clip(950 * np.sin(np.pi * (local_hour - 6) / 12), 0, None)
+    seasonal = 0.75 + 0.25 * np.cos(2 * np.pi * (doy - 172) / 365)
+    clouds = rng.uniform(0.5, 1.0, len(timestamps))
+    return pd.DataFrame({
+        'timestamp_utc': timestamps,
+        'ghi_w_m2': clear_sky * seasonal * clouds,
+        'temperature_C': 15 + 8 * np.cos(2 * np.pi * (doy - 200) / 365) + rng.normal(0, 2, len(timestamps)),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tilt-step", type=float, default=5.0)
+    parser.add_argument("--azimuth-step", type=float, default=15.0)
+    parser.add_argument("--lat", type=float, default=37.7749)
+    parser.add_argument("--lon", type=float, default=-122.4194)
+    parser.add_argument("--metadata", default="model_metadata.json")
+    parser.add_argument("--model", default="trained_model.joblib")
+    parser.add_argument("--screen-hours", type=int, default=SCREEN_HOURS, help="0: score the grid on every hour")
+    args = parser.parse_args()
+
+    with open(args.metadata) as f:
+        model_metadata = json.load(f)
+    model = load_model(args.model, model_metadata)
+    result, grid = optimize_orientation(
+        model, model_metadata['features'], synthetic_year(), {'lat': args.lat, 'lon': args.lon},
+        residual=model_metadata.get('target') == 'residual',
+        tilt_step=args.tilt_step, azimuth_step=args.azimuth_step, screen_hours=args.screen_hours,
+    )
+    print(json.dumps({
+        'engine': type(model).__name__,
+        **{k: v for k, v in result.items() if k != 'site'},
+        'model_rows_per_s': result['model_rows'] / result['seconds'],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Bytes written and write time per forecast run: legacy CSV dump vs. the
+# partitioned output store.
+#
+#   python -m benchmarks.bench_output_store --sites 1 100
+#
+# Legacy: the full hourly frame (every engineered column) plus the daily,
+# weekly and monthly CSVs and prediction_summary.json, as finalcode3.py
+# wrote them. Store: one OutputStore run (inputs and predictions only,
+# float32, zstd Parquet). `sites` stacks that many 16-day forecasts per run.
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from output_store import OutputStore
+from rollups import rollup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_COLUMNS = ['timestamp_utc', 'ghi_w_m2', 'temperature_C', 'predicted_ac_kwh']
+
+
+def make_run(hourly, n_sites, seed=42):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for site in range(n_sites):
+        scale = rng.uniform(0.6, 1.2)
+        frames.append(hourly.assign(ghi_w_m2=hourly['ghi_w_m2'] * scale,
+                                    predicted_ac_kwh=hourly['predicted_ac_kwh'] * scale))
+    hourly = pd.concat(frames, ignore_index=True)
+    tables = rollup(hourly['timestamp_utc'], hourly['predicted_ac_kwh'])
+    return hourly, {
+        'daily': tables['daily'].rename(columns={'period': 'Date'}),
+        'weekly': tables['weekly'].rename(columns={'period': 'timestamp_utc'}),
+        'monthly': tables['monthly'].rename(columns={'period': 'timestamp_utc'}),
+    }
+
+
+def write_legacy(out_dir, hourly, aggregates, summary):
+    paths = [os.path.join(out_dir, "baseline_16day_hourly_improved.csv")]
+    hourly.to_csv(paths[0], index=False)
+    for name, frame in aggregates.items():
+        paths.append(os.path.join(out_dir, f"forecast_{name}.csv"))
+        frame.to_csv(paths[-1], index=False)
+    paths.append(os.path.join(out_dir, "prediction_summary.json"))
+    with open(paths[-1], "w") as f:
+        json.dump(summary, f, indent=2)
+    return sum(os.path.getsize(path) for path in paths)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sites", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    base = pd.read_csv(os.path.join(ROOT, "baseline_16day_hourly_improved.csv"))
+    base['timestamp_utc'] = pd.to_datetime(base['timestamp_utc'])
+    summary = {'total_predicted_kwh': float(base['predicted_ac_kwh'].sum())}
+
+    results = []
+    for n_sites in args.sites:
+        hourly, aggregates = make_run(base, n_sites)
+        legacy_s, store_s = [], []
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(args.repeat):
+                started = time.perf_counter()
+                legacy_bytes = write_legacy(tmp, hourly, aggregates, summary)
+                legacy_s.append(time.perf_counter() - started)
+
+                store = OutputStore(os.path.join(tmp, "store"), keep=args.repeat)
+                started = time.perf_counter()
+                run = store.write_run("bench", {'hourly': hourly[STORE_COLUMNS], **aggregates}, summary,
+                                      run_id=f"run{i}")
+                store_s.append(time.perf_counter() - started)
+            store_format = store.fmt
+        results.append({
+            'sites': n_sites,
+            'hourly_rows': len(hourly),
+            'format': store_format,
+            'legacy_bytes': legacy_bytes,
+            'store_bytes': run['bytes'],
+            'bytes_ratio': round(legacy_bytes / run['bytes'], 1),
+            'legacy_seconds': round(min(legacy_s), 4),
+            'store_seconds': round(min(store_s), 4),
+            'time_ratio': round(min(legacy_s) / min(store_s), 1),
+        })
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
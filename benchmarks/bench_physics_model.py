@@ -0,0 +1,80 @@
+# Parity of physics_model.hourly_energy with calculateHourlyEnergy() in
+# server.js, then throughput over sites x hours.
+#
+#   python -m benchmarks.bench_physics_model --sites 1000 --hours 8760
+#   python -m benchmarks.bench_physics_model --live   (re-run the JS with node)
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import time
+
+import numpy as np
+
+from physics_model import hourly_energy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE = os.path.join(ROOT, "fixtures", "physics", "calculate_hourly_energy.json")
+JS_RUNNER = os.path.join(ROOT, "benchmarks", "calculate_hourly_energy.mjs")
+JS_ARGS = {
+    'numPanels': 'num_panels', 'panelArea': 'panel_area', 'panelEfficiency': 'panel_efficiency',
+    'inverterEfficiency': 'inverter_efficiency', 'tiltDeg': 'tilt_deg', 'tempCoeff': 'temp_coeff',
+    'soilingFactor': 'soiling_factor', 'systemDerate': 'system_derate',
+    'inverterRatedPower': 'inverter_rated_power', 'noct': 'noct',
+}
+
+
+def parity(cases):
+    # All cases evaluated in one vectorized call; None becomes NaN
+    column = lambda key: np.array([np.nan if c[key] is None else c[key] for c in cases], dtype=float)
+    kwargs = {py: column(js) for js, py in JS_ARGS.items()}
+    ours = hourly_energy(column('ghi'), column('tempC'), decimals=4, **kwargs)
+    expected = column('ac_kWh')
+    return float(np.max(np.abs(ours - expected)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sites", type=int, default=1000)
+    parser.add_argument("--hours", type=int, default=8760)
+    parser.add_argument("--live", action="store_true", help="Evaluate the fixture inputs with node first")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with open(FIXTURE) as f:
+        cases = json.load(f)
+    source = "fixture"
+    if args.live:
+        if shutil.which("node") is None:
+            raise SystemExit("node is not installed")
+        output = subprocess.run(["node", JS_RUNNER, os.path.join(ROOT, "server.js")],
+                                input=json.dumps(cases), capture_output=True, text=True, check=True).stdout
+        cases = json.loads(output)
+        source = "node"
+    max_diff = parity(cases)
+
+    rng = np.random.default_rng(args.seed)
+    ghi = rng.uniform(0, 1000, args.hours)
+    temp = rng.uniform(-5, 40, args.hours)
+    num_panels = rng.integers(10, 40, (args.sites, 1))
+    tilt = rng.uniform(5, 45, (args.sites, 1))
+    rated = rng.choice([0.0, 4000.0, 6000.0], (args.sites, 1))
+    started = time.perf_counter()
+    energy = hourly_energy(ghi, temp, num_panels=num_panels, tilt_deg=tilt, inverter_rated_power=rated)
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        'parity_source': source,
+        'parity_cases': len(cases),
+        'parity_max_abs_diff_kwh': max_diff,
+        'site_hours': energy.size,
+        'seconds': round(elapsed, 4),
+        'site_hours_per_s': energy.size / elapsed,
+    }, indent=2))
+    if max_diff > 1e-4:
+        raise SystemExit(f"Parity check failed: max |diff| = {max_diff}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# End-to-end pipeline benchmark at several data scales, fully offline.
+#
+#   python -m benchmarks.bench_pipeline --scales 1 10 100
+#   python -m benchmarks.bench_pipeline --compare benchmarks/results/pipeline_<old>.json \
+#                                                  benchmarks/results/pipeline_<new>.json
+#
+# Scale 1 is the size of the bundled synthetic_solar_hourly.csv (8 systems x
+# 300 hours); scale N generates 8N systems with dummyFile.generate_fleet
+# (seeded, so every commit benchmarks the same data). Stages follow the
+# training script (merge2csv5.py: NASA join, features, smoke model search,
+# fit, evaluate) and the batch forecaster (stacked features, predict,
+# rollups). NASA POWER daily values are fetched from nasa_power_stub over
+# loopback and prediction weather is the fleet's own ghi/temperature, so
+# nothing leaves the machine.
+#
+# Each scale runs in a fresh process so its peak RSS is its own. Results
+# go to benchmarks/results/pipeline_<commit>.json with stable keys; --compare
+# prints per-stage time ratios and exits 1 when a stage of at least
+# --min-seconds got slower than --threshold.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+BASE_SYSTEMS = 8
+BASE_HOURS = 300
+# Inside the recorded NASA POWER fixture (2024-09-12 .. 2025-09-12)
+FLEET_START = "2025-01-01"
+NASA_SITE = (40.0, -105.0)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_scale(scale, search=True, trace_memory=False, workers=None):
+    """Run every stage once at `scale`; returns the scale's result record."""
+    from sklearn.metrics import r2_score
+    from sklearn.model_selection import train_test_split
+
+    from batch_forecast import aggregate_totals, build_feature_matrix, predict_chunked
+    from dummyFile import generate_fleet
+    from features import engineer_features, model_features
+    from instrumentation import RunReport, peak_rss_mb
+    from model_selection import GRIDS, make_estimator, run_search
+    from nasa_power import NasaPowerClient
+    from nasa_power_stub import start_stub
+    from spatial_join import NasaGrid, join_daily
+
+    report = RunReport(f"pipeline_x{scale}", enabled=True, trace_memory=trace_memory)
+    n_systems = BASE_SYSTEMS * scale
+    with tempfile.TemporaryDirectory() as tmp:
+        # ====== Data ======
+        with report.stage("generate") as stage:
+            fleet = generate_fleet(n_systems, BASE_HOURS, os.path.join(tmp, "fleet"), workers=workers,
+                                   start=FLEET_START, fmt="csv")
+            stage.rows = fleet['rows']
+
+        with report.stage("load") as stage:
+            parts = sorted(os.listdir(fleet['out_dir']))
+            telemetry = pd.concat([pd.read_csv(os.path.join(fleet['out_dir'], part)) for part in parts],
+                                  ignore_index=True)
+            telemetry['timestamp_utc'] = pd.to_datetime(telemetry['timestamp_utc'])
+            stage.rows = len(telemetry)
+
+        server, base_url, _ = start_stub()
+        try:
+            with report.stage("fetch_nasa") as stage:
+                first, last = telemetry['timestamp_utc'].min(), telemetry['timestamp_utc'].max()
+                client = NasaPowerClient(base_url, cache_path=os.path.join(tmp, "nasa.sqlite"))
+                nasa_data = client.fetch([NASA_SITE], first.strftime("%Y%m%d"), last.strftime("%Y%m%d"))
+                stage.rows = len(nasa_data)
+        finally:
+            server.shutdown()
+
+        # ====== Training (merge2csv5.py) ======
+        with report.stage("merge") as stage:
+            merged, _ = join_daily(telemetry, NasaGrid(nasa_data))
+            stage.rows = len(merged)
+
+        with report.stage("features", rows=len(merged)):
+            merged = engineer_features(merged)
+
+        features = [col for col in model_features(merged.columns) if col in merged.columns]
+        X = merged[features]
+        y = merged['measured_ac_kwh']
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+        if search:
+            with report.stage("search", rows=len(X_train)):
+                leaderboard = run_search(
+                    X_train.to_numpy(dtype=float), y_train.to_numpy(dtype=float),
+                    merged.loc[X_train.index, 'timestamp_utc'].to_numpy(),
+                    mode="smoke", n_jobs=1, seed=42,
+                )
+            family, params = leaderboard[0]['family'], leaderboard[0]['params']
+        else:
+            family = 'RandomForest'
+            params = {name: values[-1] for name, values in GRIDS['smoke'][family].items()}
+
+        with report.stage("fit", rows=len(X_train)):
+            model = make_estimator(family, params, seed=42)
+            model.fit(X_train, y_train)
+
+        with report.stage("evaluate", rows=len(X_test)):
+            r2 = r2_score(y_test, model.predict(X_test))
+
+        # ====== Batch prediction (batch_forecast.py) ======
+        systems = telemetry.drop_duplicates('system_id')
+        systems = systems.assign(site_id=systems['system_id'])
+        weather = telemetry[['system_id', 'timestamp_utc', 'ghi_w_m2', 'temperature_C']]
+        weather = weather.rename(columns={'system_id': 'site_id'})
+
+        with report.stage("predict_features", rows=len(weather)):
+            X_all, hourly = build_feature_matrix(systems, weather, features)
+
+        with report.stage("predict", rows=len(X_all)):
+            hourly['predicted_ac_kwh'] = predict_chunked(model, X_all, features)
+
+        with report.stage("aggregate", rows=len(hourly)):
+            aggregate_totals(hourly)
+
+    stages = {}
+    for record in report.stages:
+        record = dict(record)
+        name = record.pop('stage')
+        if record.get('rows') and record['seconds'] > 0:
+            record['rows_per_s'] = round(record['rows'] / record['seconds'])
+        stages[name] = record
+    return {
+        'scale': scale,
+        'systems': n_systems,
+        'rows': int(fleet['rows']),
+        'model': family,
+        'model_params': params,
+        'r2': round(float(r2), 4),
+        'total_seconds': round(sum(s['seconds'] for s in stages.values()), 4),
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': stages,
+    }
+
+
+def compare(old_path, new_path, threshold, min_seconds):
+    with open(old_path) as f:
+        old = {r['scale']: r for r in json.load(f)['scales']}
+    with open(new_path) as f:
+        new = {r['scale']: r for r in json.load(f)['scales']}
+    regressions = 0
+    print(f"{'scale':>5}  {'stage':<18}{'old s':>10}{'new s':>10}{'ratio':>8}")
+    for scale in sorted(set(old) & set(new)):
+        for name, stage in new[scale]['stages'].items():
+            before = old[scale]['stages'].get(name)
+            if not before or not before['seconds']:
+                continue
+            ratio = stage['seconds'] / before['seconds']
+            flag = ""
+            if ratio > threshold and stage['seconds'] >= min_seconds:
+                regressions += 1
+                flag = "  ⚠️ slower"
+            print(f"{scale:>4}x  {name:<18}{before['seconds']:>10.3f}{stage['seconds']:>10.3f}{ratio:>7.2f}x{flag}")
+    if regressions:
+        print(f"❌ {regressions} stages slower than {threshold:g}x")
+        return 1
+    print(f"✅ No stage slower than {threshold:g}x")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark at several data scales")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="Multiples of the bundled 8-system x 300-hour dataset")
+    parser.add_argument("--no-search", action="store_true",
+                        help="Skip the smoke model search and fit the largest smoke RandomForest")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Per-stage tracemalloc allocation peaks (slows every stage)")
+    parser.add_argument("--workers", type=int, default=None, help="dummyFile generator processes")
+    parser.add_argument("--out", help="Result path (default: benchmarks/results/pipeline_<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Diff two result files")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="With --compare, fail when a stage is this many times slower")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="With --compare, ignore stages faster than this (timer noise)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare, args.threshold, args.min_seconds)
+
+    commit = git_commit()
+    results = []
+    for scale in args.scales:
+        started = time.perf_counter()
+        # A fresh interpreter per scale keeps peak RSS and caches independent
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(run_scale, scale, not args.no_search, args.trace_memory, args.workers).result()
+        results.append(result)
+        print(f"✅ {scale}x: {result['rows']:,} rows in {time.perf_counter() - started:.1f}s "
+              f"(peak RSS {result['peak_rss_mb']} MB)", file=sys.stderr)
+
+    output = {
+        'suite': 'pipeline',
+        'commit': commit,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'search': not args.no_search,
+        'scales': results,
+    }
+    path = args.out or os.path.join(RESULTS_DIR, f"pipeline_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(output, f, indent=2)
+    print(json.dumps(output, indent=2))
+    print(f"💾 Saved: {path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+# Quantized prediction cache in front of the warm prediction server.
+#
+#   python -m benchmarks.bench_prediction_cache --requests 300 [--capacity 100000]
+#
+# Replays a stream of /predict requests drawn from a few standard systems,
+# sites and hourly forecast revisions (values at sensor resolution, so
+# revisions repeat). The same stream goes through an uncached service and a
+# cached one. Reports per-request latency for both, the hit rate, rows sent
+# to the model, and the largest difference the quantization makes. Then
+# checks that a model swap invalidates the cache and that a new process
+# warms up from the SQLite tier.
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from prediction_cache import PredictionCache
+from prediction_server import PredictionService
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SYSTEMS = [
+    {'tilt_deg': 30, 'azimuth_deg': 180, 'num_panels': 20},
+    {'tilt_deg': 20, 'azimuth_deg': 180, 'num_panels': 24},
+    {'tilt_deg': 25, 'azimuth_deg': 170, 'num_panels': 16},
+    {'tilt_deg': 35, 'azimuth_deg': 190, 'num_panels': 30},
+]
+SITES = [
+    {'lat': 37.77, 'lon': -122.42},
+    {'lat': 40.0, 'lon': -105.0},
+    {'lat': 34.05, 'lon': -118.24},
+]
+
+
+def make_stream(n_requests, revisions=3, seed=42):
+    hourly = pd.read_csv(os.path.join(ROOT, "baseline_16day_hourly_improved.csv"),
+                         usecols=['timestamp_utc', 'ghi_w_m2', 'temperature_C'])
+    rng = np.random.default_rng(seed)
+    forecasts = {}
+    for s in range(len(SITES)):
+        for r in range(revisions):
+            # Sensor resolution: whole W/m², tenths of a degree
+            forecasts[s, r] = {
+                'timestamp_utc': hourly['timestamp_utc'].tolist(),
+                'ghi_w_m2': np.round(hourly['ghi_w_m2'] * rng.uniform(0.8, 1.2, len(hourly))).tolist(),
+                'temperature_C': np.round(hourly['temperature_C'] + rng.normal(0, 1, len(hourly)), 1).tolist(),
+            }
+    stream = []
+    for _ in range(n_requests):
+        s, r = rng.integers(len(SITES)), rng.integers(revisions)
+        stream.append((SITES[s], SYSTEMS[rng.integers(len(SYSTEMS))], forecasts[s, r]))
+    return stream
+
+
+def replay(service, stream):
+    latencies, outputs = [], []
+    for site, system, weather in stream:
+        started = time.perf_counter()
+        outputs.append(service.predict(site, system, weather)['predicted_ac_kwh'])
+        latencies.append(1000 * (time.perf_counter() - started))
+    return latencies, outputs
+
+
+def summary(latencies):
+    return {'p50_ms': round(statistics.median(latencies), 3), 'mean_ms': round(statistics.mean(latencies), 3)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--capacity", type=int, default=100_000)
+    parser.add_argument("--model", default=os.path.join(ROOT, "trained_model.joblib"))
+    parser.add_argument("--metadata", default=os.path.join(ROOT, "model_metadata.json"))
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+
+    stream = make_stream(args.requests)
+    plain = PredictionService(args.model, args.metadata)
+    plain_latencies, plain_outputs = replay(plain, stream)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PredictionCache(args.capacity, disk_dir=tmp)
+        cached = PredictionService(args.model, args.metadata, cache=cache)
+        cached_latencies, cached_outputs = replay(cached, stream)
+        stats = cache.stats()
+        diff = max(float(np.abs(np.subtract(a, b)).max()) for a, b in zip(plain_outputs, cached_outputs))
+        cache.close()
+
+        # A restarted server with the same model and directory starts from the SQLite tier
+        warm = PredictionCache(args.capacity, disk_dir=tmp)
+        restarted = PredictionService(args.model, args.metadata, cache=warm)
+        warm_latencies, _ = replay(restarted, stream[:20])
+        warm_stats = warm.stats()
+
+        # A new model version must not be answered from the old one's entries
+        metadata = dict(restarted.metadata, model_version=(restarted.metadata.get('model_version') or 0) + 1)
+        restarted.swap(restarted.model, metadata)
+        replay(restarted, stream[:1])
+        after = warm.stats()
+        swap = {
+            'invalidations': after['invalidations'],
+            'first_request_hits': after['hits'] - warm_stats['hits'],
+            'first_request_model_rows': after['model_rows'] - warm_stats['model_rows'],
+        }
+        warm.close()
+
+    print(json.dumps({
+        'requests': len(stream),
+        'hours_per_request': len(stream[0][2]['timestamp_utc']),
+        'uncached': summary(plain_latencies),
+        'cached': summary(cached_latencies),
+        'speedup_p50': round(statistics.median(plain_latencies) / statistics.median(cached_latencies), 2),
+        'cache': stats,
+        'max_abs_diff_kwh': round(diff, 6),
+        'swap': swap,
+        'restart_from_disk': {'requests': 20, **summary(warm_latencies), 'hit_rate': warm_stats['hit_rate'],
+                              'disk_hits': warm_stats['disk_hits']},
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
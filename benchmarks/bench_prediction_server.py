@@ -0,0 +1,130 @@
+# Latency/throughput of the warm prediction server vs. a cold one-shot run.
+#
+#   python -m benchmarks.bench_prediction_server --requests 200 --concurrency 8
+#
+# The cold path runs `prediction_server.py --predict-file` in a fresh
+# interpreter, which pays the same import + joblib.load + metadata parse that
+# finalcode3.py pays on every invocation (minus the network fetch).
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_payload():
+    # 16 days of hourly weather from the bundled forecast output (offline)
+    hourly = pd.read_csv(os.path.join(ROOT, "baseline_16day_hourly_improved.csv"))
+    return {
+        'site': {'lat': 37.77, 'lon': -122.42},
+        'system': {'tilt_deg': 30, 'azimuth_deg': 180, 'num_panels': 20},
+        'weather': {
+            'timestamp_utc': hourly['timestamp_utc'].tolist(),
+            'ghi_w_m2': hourly['ghi_w_m2'].tolist(),
+            'temperature_C': hourly['temperature_C'].tolist(),
+        },
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return response.read()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_cold(payload_path, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "prediction_server.py", "--predict-file", payload_path],
+                       cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def bench_warm(body, n_requests, concurrency):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "prediction_server.py", "--port", str(port)],
+                              cwd=ROOT, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(300):
+            try:
+                urllib.request.urlopen(url + "/health").read()
+                break
+            except OSError:
+                time.sleep(0.05)
+
+        latencies = []
+        for _ in range(n_requests):
+            started = time.perf_counter()
+            post(url + "/predict", body)
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda _: post(url + "/predict", body), range(n_requests)))
+        throughput = n_requests / (time.perf_counter() - started)
+    finally:
+        server.terminate()
+        server.wait()
+    return latencies, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--cold-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = load_payload()
+    body = json.dumps(payload).encode("utf-8")
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(payload, f)
+        payload_path = f.name
+
+    try:
+        cold = bench_cold(payload_path, args.cold_runs)
+    finally:
+        os.remove(payload_path)
+    warm, throughput = bench_warm(body, args.requests, args.concurrency)
+
+    results = {
+        'hours_per_request': len(payload['weather']['timestamp_utc']),
+        'cold_script_s': {'mean': statistics.mean(cold), 'min': min(cold)},
+        'warm_server_ms': {
+            'p50': percentile(warm, 50) * 1000,
+            'p95': percentile(warm, 95) * 1000,
+            'mean': statistics.mean(warm) * 1000,
+        },
+        'warm_throughput_rps': throughput,
+        'concurrency': args.concurrency,
+        'speedup_p50': min(cold) / percentile(warm, 50),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
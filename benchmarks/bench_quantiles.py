@@ -0,0 +1,87 @@
+# Cost of P10/P50/P90 bands relative to the point forecast.
+#
+#   python -m benchmarks.bench_quantiles --rows 100000
+#
+# For the joblib forest and its flat export, times:
+#   point     - model.predict
+#   quantiles - tree_predictions (one pass into a trees x rows array) plus
+#               hourly bands and daily per-tree-sum bands
+#   loop      - the naive way: one DataFrame predict per estimator
+# and checks that the tree mean reproduces predict().
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from batch_forecast import build_feature_matrix
+from forest_export import FlatForest, export_forest
+from quantile_forecast import aggregate_bands, quantile_bands, tree_predictions
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with open(os.path.join(ROOT, "model_metadata.json")) as f:
+        features = json.load(f)['features']
+    model = joblib.load(os.path.join(ROOT, "trained_model.joblib"))
+    hourly = pd.read_csv(os.path.join(ROOT, "baseline_16day_hourly_improved.csv"),
+                         usecols=['timestamp_utc', 'ghi_w_m2', 'temperature_C'])
+    reps = -(-args.rows // len(hourly))
+    weather = pd.concat([hourly] * reps, ignore_index=True).iloc[:args.rows]
+    # Distinct consecutive hours so the daily grouping has realistic periods
+    weather['timestamp_utc'] = pd.date_range("2025-01-01", periods=len(weather), freq="h")
+    X, index = build_feature_matrix([{}], weather, features)
+    frame = pd.DataFrame(X, columns=features)
+    days = index['timestamp_utc'].dt.normalize()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        flat = FlatForest(**export_forest(model, os.path.join(tmp, "forest.npy")))
+        for name, engine in (('sklearn', model), ('flat', flat)):
+            point_s, point = timed(lambda: engine.predict(frame if name == 'sklearn' else X), args.repeat)
+
+            def bands():
+                trees = tree_predictions(engine, frame if name == 'sklearn' else X)
+                return trees, quantile_bands(trees), aggregate_bands(trees, days)
+
+            quantile_s, (trees, hourly_bands, daily_bands) = timed(bands, args.repeat)
+            results.append({
+                'engine': name,
+                'rows': len(X),
+                'trees': int(trees.shape[0]),
+                'point_seconds': round(point_s, 4),
+                'quantile_seconds': round(quantile_s, 4),
+                'overhead_x': round(quantile_s / point_s, 2),
+                'mean_vs_predict_max_abs_diff': float(np.abs(trees.mean(axis=0) - point).max()),
+                'p10_le_p50_le_p90': bool(np.all(hourly_bands['p10'] <= hourly_bands['p50'])
+                                          and np.all(hourly_bands['p50'] <= hourly_bands['p90'])),
+                'days': len(daily_bands),
+            })
+
+        loop_s, _ = timed(lambda: np.stack([est.predict(frame.to_numpy()) for est in model.estimators_]), 1)
+        results.append({'engine': 'sklearn_estimator_loop', 'rows': len(X), 'seconds': round(loop_s, 4)})
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+# Calendar rollups: rollups.rollup vs. the pandas groupby/period version.
+#
+#   python -m benchmarks.bench_rollups --systems 1000 --hours 10000
+#
+# 1000 systems x 10000 hours = 10M rows. The pandas baseline is the previous
+# batch_forecast.aggregate_totals: one groupby per period on
+# (system_id, to_period(...).end_time). Both produce the per-system daily,
+# weekly and monthly tables; the rollup also returns the fleet totals.
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from rollups import rollup
+
+
+def pandas_rollup(hourly):
+    timestamps = hourly['timestamp_utc']
+    keys = {
+        'daily': timestamps.dt.normalize(),
+        'weekly': timestamps.dt.to_period('W-SUN').dt.end_time.dt.normalize(),
+        'monthly': timestamps.dt.to_period('M').dt.end_time.dt.normalize(),
+    }
+    return {
+        name: hourly.groupby([hourly['system_id'], period.rename('period')], sort=True)['predicted_ac_kwh']
+        .sum()
+        .reset_index()
+        for name, period in keys.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--systems", type=int, default=1000)
+    parser.add_argument("--hours", type=int, default=10_000)
+    parser.add_argument("--tz", default="America/Los_Angeles", help="Zone for the local-day run")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(42)
+    n = args.systems * args.hours
+    hourly = pd.DataFrame({
+        'system_id': np.repeat(np.arange(args.systems), args.hours),
+        'timestamp_utc': np.tile(pd.date_range("2024-01-01", periods=args.hours, freq="h").to_numpy(), args.systems),
+        'predicted_ac_kwh': rng.random(n),
+    })
+
+    started = time.perf_counter()
+    expected = pandas_rollup(hourly)
+    pandas_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    tables = rollup(hourly['timestamp_utc'], hourly['predicted_ac_kwh'], hourly['system_id'])
+    rollup_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rollup(hourly['timestamp_utc'], hourly['predicted_ac_kwh'], hourly['system_id'], tz=args.tz)
+    tz_s = time.perf_counter() - started
+
+    max_diff = max(
+        float(np.abs(expected[name]['predicted_ac_kwh'].to_numpy()
+                     - tables[name][f'{name}_predicted_ac_kwh'].to_numpy()).max())
+        for name in expected
+    )
+    same_labels = all(
+        (expected[name]['period'].to_numpy().astype('datetime64[D]')
+         == tables[name]['period'].to_numpy().astype('datetime64[D]')).all()
+        for name in expected
+    )
+    print(json.dumps({
+        'rows': n,
+        'systems': args.systems,
+        'pandas_seconds': round(pandas_s, 3),
+        'rollup_seconds': round(rollup_s, 3),
+        'rollup_tz_seconds': round(tz_s, 3),
+        'speedup_x': round(pandas_s / rollup_s, 1),
+        'max_abs_diff': max_diff,
+        'same_labels': bool(same_labels),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
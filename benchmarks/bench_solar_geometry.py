@@ -0,0 +1,55 @@
+# Solar position + POA throughput for years of hourly data across many sites.
+#
+#   python -m benchmarks.bench_solar_geometry --sites 1000 --years 1
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from solar_geometry import poa_irradiance, solar_position, time_arrays
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sites", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    timestamps = pd.date_range("2024-01-01", periods=8760 * args.years, freq="h")
+    lat = rng.uniform(-55, 55, (args.sites, 1))
+    lon = rng.uniform(-180, 180, (args.sites, 1))
+    tilt = rng.choice([10, 15, 20, 25, 30], (args.sites, 1))
+    azimuth = rng.choice([150, 170, 180, 190, 210], (args.sites, 1))
+    ghi = rng.uniform(0, 1000, len(timestamps))
+
+    timings = {}
+    started = time.perf_counter()
+    day_of_year, hour = time_arrays(timestamps)
+    timings['time_arrays_s'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    position = solar_position(day_of_year, hour, lat, lon)
+    timings['solar_position_s'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    poa = poa_irradiance(ghi, position['zenith'], position['azimuth'], tilt, azimuth, day_of_year)
+    timings['poa_s'] = time.perf_counter() - started
+
+    total = sum(timings.values())
+    cells = poa['poa_w_m2'].size
+    print(json.dumps({
+        'sites': args.sites,
+        'hours': len(timestamps),
+        'site_hours': cells,
+        **timings,
+        'total_s': total,
+        'site_hours_per_s': cells / total,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# Joining fleet telemetry to gridded NASA POWER daily values.
+#
+#   python -m benchmarks.bench_spatial_join --systems 1000 10000 50000 [--hours 24]
+#
+# NASA values are generated on every 0.5° x 0.625° cell over the fleet's
+# area (continental US). For each fleet size, times:
+#   rounded_merge - MergerCSV.py's old approach: pd.merge on (date, lat and
+#                   lon rounded to 2 decimals); systems are not on cell
+#                   centers, so it matches ~0 rows
+#   spatial_join  - NasaGrid build + join_daily (one KD-tree lookup per
+#                   system, then a (site, day) gather)
+# and checks the chosen site against a brute-force haversine nearest for a
+# sample of systems.
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from spatial_join import CELL_LAT, CELL_LON, EARTH_KM, NasaGrid, join_daily
+
+LAT_RANGE = (25.0, 49.0)
+LON_RANGE = (-124.375, -67.5)
+START = "2025-06-01"
+
+
+def make_nasa(days=30):
+    lats = np.arange(LAT_RANGE[0], LAT_RANGE[1] + CELL_LAT / 2, CELL_LAT)
+    lons = np.arange(round(LON_RANGE[0] / CELL_LON), round(LON_RANGE[1] / CELL_LON) + 1) * CELL_LON
+    cell_lat, cell_lon = (grid.ravel() for grid in np.meshgrid(lats, lons, indexing='ij'))
+    dates = pd.date_range(START, periods=days, freq="D")
+    n_cells = len(cell_lat)
+    return pd.DataFrame({
+        'lat': np.repeat(cell_lat, days),
+        'lon': np.repeat(cell_lon, days),
+        'Date': np.tile(dates.strftime("%Y%m%d"), n_cells),
+        # Encodes the cell so the brute-force check can read it back
+        'Solar_Radiation': np.repeat(np.arange(n_cells, dtype=float), days),
+        'Temperature': np.random.default_rng(1).uniform(5, 35, n_cells * days),
+    })
+
+
+def make_telemetry(n_systems, hours, seed=42):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(*LAT_RANGE, n_systems).round(4)
+    lon = rng.uniform(*LON_RANGE, n_systems).round(4)
+    return pd.DataFrame({
+        'system_id': np.repeat([f"sys_{i}" for i in range(n_systems)], hours),
+        'lat': np.repeat(lat, hours),
+        'lon': np.repeat(lon, hours),
+        'timestamp_utc': np.tile(pd.date_range(START, periods=hours, freq="h").to_numpy(), n_systems),
+        'ghi_w_m2': rng.uniform(0, 1000, n_systems * hours),
+    })
+
+
+def rounded_merge(telemetry, nasa):
+    nasa = nasa.assign(Date=pd.to_datetime(nasa['Date'], format="%Y%m%d"), lat=nasa['lat'].round(2),
+                       lon=nasa['lon'].round(2))
+    telemetry = telemetry.assign(Date=telemetry['timestamp_utc'].dt.normalize(), lat=telemetry['lat'].round(2),
+                                 lon=telemetry['lon'].round(2))
+    return pd.merge(telemetry, nasa, on=['Date', 'lat', 'lon'], how='inner')
+
+
+def haversine_nearest(lat, lon, cell_lat, cell_lon):
+    lat1, lon1 = np.radians(lat)[:, None], np.radians(lon)[:, None]
+    lat2, lon2 = np.radians(cell_lat)[None, :], np.radians(cell_lon)[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return (2 * EARTH_KM * np.arcsin(np.sqrt(a))).argmin(axis=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--systems", type=int, nargs="+", default=[1000, 10_000, 50_000])
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--check", type=int, default=500, help="Systems checked against brute force")
+    args = parser.parse_args(argv)
+
+    nasa = make_nasa()
+    cells = nasa.drop_duplicates(['lat', 'lon'])
+    results = []
+    for n_systems in args.systems:
+        telemetry = make_telemetry(n_systems, args.hours)
+
+        started = time.perf_counter()
+        old = rounded_merge(telemetry, nasa)
+        merge_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        grid = NasaGrid(nasa)
+        build_s = time.perf_counter() - started
+        started = time.perf_counter()
+        merged, stats = join_daily(telemetry, grid)
+        join_s = time.perf_counter() - started
+
+        first = merged.drop_duplicates('system_id').head(args.check)
+        expected = haversine_nearest(first['lat'].to_numpy(), first['lon'].to_numpy(),
+                                     cells['lat'].to_numpy(), cells['lon'].to_numpy())
+        results.append({
+            'systems': n_systems,
+            'rows': len(telemetry),
+            'rounded_merge': {'seconds': round(merge_s, 4), 'rows': len(old)},
+            'spatial_join': {'grid_build_seconds': round(build_s, 4), 'join_seconds': round(join_s, 4),
+                             'rows': len(merged), 'max_km': stats['max_km'], 'sites_used': stats['sites_used']},
+            'nearest_matches_brute_force': bool((first['Solar_Radiation'].to_numpy() == expected).all()),
+        })
+    print(json.dumps({'nasa_cells': len(cells), 'nasa_rows': len(nasa), 'results': results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+# Cold-start time of the pipeline CLI paths that should not load the
+# scientific stack.
+#
+#   python -m benchmarks.bench_startup [--repeat 5] [--budget 1.0]
+#
+# Each command runs in a fresh interpreter (best of --repeat). One extra run
+# under `python -X importtime` lists which heavy modules the command
+# imported. The cached prediction answers from a throwaway output store.
+# Exits 1 when a command takes longer than --budget seconds or imports
+# anything in HEAVY, so it can gate CI like a test.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ['pandas', 'numpy', 'sklearn', 'scipy', 'requests', 'joblib', 'pyarrow']
+
+
+def run(args, env, importtime=False):
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + args
+    started = time.perf_counter()
+    result = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited {result.returncode}: {result.stderr[-500:]}")
+    return elapsed, result.stderr
+
+
+def heavy_imports(stderr):
+    found = set()
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip().split(".")[0]
+            if name in HEAVY:
+                found.add(name)
+    return sorted(found)
+
+
+def seed_store(store_root):
+    import pandas as pd
+
+    from output_store import OutputStore
+    from solar_pipeline.prediction import current_metadata, run_options
+
+    metadata = current_metadata()
+    days = pd.date_range("2025-01-01", periods=16, freq="D")
+    daily = pd.DataFrame({'Date': days, 'daily_predicted_ac_kwh': 7.5})
+    summary = {
+        'prediction_date': "2025-01-01T00:00:00",
+        'forecast_period_days': 16,
+        'total_predicted_kwh': 120.0,
+        'daily_average_kwh': 7.5,
+        'max_daily_kwh': 7.5,
+        'min_daily_kwh': 7.5,
+        'model_used': "RandomForest",
+        'model_performance': {'r2': 0.98},
+        # Made by the current model with default options, so `predict --max-age` reuses it
+        'model': {'version': metadata.get('model_version'), 'training_date': metadata.get('training_date')},
+        'options': run_options(),
+    }
+    OutputStore(store_root).write_run(None, {'daily': daily}, summary)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="Max seconds per command")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_store(tmp)
+        commands = {
+            'interpreter': ["-c", "pass"],
+            'import_package': ["-c", "import solar_pipeline, merge2csv5, finalcode3"],
+            'help': ["-m", "solar_pipeline", "--help"],
+            'train_help': ["merge2csv5.py", "--help"],
+            'predict_help': ["finalcode3.py", "--help"],
+            'cached_predict': ["-m", "solar_pipeline", "predict", "--max-age", "3600", "--store", tmp],
+        }
+        results = []
+        for name, cmd in commands.items():
+            run(cmd, env)  # warm the OS file cache
+            seconds = min(run(cmd, env)[0] for _ in range(args.repeat))
+            results.append({
+                'command': name,
+                'seconds': round(seconds, 4),
+                'heavy_imports': heavy_imports(run(cmd, env, importtime=True)[1]),
+            })
+
+    failures = [r for r in results
+                if r['command'] != 'interpreter' and (r['seconds'] > args.budget or r['heavy_imports'])]
+    print(json.dumps({'budget_seconds': args.budget, 'results': results}, indent=2))
+    for r in failures:
+        print(f"❌ {r['command']}: {r['seconds']:.3f}s, heavy imports {r['heavy_imports']}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
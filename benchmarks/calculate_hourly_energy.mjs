@@ -0,0 +1,22 @@
+// Evaluates calculateHourlyEnergy() from server.js on JSON cases read from
+// stdin, without starting the server. Used by bench_physics_model.py --live
+// and to regenerate fixtures/physics/calculate_hourly_energy.json.
+//
+//   node benchmarks/calculate_hourly_energy.mjs server.js < cases.json
+import fs from "fs";
+
+const src = fs.readFileSync(process.argv[2] || "server.js", "utf8");
+const grab = (name) => {
+  const start = src.indexOf(`function ${name}(`);
+  let depth = 0;
+  for (let k = src.indexOf(") {", start) + 2; k < src.length; k++) {
+    if (src[k] === "{") depth++;
+    else if (src[k] === "}" && --depth === 0) return src.slice(start, k + 1);
+  }
+  throw new Error(`${name} not found`);
+};
+const calculateHourlyEnergy = new Function(
+  `${grab("deg2rad")}\n${grab("calculateHourlyEnergy")}\nreturn calculateHourlyEnergy;`
+)();
+const cases = JSON.parse(fs.readFileSync(0, "utf8"));
+console.log(JSON.stringify(cases.map(c => ({ ...c, ac_kWh: calculateHourlyEnergy(c) }))));
@@ -0,0 +1,133 @@
+# Post-training compaction of a RandomForest.
+# Features whose importance in the trained forest is below min_importance
+# are dropped, so serving no longer computes them (engineer_features only
+# builds what metadata['features'] lists). Smaller forests on the kept
+# features are then retrained, cheapest first (trees x 2^depth), from a
+# ladder of 1/4, 1/2 and all of the trees at depth -4, -2 and the full
+# depth.
+#
+# Candidates are chosen on a validation slice carved from the training
+# split, never on the test set: the full model's settings are refit on the
+# rest of the training rows as the reference, and the first candidate
+# whose validation R² is within `budget` of it is kept; if none is, the
+# full-size forest on the kept features is the last candidate, then the
+# original model. The kept forest is refit on the whole training split and
+# only it is scored on the test set. Every evaluated candidate's
+# validation R², MAE, rows/s (inference.Predictor, float32) and node count
+# goes into metadata['compaction'].
+#
+#   result = compact_forest(model, X_train, y_train, X_test, y_test, features, budget=0.005)
+#   model, features = result['model'], result['features']
+import pickle
+import time
+
+import numpy as np
+
+from inference import Predictor
+
+BUDGET_R2 = 0.005
+MIN_IMPORTANCE = 0.001
+VALIDATION = 0.2
+
+
+def forest_nodes(model):
+    return int(sum(tree.tree_.node_count for tree in model.estimators_))
+
+
+def _depth(model):
+    depth = model.get_params()['max_depth']
+    return depth if depth is not None else max(tree.tree_.max_depth for tree in model.estimators_)
+
+
+def candidate_params(model):
+    """Smaller (n_estimators, max_depth) settings, cheapest first, ending with the model's own."""
+    trees, depth = model.get_params()['n_estimators'], _depth(model)
+    ladder = {(max(1, trees // 4), max(2, depth - 4)), (max(1, trees // 4), max(2, depth - 2)),
+              (max(1, trees // 2), max(2, depth - 4)), (max(1, trees // 2), max(2, depth - 2)),
+              (max(1, trees // 2), depth), (trees, max(2, depth - 2)), (trees, depth)}
+    return sorted(ladder, key=lambda p: (p[0] * 2 ** p[1], p))
+
+
+def score(model, features, X_eval, y_eval, offset=None, repeat=3):
+    """R², MAE and float32 predict rows/s of `model` on X_eval[features]."""
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    predictor = Predictor(model, features)
+    X = np.ascontiguousarray(X_eval[features].to_numpy(dtype=predictor.dtype))
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        predictions = predictor.predict_matrix(X)
+        seconds.append(time.perf_counter() - started)
+    if offset is not None:
+        predictions = predictions + offset
+    return {
+        'r2': float(r2_score(y_eval, predictions)),
+        'mae': float(mean_absolute_error(y_eval, predictions)),
+        'rows_per_s': round(len(X) / max(min(seconds), 1e-9)),
+        'nodes': forest_nodes(model),
+        'bytes': len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+    }
+
+
+def compact_forest(model, X_train, y_train, X_test, y_test, features, budget=BUDGET_R2,
+                   min_importance=MIN_IMPORTANCE, keep=(), offset_column=None, validation=VALIDATION, seed=42):
+    """Prune features and shrink a fitted RandomForest within an R² budget.
+
+    X_train/X_test are DataFrames with every column in `features`. y_train
+    is on the model's scale and y_test on the served scale; offset_column
+    (e.g. physics_kwh for a residual model) is added to predictions to give
+    the served value. Features in `keep` are never dropped. Returns
+    {'model', 'features', 'params', 'report'}.
+    """
+    from sklearn.base import clone
+    from sklearn.model_selection import train_test_split
+
+    importance = dict(zip(features, model.feature_importances_))
+    kept = [f for f in features if f in keep or importance[f] >= min_importance]
+    kept = kept or [max(features, key=importance.get)]
+    dropped = [f for f in features if f not in kept]
+
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=validation, random_state=seed)
+    val_offset = None if offset_column is None else X_val[offset_column].to_numpy()
+    if val_offset is not None:
+        y_val = y_val + val_offset
+
+    reference_model = clone(model).fit(X_fit[features], y_fit)
+    reference = score(reference_model, features, X_val, y_val, val_offset)
+    floor = reference['r2'] - budget
+    candidates = []
+    chosen = None
+    for n_estimators, max_depth in candidate_params(model):
+        candidate = clone(model).set_params(n_estimators=n_estimators, max_depth=max_depth)
+        started = time.perf_counter()
+        candidate.fit(X_fit[kept], y_fit)
+        fit_seconds = time.perf_counter() - started
+        result = {'n_estimators': n_estimators, 'max_depth': max_depth,
+                  **score(candidate, kept, X_val, y_val, val_offset), 'fit_seconds': round(fit_seconds, 3)}
+        result['within_budget'] = result['r2'] >= floor
+        candidates.append(result)
+        if result['within_budget']:
+            chosen = candidate
+            break
+
+    report = {
+        'budget_r2': budget,
+        'min_importance': min_importance,
+        'validation_rows': len(X_val),
+        'dropped_features': dropped,
+        'reference': {'n_estimators': len(model.estimators_), 'max_depth': _depth(model), **reference},
+        'candidates': candidates,
+        'compacted': chosen is not None,
+    }
+    if chosen is None:
+        return {'model': model, 'features': list(features), 'params': None, 'report': report}
+    report['speedup'] = round(candidates[-1]['rows_per_s'] / max(reference['rows_per_s'], 1), 2)
+    report['size_ratio'] = round(candidates[-1]['bytes'] / reference['bytes'], 4)
+    params = {'n_estimators': candidates[-1]['n_estimators'], 'max_depth': candidates[-1]['max_depth']}
+
+    # Refit the kept settings on the whole training split; the test set scores only this forest
+    chosen = clone(model).set_params(**params).fit(X_train[kept], y_train)
+    test_offset = None if offset_column is None else X_test[offset_column].to_numpy()
+    report['test'] = score(chosen, kept, X_test, y_test, test_offset)
+    return {'model': chosen, 'features': kept, 'params': params, 'report': report}
@@ -0,0 +1,256 @@
+# Single feature-engineering pipeline shared by training (merge2csv5.py) and
+# prediction (finalcode3.py, batch_forecast.py, prediction_server.py).
+#
+# Every feature is registered with a version and the features it depends
+# on. FeatureStore caches each computed column as its own .npy file keyed by
+# (input-data hash, feature name, feature version + dependency versions), so
+# adding a feature or bumping one version only recomputes that feature and
+# the features built on top of it.
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from physics_model import physics_columns
+from solar_geometry import DEFAULT_LAT, DEFAULT_LON, geometry_features
+
+FEATURE_SET_VERSION = 2
+CACHE_DIR = ".feature_cache"
+
+# Features whose definition changed in each feature set version. A model's
+# metadata records the version it was trained on (none recorded: version 1);
+# it must not be fed features that have changed since.
+FEATURE_SET_CHANGES = {
+    # Seasonal `90 - |doy-172|*0.4` proxy -> solar position and angle of incidence (solar_geometry.py)
+    2: ['solar_elevation', 'tilt_efficiency'],
+}
+
+# Raw columns the features are computed from, with fallbacks for inputs a
+# dataset may not carry (e.g. the baseline forecast has no panel specs)
+INPUT_DEFAULTS = {
+    'lat': DEFAULT_LAT,
+    'lon': DEFAULT_LON,
+    'panel_area_m2': 1.6,
+    'panel_efficiency': 0.2,
+}
+INPUT_COLUMNS = [
+    'timestamp_utc', 'ghi_w_m2', 'temperature_C', 'tilt_deg', 'azimuth_deg', 'num_panels',
+    'lat', 'lon', 'panel_area_m2', 'panel_efficiency', 'inverter_efficiency', 'inverter_max_ac_kw',
+]
+
+BASE_FEATURES = [
+    'ghi_w_m2', 'temperature_C', 'tilt_deg', 'azimuth_deg', 'num_panels',
+    'hour', 'day_of_year', 'month', 'is_weekend', 'solar_elevation',
+    'daylight_hours', 'system_capacity', 'tilt_efficiency', 'poa_w_m2'
+]
+# Daily NASA POWER columns, used when the training data carries them
+NASA_FEATURES = ['Solar_Radiation', 'Temperature']
+
+FEATURE_REGISTRY = {}
+
+
+def feature(name, version=1, depends=()):
+    def register(fn):
+        FEATURE_REGISTRY[name] = {'version': version, 'depends': tuple(depends), 'fn': fn}
+        return fn
+    return register
+
+
+def _calendar(ctx):
+    if '_calendar' not in ctx:
+        values = np.asarray(ctx['timestamp_utc'], dtype='datetime64[ns]')
+        days = values.astype('datetime64[D]')
+        ctx['_calendar'] = {
+            'hour': ((values - days) // np.timedelta64(1, 'h')).astype(np.int64),
+            'day_of_year': (days - values.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) + 1,
+            'month': values.astype('datetime64[M]').astype(np.int64) % 12 + 1,
+            # 1970-01-01 was a Thursday; Monday == 0 as in Series.dt.weekday
+            'weekday': (days.astype(np.int64) + 3) % 7,
+        }
+    return ctx['_calendar']
+
+
+def _geometry(ctx):
+    if '_geometry' not in ctx:
+        ctx['_geometry'] = geometry_features(
+            ctx['timestamp_utc'], ctx['lat'], ctx['lon'],
+            ctx['ghi_w_m2'], ctx['tilt_deg'], ctx['azimuth_deg'],
+        )
+    return ctx['_geometry']
+
+
+@feature('hour')
+def _hour(ctx):
+    return _calendar(ctx)['hour']
+
+
+@feature('day_of_year')
+def _day_of_year(ctx):
+    return _calendar(ctx)['day_of_year']
+
+
+@feature('month')
+def _month(ctx):
+    return _calendar(ctx)['month']
+
+
+@feature('is_weekend')
+def _is_weekend(ctx):
+    return _calendar(ctx)['weekday'] >= 5
+
+
+@feature('daylight_hours', depends=['hour'])
+def _daylight_hours(ctx):
+    return ((ctx['hour'] >= 6) & (ctx['hour'] <= 18)).astype(np.int64)
+
+
+@feature('solar_elevation', version=2)
+def _solar_elevation(ctx):
+    return _geometry(ctx)['solar_elevation']
+
+
+@feature('tilt_efficiency', version=2)
+def _tilt_efficiency(ctx):
+    return _geometry(ctx)['tilt_efficiency']
+
+
+@feature('poa_w_m2')
+def _poa(ctx):
+    return _geometry(ctx)['poa_w_m2']
+
+
+@feature('system_capacity')
+def _system_capacity(ctx):
+    return np.asarray(ctx['num_panels'], dtype=float) * ctx['panel_area_m2'] * ctx['panel_efficiency']
+
+
+@feature('physics_kwh')
+def _physics_kwh(ctx):
+    # server.js calculateHourlyEnergy chain; baseline for residual models
+    return physics_columns(ctx)
+
+
+def feature_key(name):
+    # Version fingerprint of a feature including everything it depends on
+    spec = FEATURE_REGISTRY[name]
+    parts = [f"{name}:v{spec['version']}"] + [feature_key(dep) for dep in spec['depends']]
+    return "|".join(parts)
+
+
+def stale_features(features, feature_set_version=None):
+    """Features in `features` computed differently now than in the given (trained) feature set."""
+    trained = 1 if feature_set_version is None else int(feature_set_version)
+    changed = {name for version, names in FEATURE_SET_CHANGES.items() if version > trained for name in names}
+    return [name for name in features if name in changed]
+
+
+def daily_nasa_proxies(timestamps, ghi, temperature, groups=None):
+    """Solar_Radiation and Temperature for hourly weather rows, as NASA POWER reports them.
+
+    Daily insolation (sum of the UTC day's hourly W/m², in kWh/m²/day) and
+    the day's mean temperature, repeated on each of its rows; `groups`
+    (e.g. a site id per row) keeps sites apart. The training data carries
+    the NASA daily values, so every prediction path derives them here.
+    """
+    frame = pd.DataFrame({
+        'day': np.asarray(timestamps, dtype='datetime64[ns]').astype('datetime64[D]'),
+        'ghi': np.asarray(ghi, dtype=float),
+        'temperature': np.asarray(temperature, dtype=float),
+    })
+    keys = ['day'] if groups is None else [np.asarray(groups), 'day']
+    grouped = frame.groupby(keys, sort=False)
+    return (grouped['ghi'].transform('sum') / 1000).to_numpy(), grouped['temperature'].transform('mean').to_numpy()
+
+
+def model_features(columns):
+    """Training feature list for a dataset with the given columns."""
+    return [col for col in BASE_FEATURES + NASA_FEATURES if col in columns or col in FEATURE_REGISTRY]
+
+
+def _resolve(names):
+    # Requested registered features plus their dependencies, in dependency order
+    ordered = []
+
+    def visit(name):
+        if name in ordered or name not in FEATURE_REGISTRY:
+            return
+        for dep in FEATURE_REGISTRY[name]['depends']:
+            visit(dep)
+        ordered.append(name)
+
+    for name in names:
+        visit(name)
+    return ordered
+
+
+def compute_features(columns, names=None, store=None, input_hash=None):
+    """Compute registered features from a mapping of equal-length arrays."""
+    ctx = dict(columns)
+    n_rows = len(np.asarray(ctx['timestamp_utc']))
+    for col, default in INPUT_DEFAULTS.items():
+        if col not in ctx:
+            ctx[col] = np.full(n_rows, default, dtype=float)
+
+    computed = {}
+    for name in _resolve(FEATURE_REGISTRY if names is None else names):
+        values = store.get(input_hash, name) if store is not None else None
+        if values is None:
+            values = np.asarray(FEATURE_REGISTRY[name]['fn'](ctx))
+            if store is not None:
+                store.put(input_hash, name, values)
+        ctx[name] = computed[name] = values
+    return computed
+
+
+def engineer_features(frame, names=None, store=None):
+    """Add the requested features (default: all registered) to `frame`."""
+    frame = frame.copy()
+    frame['timestamp_utc'] = pd.to_datetime(frame['timestamp_utc'])
+    columns = {col: frame[col].to_numpy() for col in INPUT_COLUMNS if col in frame.columns}
+    input_hash = store.hash_inputs(frame) if store is not None else None
+    for name, values in compute_features(columns, names, store, input_hash).items():
+        frame[name] = values
+
+    # Handle missing values - only fill numeric columns
+    numeric_columns = frame.select_dtypes(include=[np.number]).columns
+    frame[numeric_columns] = frame[numeric_columns].fillna(frame[numeric_columns].median())
+    return frame
+
+
+class FeatureStore:
+    """Columnar on-disk cache of computed features (.npy per feature)."""
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def hash_inputs(frame):
+        digest = hashlib.sha1()
+        for col in INPUT_COLUMNS:
+            if col in frame.columns:
+                digest.update(col.encode())
+                digest.update(pd.util.hash_pandas_object(frame[col], index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def _path(self, input_hash, name):
+        key = hashlib.sha1(f"v{FEATURE_SET_VERSION}|{input_hash}|{feature_key(name)}".encode()).hexdigest()
+        return os.path.join(self.root, f"{name}-{key[:16]}.npy")
+
+    def get(self, input_hash, name):
+        path = self._path(input_hash, name)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return np.load(path, mmap_mode='r')
+
+    def put(self, input_hash, name, values):
+        path = self._path(input_hash, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(values))
+        os.replace(tmp_path, path)
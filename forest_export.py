@@ -0,0 +1,127 @@
+# Compact, memory-mapped RandomForest artifact.
+# export_forest() flattens every tree of a fitted forest into contiguous
+# NumPy arrays (threshold, value, feature, children) stored as one record in
+# a single .npy file. FlatForest memory-maps that file read-only, so worker
+# processes share the same model pages, and predicts by walking all trees
+# for a block of rows at once instead of unpickling 100 estimator objects.
+import json
+import os
+
+import numpy as np
+
+FLAT_MODEL_PATH = "trained_model.forest.npy"
+BLOCK_ROWS = 2048
+
+
+def _node_dtype(n_nodes):
+    # One record of per-field arrays, so every field is contiguous on disk;
+    # all 8-byte types keep the fields aligned inside the mapping
+    return np.dtype([
+        ('threshold', '<f8', (n_nodes,)),
+        ('value', '<f8', (n_nodes,)),
+        ('feature', '<i8', (n_nodes,)),
+        ('children', '<i8', (2 * n_nodes,)),  # left, right interleaved
+    ])
+
+
+def export_forest(model, path=FLAT_MODEL_PATH):
+    """Write a fitted forest to `path`; returns the layout for model_metadata.json."""
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None:
+        raise ValueError(f"{type(model).__name__} is not a tree ensemble")
+
+    trees = [est.tree_ for est in estimators]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+    record = np.zeros((), dtype=_node_dtype(int(offsets[-1])))
+    children = record['children'].reshape(-1, 2)
+    for tree, start, end in zip(trees, offsets[:-1], offsets[1:]):
+        own = np.arange(start, end)
+        is_leaf = tree.children_left < 0
+        # Leaves point at themselves so the walk can run a fixed number of steps
+        record['feature'][start:end] = np.where(is_leaf, 0, tree.feature)
+        record['threshold'][start:end] = np.where(is_leaf, np.inf, tree.threshold)
+        record['value'][start:end] = tree.value[:, 0, 0]
+        children[start:end, 0] = np.where(is_leaf, own, tree.children_left + start)
+        children[start:end, 1] = np.where(is_leaf, own, tree.children_right + start)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, record)
+    os.replace(tmp_path, path)
+    return {
+        'path': path,
+        'roots': offsets[:-1].tolist(),
+        'max_depth': int(max(tree.max_depth for tree in trees)),
+        'n_features': int(model.n_features_in_),
+        'n_nodes': int(offsets[-1]),
+    }
+
+
+class FlatForest:
+    def __init__(self, path, roots, max_depth, n_features=None, mmap=True, **_):
+        record = np.load(path, mmap_mode='r' if mmap else None)
+        self.path = path
+        # Plain ndarray views over the mapping (no per-call memmap wrapping)
+        self.threshold = np.asarray(record['threshold'])
+        self.value = np.asarray(record['value'])
+        self.feature = np.asarray(record['feature'])
+        self.children = np.asarray(record['children'])
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+        self.n_estimators = len(self.roots)
+
+    def _leaves(self, block):
+        # Leaf index of every (row, tree) pair for one block of rows
+        flat = block.ravel()
+        row_base = (np.arange(len(block)) * block.shape[1])[:, None]
+        idx = np.broadcast_to(self.roots, (len(block), self.n_estimators)).copy()
+        for _ in range(self.max_depth):
+            go_right = flat.take(row_base + self.feature.take(idx)) > self.threshold.take(idx)
+            idx = self.children.take(2 * idx + go_right)
+        return idx
+
+    def _as_matrix(self, X):
+        # sklearn compares float32 feature values against float64 thresholds;
+        # the comparison promotes exactly, so float32 input is used as-is
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def predict_trees(self, X, out=None, block_rows=BLOCK_ROWS):
+        """Per-tree predictions as a (trees x rows) array."""
+        X = self._as_matrix(X)
+        if out is None:
+            out = np.empty((self.n_estimators, len(X)), dtype=np.float64)
+        for start in range(0, len(X), block_rows):
+            block = X[start:start + block_rows]
+            out[:, start:start + len(block)] = self.value.take(self._leaves(block)).T
+        return out
+
+    def predict(self, X, block_rows=BLOCK_ROWS):
+        X = self._as_matrix(X)
+        predictions = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), block_rows):
+            block = X[start:start + block_rows]
+            predictions[start:start + len(block)] = self.value.take(self._leaves(block)).mean(axis=1)
+        return predictions
+
+
+def load_model(model_path="trained_model.joblib", metadata=None, prefer_flat=True):
+    """FlatForest when the metadata points at an exported forest, else joblib."""
+    layout = (metadata or {}).get('flat_model')
+    if prefer_flat and layout and os.path.exists(layout['path']):
+        return FlatForest(**layout)
+    import joblib
+    return joblib.load(model_path)
+
+
+if __name__ == "__main__":
+    # Export the current trained_model.joblib and record it in the metadata
+    import joblib
+
+    with open("model_metadata.json", "r") as f:
+        model_metadata = json.load(f)
+    layout = export_forest(joblib.load("trained_model.joblib"))
+    model_metadata['flat_model'] = layout
+    with open("model_metadata.json", "w") as f:
+        json.dump(model_metadata, f, indent=2)
+    print(f"✅ Exported {len(layout['roots'])} trees ({layout['n_nodes']} nodes) to {layout['path']}")
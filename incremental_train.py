@@ -0,0 +1,228 @@
+# Incremental retraining for merge2csv5.py.
+#
+#   python merge2csv5.py --incremental [--add-trees 20] [--max-trees 300]
+#
+# The published model's metadata carries a watermark (latest timestamp_utc)
+# per system_id. Telemetry is scanned in chunks and only rows past their
+# system's watermark are featurized and trained on, so the cost grows with
+# the new data rather than the full history:
+#   RandomForest - warm_start: new trees are fit on the new window plus a
+#                  replay sample of earlier rows; the oldest trees are
+#                  dropped beyond --max-trees
+#   SGDRegressor - the streamed scaler + SGD pipeline keeps learning with
+#                  partial_fit on the same rows
+#   other models - a clone (same hyperparameters) refit on the new window
+#                  plus the replay sample
+# The replay sample is a bounded reservoir stored with each version. Every
+# run publishes a new immutable version directory (model, metadata, replay,
+# flat forest) and then swaps the top-level artifacts in place atomically.
+import argparse
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURE_SET_VERSION
+from model_registry import REPLAY_FILE, VERSIONS_DIR, ModelRegistry
+from stream_train import HOLDOUT_EVERY, NASA_PATH, TELEMETRY_PATH, Reservoir, iter_chunks, load_nasa_daily
+
+
+class DeltaFilter:
+    """Row filter for iter_chunks: keeps rows newer than their system's watermark."""
+
+    def __init__(self, watermarks):
+        self.watermarks = {sid: np.datetime64(ts, 'ns') for sid, ts in watermarks.items()}
+        # Looked up once per chunk with Series.map (hash join, no per-row Python)
+        self._floors = pd.Series(self.watermarks, dtype='datetime64[ns]')
+        self.scanned = 0
+        self._new = []
+
+    def __call__(self, chunk):
+        self.scanned += len(chunk)
+        timestamps = pd.to_datetime(chunk['timestamp_utc']).to_numpy(dtype='datetime64[ns]')
+        system_ids = chunk['system_id'].to_numpy(dtype=object)
+        if len(self._floors):
+            floor = pd.Series(system_ids).map(self._floors).to_numpy(dtype='datetime64[ns]')
+            new = np.isnat(floor) | (timestamps > floor)
+        else:
+            new = np.ones(len(chunk), dtype=bool)
+        self._new.append((chunk.index.to_numpy()[new], system_ids[new], timestamps[new]))
+        return new
+
+    def advanced(self, used_row_ids):
+        """Watermarks moved up to the rows actually trained on.
+
+        Rows dropped later (e.g. no NASA day to join yet) stay past the
+        watermark and are picked up by a later run.
+        """
+        latest = dict(self.watermarks)
+        if self._new:
+            row_ids, system_ids, timestamps = (np.concatenate(parts) for parts in zip(*self._new))
+            used = np.isin(row_ids, used_row_ids)
+            newest = pd.Series(timestamps[used]).groupby(system_ids[used]).max()
+            for sid, ts in newest.items():
+                latest[sid] = max(latest.get(sid, np.datetime64(ts, 'ns')), np.datetime64(ts, 'ns'))
+        return {sid: pd.Timestamp(ts).isoformat() for sid, ts in sorted(latest.items())}
+
+
+def watermarks_from(frame):
+    """Per-system latest timestamp_utc (ISO strings) for model_metadata.json."""
+    if 'system_id' not in frame.columns:
+        return {}
+    latest = pd.to_datetime(frame['timestamp_utc']).groupby(frame['system_id']).max()
+    return {str(sid): ts.isoformat() for sid, ts in latest.items()}
+
+
+def load_replay(path, capacity, n_features, seed):
+    replay = Reservoir(capacity, n_features, seed)
+    if os.path.exists(path):
+        stored = np.load(path)
+        n = min(len(stored['y']), capacity)
+        replay.X[:n], replay.y[:n] = stored['X'][:n], stored['y'][:n]
+        replay.seen = int(stored['seen'])
+    return replay
+
+
+def rebuild(base_model, model_name):
+    """Unfitted copy of the published model with the same hyperparameters."""
+    from sklearn.base import clone
+
+    try:
+        return clone(base_model)
+    except (TypeError, RuntimeError) as e:
+        raise ValueError(f"A {model_name} model cannot be retrained incrementally ({e}). "
+                         f"Retrain it in full: python -m solar_pipeline train") from None
+
+
+def train_incremental(metadata, base_model, path=TELEMETRY_PATH, nasa_path=NASA_PATH, chunk_rows=500_000,
+                      add_trees=20, max_trees=300, replay_rows=50_000, replay_path=None, seed=42):
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    features = metadata['features']
+    target = metadata.get('target', 'measured_ac_kwh')
+    delta = DeltaFilter(metadata.get('watermarks', {}))
+    train_X, train_y, test_X, test_y, used = [], [], [], [], []
+    for X, y, row_id in iter_chunks(path, chunk_rows, load_nasa_daily(nasa_path), features,
+                                    row_filter=delta, target=target):
+        used.append(row_id)
+        is_holdout = row_id % HOLDOUT_EVERY == 0
+        train_X.append(X[~is_holdout])
+        train_y.append(y[~is_holdout])
+        test_X.append(X[is_holdout])
+        test_y.append(y[is_holdout])
+
+    stats = {'scanned_rows': delta.scanned, 'new_rows': int(sum(map(len, train_y)) + sum(map(len, test_y)))}
+    if stats['new_rows'] == 0:
+        return None, stats, None
+    watermarks = delta.advanced(np.concatenate(used))
+
+    X_new, y_new = np.concatenate(train_X), np.concatenate(train_y)
+    replay = load_replay(replay_path or '', replay_rows, len(features), seed)
+    X_fit = pd.DataFrame(np.concatenate([X_new, replay.X[:replay.size]]), columns=features)
+    y_fit = np.concatenate([y_new, replay.y[:replay.size]])
+    stats['replay_rows'] = replay.size
+
+    model_name = metadata.get('model_name', type(base_model).__name__)
+    if model_name == 'RandomForest':
+        model = base_model
+        n_before = len(model.estimators_)
+        model.set_params(warm_start=True, n_estimators=n_before + add_trees)
+        model.fit(X_fit, y_fit)
+        if len(model.estimators_) > max_trees:
+            # Forget the oldest trees; they saw the oldest data
+            model.estimators_ = model.estimators_[-max_trees:]
+        model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+        stats['trees_added'] = add_trees
+        stats['trees_total'] = len(model.estimators_)
+    elif model_name == 'SGDRegressor':
+        # stream_train's Pipeline(scaler, regressor): keep updating it
+        model = base_model
+        scaler, regressor = model.named_steps['scaler'], model.named_steps['regressor']
+        # Fit on bare arrays, as when streamed
+        scaler.partial_fit(X_fit.to_numpy())
+        regressor.partial_fit(scaler.transform(X_fit.to_numpy()), y_fit)
+    else:
+        model = rebuild(base_model, model_name)
+        model.fit(X_fit, y_fit)
+    replay.add(X_new, y_new)
+
+    performance = metadata.get('performance', {})
+    X_test, y_test = np.concatenate(test_X), np.concatenate(test_y)
+    if len(y_test):
+        y_pred = model.predict(pd.DataFrame(X_test, columns=features))
+        if target == 'residual':
+            physics = X_test[:, features.index('physics_kwh')]
+            y_test, y_pred = y_test + physics, y_pred + physics
+        performance = {
+            'mae': float(mean_absolute_error(y_test, y_pred)),
+            'mse': float(mean_squared_error(y_test, y_pred)),
+            'r2': float(r2_score(y_test, y_pred)),
+        }
+    stats['performance'] = performance
+    return (model, replay), stats, watermarks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental retraining on telemetry past the watermarks")
+    parser.add_argument("--telemetry", default=TELEMETRY_PATH)
+    parser.add_argument("--nasa", default=NASA_PATH)
+    parser.add_argument("--chunk-rows", type=int, default=500_000)
+    parser.add_argument("--add-trees", type=int, default=20, help="Trees fit per run (RandomForest)")
+    parser.add_argument("--max-trees", type=int, default=300, help="Oldest trees are dropped beyond this")
+    parser.add_argument("--replay-rows", type=int, default=50_000, help="Replay sample of earlier rows")
+    parser.add_argument("--versions-dir", default=VERSIONS_DIR)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    print("🚀 Starting incremental training...")
+    registry = ModelRegistry(args.versions_dir)
+    try:
+        base_model, metadata = registry.load(prefer_flat=False)
+    except FileNotFoundError:
+        print("❌ No published model. Run merge2csv5.py first for the initial full training.")
+        return 1
+    if metadata.get('feature_set_version') not in (None, FEATURE_SET_VERSION):
+        print("❌ The published model uses another feature set version; retrain with merge2csv5.py.")
+        return 1
+
+    base_version = registry.current()
+    base_dir = registry.bundle_dir(base_version)
+    started = time.perf_counter()
+    try:
+        result, stats, watermarks = train_incremental(
+            metadata, base_model, args.telemetry, args.nasa, args.chunk_rows, args.add_trees, args.max_trees,
+            args.replay_rows, os.path.join(base_dir, REPLAY_FILE), args.seed,
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"📊 Scanned {stats['scanned_rows']} rows, {stats['new_rows']} past the watermarks ({elapsed:.2f}s)")
+    if result is None:
+        print("✅ No new telemetry; the published model is current.")
+        return 0
+
+    model, replay = result
+    performance = stats.pop('performance')
+    metadata.update({
+        'model_version': registry.next_version(),
+        'parent_version': base_version,
+        'training_date': datetime.now().isoformat(),
+        'training_mode': 'incremental',
+        'watermarks': watermarks,
+        'performance': performance,
+        'incremental': {**stats, 'seconds': round(elapsed, 3)},
+    })
+    if hasattr(model, 'feature_importances_'):
+        metadata['feature_importance'] = dict(zip(metadata['features'], model.feature_importances_.tolist()))
+    version_dir = registry.publish(model, metadata, replay)
+    print(f"🤖 {metadata['model_name']} - MAE: {performance.get('mae', float('nan')):.4f}, "
+          f"R²: {performance.get('r2', float('nan')):.4f} on the new window")
+    print(f"✅ Published model version {metadata['model_version']}: {version_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+# Array-in, array-out inference path for the trained models.
+# The old path built `frame[features]` (a mixed bool/int64/float64 copy),
+# and sklearn then converted that to the dtype its trees compare in. A
+# Predictor checks the feature order once, when the model is loaded. After
+# that it fills a preallocated C-contiguous matrix in the metadata's
+# feature order straight from the feature columns, chunk by chunk, and
+# hands the model that buffer as-is:
+#   float32 - sklearn trees and FlatForest (sklearn's own tree dtype, so
+#             the input is not copied again and predictions are unchanged)
+#   float64 - every other model (HistGradientBoosting bins and linear
+#             models work in float64)
+# The buffer is reused across chunks and calls, one per thread (the
+# prediction server answers requests on several threads).
+#
+# Given the metadata, the check also refuses a model trained on an older
+# feature set whose features have since changed meaning (features.py
+# FEATURE_SET_CHANGES), instead of feeding it inputs it never saw.
+#
+#   predictor = Predictor(model, metadata['features'], metadata=metadata)
+#   predictions = predictor.predict(columns)      # {feature: array or scalar} or a DataFrame
+#   predictions = predictor.predict_matrix(X)     # (rows x features) in any dtype
+import copy
+import threading
+
+import numpy as np
+
+CHUNK_ROWS = 65_536
+
+
+def input_dtype(model):
+    """Dtype the model consumes without converting: float32 for tree ensembles."""
+    if hasattr(model, 'predict_trees') or hasattr(model, 'tree_'):
+        return np.float32
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is not None and len(estimators) and hasattr(estimators[0], 'tree_'):
+        return np.float32
+    return np.float64
+
+
+def validate_features(model, features, metadata=None):
+    """Raise ValueError unless `features` is the model's training feature order (and feature set)."""
+    n_features = getattr(model, 'n_features_in_', None)
+    if n_features is not None and n_features != len(features):
+        raise ValueError(f"Model expects {n_features} features, metadata lists {len(features)}")
+    names = getattr(model, 'feature_names_in_', None)
+    if names is not None and list(names) != list(features):
+        raise ValueError(f"Model feature order {list(names)} does not match metadata {list(features)}")
+    if metadata is not None:
+        from features import FEATURE_SET_VERSION, stale_features
+
+        trained = metadata.get('feature_set_version', 1)
+        stale = stale_features(features, trained)
+        if stale:
+            raise ValueError(f"Model was trained on feature set v{trained}; {stale} have changed since "
+                             f"(now v{FEATURE_SET_VERSION}). Retrain it: python -m solar_pipeline train")
+
+
+def _unnamed(model):
+    # Order is validated once above; without feature_names_in_ sklearn takes
+    # a bare ndarray without the per-call name check or its warning
+    if 'feature_names_in_' not in getattr(model, '__dict__', {}):
+        return model
+    model = copy.copy(model)
+    del model.feature_names_in_
+    return model
+
+
+class Predictor:
+    def __init__(self, model, features, chunk_rows=CHUNK_ROWS, metadata=None):
+        self.features = list(features)
+        validate_features(model, self.features, metadata)
+        self.source = model
+        self.model = _unnamed(model)
+        self.dtype = input_dtype(model)
+        self.chunk_rows = chunk_rows
+        self.n_estimators = getattr(model, 'n_estimators', None)
+        self._local = threading.local()
+
+    def buffer(self, rows):
+        """This thread's (rows x features) input buffer, grown only when too small."""
+        buf = getattr(self._local, 'buffer', None)
+        if buf is None or len(buf) < rows:
+            buf = self._local.buffer = np.empty((rows, len(self.features)), dtype=self.dtype)
+        return buf[:rows]
+
+    def _arrays(self, columns):
+        missing = [name for name in self.features if name not in columns]
+        if missing:
+            raise ValueError(f"Missing model features: {missing}")
+        return [np.asarray(columns[name]) for name in self.features]
+
+    @staticmethod
+    def _length(arrays, rows):
+        if rows is not None:
+            return len(rows)
+        return max((len(values) for values in arrays if values.ndim), default=0)
+
+    def _chunks(self, arrays, rows, n):
+        # Yields (start, stop, X) with X a view of the filled buffer
+        for start in range(0, n, self.chunk_rows):
+            stop = min(start + self.chunk_rows, n)
+            X = self.buffer(stop - start)
+            for j, values in enumerate(arrays):
+                if values.ndim == 0:
+                    X[:, j] = values
+                elif rows is None:
+                    X[:, j] = values[start:stop]
+                else:
+                    X[:, j] = values[rows[start:stop]]
+            yield start, stop, X
+
+    def predict(self, columns, mask=None, out=None):
+        """Predictions for every row, or every True row of `mask`, of a column mapping."""
+        rows = None if mask is None else np.flatnonzero(mask)
+        arrays = self._arrays(columns)
+        n = self._length(arrays, rows)
+        if out is None:
+            out = np.empty(n)
+        for start, stop, X in self._chunks(arrays, rows, n):
+            out[start:stop] = self.model.predict(X)
+        return out
+
+    def predict_trees(self, columns, mask=None, out=None):
+        """Per-tree predictions (trees x rows) of a forest, chunk by chunk."""
+        from quantile_forecast import tree_predictions
+
+        rows = None if mask is None else np.flatnonzero(mask)
+        arrays = self._arrays(columns)
+        n = self._length(arrays, rows)
+        if out is None:
+            out = np.empty((self.n_estimators, n))
+        for start, stop, X in self._chunks(arrays, rows, n):
+            tree_predictions(self.model, X, out=out[:, start:stop])
+        return out
+
+    def predict_matrix(self, X, out=None):
+        """Predictions for a (rows x features) matrix in the model's feature order."""
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != len(self.features):
+            raise ValueError(f"Expected a (rows x {len(self.features)}) matrix, got shape {X.shape}")
+        if X.dtype == self.dtype and X.flags.c_contiguous:
+            # Already in the model's layout: no buffer copy
+            result = self.model.predict(X)
+            if out is None:
+                return result
+            out[:] = result
+            return out
+        return self.predict({name: X[:, j] for j, name in enumerate(self.features)}, out=out)
@@ -0,0 +1,238 @@
+# Stage timing, memory and profiling for the training and prediction scripts.
+#
+#   report = RunReport.from_args(args, "training")
+#   report.begin("load")                 # flat scripts: runs until the next begin()
+#   ...
+#   with report.stage("fit") as stage:   # or as a context manager
+#       model.fit(X, y)
+#       stage.rows = len(X)
+#   report.finish()                      # -> run_report_training.json
+#
+# Per stage: wall time, row count, process peak RSS and current RSS, and with
+# --trace-memory the tracemalloc allocation delta and peak (NumPy buffers
+# included). --profile STAGE[,STAGE] runs those stages under cProfile
+# (profile_<pipeline>_<stage>.prof, open with pstats or snakeviz); with
+# --profiler py-spy the stage is sampled by `py-spy record --pid` instead.
+#
+# Disabled (the default unless --instrument or SOLAR_INSTRUMENT=1), stage()
+# and begin() hand back one shared no-op object, so the calls can stay in
+# production code.
+import json
+import os
+import platform
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_TEMPLATE = "run_report_{pipeline}.json"
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+
+
+def env_flag(name):
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+
+class _NullStage:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NULL_STAGE = _NullStage()
+
+
+class _Profiler:
+    """cProfile in-process, or py-spy sampling this process from outside."""
+
+    def __init__(self, kind, path):
+        self.kind = kind
+        self.path = path
+        self._profile = None
+        self._process = None
+
+    def start(self):
+        if self.kind == "py-spy":
+            exe = shutil.which("py-spy")
+            if exe is None:
+                print("⚠️ py-spy not found on PATH; profiling with cProfile instead")
+                self.kind, self.path = "cprofile", self.path.replace(".speedscope.json", ".prof")
+            else:
+                self._process = subprocess.Popen(
+                    [exe, "record", "--pid", str(os.getpid()), "--output", self.path, "--format", "speedscope"],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                return
+        import cProfile
+
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self):
+        if self._process is not None:
+            # SIGINT makes py-spy flush the recording
+            self._process.send_signal(signal.SIGINT)
+            self._process.wait(timeout=30)
+        elif self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.path)
+        return self.path
+
+
+class Stage:
+    def __init__(self, report, name, rows=None):
+        self.report = report
+        self.name = name
+        self.rows = rows
+        self._profiler = None
+
+    def __enter__(self):
+        report = self.report
+        if report.trace_memory:
+            import tracemalloc
+
+            self._traced_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        if self.name in report.profile_stages:
+            suffix = "speedscope.json" if report.profiler == "py-spy" else "prof"
+            path = os.path.join(report.out_dir, f"profile_{report.pipeline}_{self.name}.{suffix}")
+            self._profiler = _Profiler(report.profiler, path)
+            self._profiler.start()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        record = {'stage': self.name, 'seconds': round(time.perf_counter() - self._started, 4)}
+        if self._profiler is not None:
+            record['profile'] = self._profiler.stop()
+        if self.rows is not None:
+            record['rows'] = int(self.rows)
+        record['peak_rss_mb'] = peak_rss_mb()
+        record['rss_mb'] = current_rss_mb()
+        if self.report.trace_memory:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            record['alloc_mb'] = round((current - self._traced_start) / 2**20, 2)
+            record['alloc_peak_mb'] = round((peak - self._traced_start) / 2**20, 2)
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        self.report.stages.append(record)
+        return False
+
+
+class RunReport:
+    def __init__(self, pipeline, enabled=None, trace_memory=False, profile=None, profiler="cprofile",
+                 out_dir="."):
+        self.pipeline = pipeline
+        self.enabled = env_flag("SOLAR_INSTRUMENT") if enabled is None else enabled
+        self.trace_memory = self.enabled and (trace_memory or env_flag("SOLAR_TRACE_MEMORY"))
+        profile = profile or os.environ.get("SOLAR_PROFILE", "")
+        self.profile_stages = set(filter(None, profile.split(","))) if self.enabled else set()
+        self.profiler = profiler
+        self.out_dir = out_dir
+        self.stages = []
+        self.info = {}
+        self._current = None
+        self._started = time.perf_counter()
+        self._started_at = datetime.now().isoformat()
+        if self.trace_memory:
+            import tracemalloc
+
+            tracemalloc.start()
+
+    @classmethod
+    def add_arguments(cls, parser):
+        group = parser.add_argument_group("instrumentation")
+        group.add_argument("--instrument", action="store_true", default=None,
+                           help="Time every stage and write a JSON run report (or SOLAR_INSTRUMENT=1)")
+        group.add_argument("--trace-memory", action="store_true",
+                           help="Track allocations per stage with tracemalloc (slower)")
+        group.add_argument("--profile", metavar="STAGE[,STAGE]", help="Profile these stages")
+        group.add_argument("--profiler", choices=["cprofile", "py-spy"], default="cprofile")
+        return parser
+
+    @classmethod
+    def from_args(cls, args, pipeline, out_dir="."):
+        enabled = args.instrument or (True if args.trace_memory or args.profile else None)
+        return cls(pipeline, enabled, args.trace_memory, args.profile, args.profiler, out_dir)
+
+    def stage(self, name, rows=None):
+        if not self.enabled:
+            return NULL_STAGE
+        return Stage(self, name, rows)
+
+    def begin(self, name, rows=None):
+        """End the running stage (if any) and start `name`; for section-style scripts."""
+        self.end()
+        if not self.enabled:
+            return NULL_STAGE
+        self._current = Stage(self, name, rows).__enter__()
+        return self._current
+
+    def end(self):
+        if self._current is not None:
+            current, self._current = self._current, None
+            current.__exit__(None, None, None)
+
+    def note(self, **info):
+        if self.enabled:
+            self.info.update(info)
+
+    def finish(self, path=None):
+        """Close the last stage and write the JSON report; returns its path (None when disabled)."""
+        self.end()
+        if not self.enabled:
+            return None
+        report = {
+            'pipeline': self.pipeline,
+            'started_at': self._started_at,
+            'total_seconds': round(time.perf_counter() - self._started, 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'trace_memory': self.trace_memory,
+            'stages': self.stages,
+            **self.info,
+        }
+        path = path or os.path.join(self.out_dir, REPORT_TEMPLATE.format(pipeline=self.pipeline))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        slowest = max(self.stages, key=lambda s: s['seconds'], default=None)
+        print(f"⏱️ {len(self.stages)} stages in {report['total_seconds']:.2f}s"
+              + (f", slowest: {slowest['stage']} ({slowest['seconds']:.2f}s)" if slowest else "")
+              + f" -> {path}")
+        return path
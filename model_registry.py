@@ -0,0 +1,264 @@
+# Versioned model registry.
+# Every training run publishes an immutable bundle directory
+#   model_versions/v0007/{trained_model.joblib, model_metadata.json,
+#                         trained_model.forest.npy, replay.npz}
+# written under a temp name and renamed into place. model_versions/CURRENT
+# names the active bundle and is only ever replaced atomically, so a reader
+# sees either the old or the new bundle, never a mix. The previous bundles
+# stay on disk (the newest --keep) for instant rollback.
+#
+# The legacy top-level trained_model.joblib / model_metadata.json are kept
+# in sync for backward compatibility only: they are replaced one after the
+# other, so a reader between the two renames sees a mismatched pair. The
+# prediction loaders go through load_active(), which reads the bundle
+# CURRENT names whenever a version is published.
+#
+# Reading the pointer and a bundle's metadata imports nothing heavier than
+# json; joblib, NumPy and the forest export load with the first model load
+# or publish.
+#
+#   python model_registry.py list
+#   python model_registry.py rollback
+#   python model_registry.py activate 5
+#   python model_registry.py prune --keep 5
+import argparse
+import copy
+import json
+import os
+import shutil
+import time
+
+VERSIONS_DIR = "model_versions"
+POINTER = "CURRENT"
+MODEL_FILE = "trained_model.joblib"
+METADATA_FILE = "model_metadata.json"
+FOREST_FILE = "trained_model.forest.npy"
+REPLAY_FILE = "replay.npz"
+KEEP_VERSIONS = 5
+
+
+def _atomic_write_text(path, text):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    def __init__(self, root=VERSIONS_DIR, keep=KEEP_VERSIONS, sync_legacy=True):
+        self.root = root
+        self.keep = keep
+        self.sync_legacy = sync_legacy
+
+    @staticmethod
+    def bundle_name(version):
+        return f"v{int(version):04d}"
+
+    def bundle_dir(self, version):
+        return os.path.join(self.root, self.bundle_name(version))
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(name[1:]) for name in os.listdir(self.root) if name.startswith('v') and name[1:].isdigit())
+
+    def next_version(self):
+        return max(self.versions(), default=0) + 1
+
+    def current(self):
+        """Active version number, or None before the first publish."""
+        try:
+            with open(os.path.join(self.root, POINTER), "r") as f:
+                return int(f.read().strip().lstrip('v'))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def metadata(self, version=None):
+        version = self.current() if version is None else version
+        with open(os.path.join(self.bundle_dir(version), METADATA_FILE), "r") as f:
+            return json.load(f)
+
+    def load(self, version=None, prefer_flat=True):
+        """(model, metadata) of a bundle; the flat forest is used when present."""
+        from forest_export import load_model
+
+        version = self.current() if version is None else version
+        if version is None:
+            raise FileNotFoundError(f"No model published in {self.root}")
+        bundle = self.bundle_dir(version)
+        metadata = self.metadata(version)
+        if 'flat_model' in metadata:
+            # Resolve inside the bundle so a moved registry still loads
+            metadata['flat_model'] = {**metadata['flat_model'], 'path': os.path.join(bundle, FOREST_FILE)}
+        return load_model(os.path.join(bundle, MODEL_FILE), metadata, prefer_flat), metadata
+
+    def publish(self, model, metadata, replay=None, activate=True):
+        """Write a new immutable bundle and (by default) make it current."""
+        import joblib
+        import numpy as np
+
+        from forest_export import export_forest
+
+        os.makedirs(self.root, exist_ok=True)
+        version = metadata.get('model_version') or self.next_version()
+        if version in self.versions():
+            version = self.next_version()
+        metadata['model_version'] = version
+        final_dir = self.bundle_dir(version)
+        tmp_dir = os.path.join(self.root, f".tmp-{self.bundle_name(version)}-{os.getpid()}")
+        os.makedirs(tmp_dir)
+        joblib.dump(model, os.path.join(tmp_dir, MODEL_FILE))
+        if replay is not None:
+            np.savez(os.path.join(tmp_dir, REPLAY_FILE), X=replay.X[:replay.size], y=replay.y[:replay.size],
+                     seen=replay.seen)
+        if metadata.get('model_name') == 'RandomForest' and hasattr(model, 'estimators_'):
+            layout = export_forest(model, os.path.join(tmp_dir, FOREST_FILE))
+            layout['path'] = os.path.join(final_dir, FOREST_FILE)
+            metadata['flat_model'] = layout
+        else:
+            metadata.pop('flat_model', None)
+        with open(os.path.join(tmp_dir, METADATA_FILE), "w") as f:
+            json.dump(metadata, f, indent=2)
+        os.rename(tmp_dir, final_dir)
+        if activate:
+            self.activate(version)
+        return final_dir
+
+    def activate(self, version):
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version: {version}")
+        _atomic_write_text(os.path.join(self.root, POINTER), self.bundle_name(version) + "\n")
+        if self.sync_legacy:
+            bundle = self.bundle_dir(version)
+            for name in (MODEL_FILE, METADATA_FILE):
+                tmp_path = f"{name}.{os.getpid()}.tmp"
+                shutil.copyfile(os.path.join(bundle, name), tmp_path)
+                os.replace(tmp_path, name)
+        self.prune()
+        return version
+
+    def rollback(self, steps=1):
+        """Activate the version `steps` before the current one."""
+        versions = self.versions()
+        current = self.current()
+        older = [v for v in versions if current is None or v < current]
+        if len(older) < steps:
+            raise ValueError("No earlier version to roll back to")
+        return self.activate(older[-steps])
+
+    def prune(self, keep=None):
+        keep = self.keep if keep is None else keep
+        current = self.current()
+        removed = []
+        for version in self.versions()[:-keep] if keep else []:
+            if version != current:
+                shutil.rmtree(self.bundle_dir(version), ignore_errors=True)
+                removed.append(version)
+        return removed
+
+
+def load_active(model_path=None, metadata_path=None, root=VERSIONS_DIR, prefer_flat=True, default_metadata=None):
+    """(model, metadata) to serve: the registry's current bundle, else the top-level files.
+
+    Explicit paths always win. Without a published version the legacy files
+    are read; default_metadata stands in for a missing metadata file.
+    """
+    from forest_export import load_model
+
+    if model_path is None and metadata_path is None:
+        registry = ModelRegistry(root)
+        if registry.current() is not None:
+            return registry.load(prefer_flat=prefer_flat)
+    try:
+        with open(metadata_path or METADATA_FILE, "r") as f:
+            metadata = json.load(f)
+    except FileNotFoundError:
+        if default_metadata is None:
+            raise
+        metadata = copy.deepcopy(default_metadata)
+    return load_model(model_path or MODEL_FILE, metadata, prefer_flat), metadata
+
+
+class ModelWatcher:
+    """Polls the CURRENT pointer and calls on_change(model, metadata) for a new version.
+
+    The new bundle is loaded completely before the callback runs, so the
+    swap itself is a single reference assignment in the caller.
+    """
+
+    def __init__(self, registry, on_change, interval=1.0):
+        import threading
+
+        self.registry = registry
+        self.on_change = on_change
+        self.interval = interval
+        self.version = registry.current()
+        self.last_swap_seconds = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def check(self):
+        version = self.registry.current()
+        if version is None or version == self.version:
+            return False
+        started = time.perf_counter()
+        model, metadata = self.registry.load(version)
+        self.on_change(model, metadata)
+        self.version = version
+        self.last_swap_seconds = time.perf_counter() - started
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # A bad bundle must not take serving down; keep the old model
+                print(f"⚠️ Model reload failed: {e}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and switch published model versions")
+    parser.add_argument("command", choices=["list", "current", "activate", "rollback", "prune"])
+    parser.add_argument("version", nargs="?", type=lambda v: int(v.lstrip('v')))
+    parser.add_argument("--root", default=VERSIONS_DIR)
+    parser.add_argument("--keep", type=int, default=KEEP_VERSIONS)
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.root, keep=args.keep)
+    if args.command == "list":
+        current = registry.current()
+        for version in registry.versions():
+            meta = registry.metadata(version)
+            marker = "*" if version == current else " "
+            r2 = meta.get('performance', {}).get('r2', float('nan'))
+            print(f"{marker} {registry.bundle_name(version)}  {meta.get('model_name')}  "
+                  f"{meta.get('training_mode', 'full')}  R² {r2:.4f}  {meta.get('training_date', '')}")
+    elif args.command == "current":
+        print(registry.current())
+    elif args.command in ("activate", "rollback"):
+        if args.command == "activate" and args.version is None:
+            parser.error("activate needs a version")
+        try:
+            version = registry.activate(args.version) if args.command == "activate" else registry.rollback()
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ Active model version: {version}")
+    else:
+        print(f"✅ Removed versions: {registry.prune(args.keep)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+# Model selection across several model families.
+# Time-series-aware CV folds are computed once from the timestamps and
+# shipped to each worker process a single time (pool initializer), then
+# every candidate (family + params) is cross-validated in parallel with
+# per-candidate timing. The result is a leaderboard sorted by mean CV R².
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+GRIDS = {
+    'full': {
+        'RandomForest': {'n_estimators': [100], 'max_depth': [6, 10, 14],
+                         'min_samples_split': [5], 'min_samples_leaf': [2]},
+        'HistGradientBoosting': {'learning_rate': [0.05, 0.1], 'max_iter': [200],
+                                 'max_leaf_nodes': [15, 31]},
+        'Ridge': {'alpha': [0.1, 1.0, 10.0]},
+        'LinearRegression': {},
+    },
+    # Seeded fast smoke mode: a handful of small candidates on 3 folds
+    'smoke': {
+        'RandomForest': {'n_estimators': [30], 'max_depth': [6, 10],
+                         'min_samples_split': [5], 'min_samples_leaf': [2]},
+        'HistGradientBoosting': {'learning_rate': [0.1], 'max_iter': [100]},
+        'Ridge': {'alpha': [1.0]},
+        'LinearRegression': {},
+    },
+}
+
+
+def make_estimator(family, params, seed=42):
+    from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+    from sklearn.linear_model import LinearRegression, Ridge
+
+    if family == 'RandomForest':
+        # One core per candidate; parallelism comes from the candidate pool
+        return RandomForestRegressor(random_state=seed, n_jobs=1, **params)
+    if family == 'HistGradientBoosting':
+        return HistGradientBoostingRegressor(random_state=seed, **params)
+    if family == 'Ridge':
+        return Ridge(**params)
+    if family == 'LinearRegression':
+        return LinearRegression(**params)
+    raise ValueError(f"Unknown model family: {family}")
+
+
+def time_series_folds(timestamps, n_splits=5):
+    """Expanding-window (train, validation) index pairs in time order."""
+    from sklearn.model_selection import TimeSeriesSplit
+
+    order = np.argsort(np.asarray(timestamps), kind='stable')
+    return [(order[train], order[valid]) for train, valid in TimeSeriesSplit(n_splits=n_splits).split(order)]
+
+
+def candidates(mode='full', search='grid', n_iter=8, seed=42, families=None):
+    from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+    grid = {family: space for family, space in GRIDS[mode].items() if not families or family in families}
+    if not grid:
+        raise ValueError(f"No {mode} search grid for model families {list(families)}")
+    if search == 'grid':
+        return [(family, params) for family, space in grid.items() for params in ParameterGrid(space)]
+    # Random search: spread n_iter draws across the families
+    per_family = max(1, n_iter // len(grid))
+    found = []
+    for i, (family, space) in enumerate(grid.items()):
+        n_options = len(ParameterGrid(space))
+        found += [(family, params) for params in
+                  ParameterSampler(space, n_iter=min(per_family, n_options), random_state=seed + i)]
+    return found
+
+
+# Per-process copies of the training data and folds, set once by the initializer
+_SHARED = {}
+
+
+def _init_worker(X, y, folds, seed):
+    _SHARED.update(X=X, y=y, folds=folds, seed=seed)
+
+
+def _evaluate(candidate):
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    family, params = candidate
+    X, y, folds = _SHARED['X'], _SHARED['y'], _SHARED['folds']
+    scores, maes = [], []
+    fit_s = predict_s = 0.0
+    for train, valid in folds:
+        model = make_estimator(family, params, _SHARED['seed'])
+        started = time.perf_counter()
+        model.fit(X[train], y[train])
+        fit_s += time.perf_counter() - started
+        started = time.perf_counter()
+        pred = model.predict(X[valid])
+        predict_s += time.perf_counter() - started
+        scores.append(r2_score(y[valid], pred))
+        maes.append(mean_absolute_error(y[valid], pred))
+    return {
+        'family': family,
+        'params': params,
+        'cv_r2_mean': float(np.mean(scores)),
+        'cv_r2_std': float(np.std(scores)),
+        'cv_mae_mean': float(np.mean(maes)),
+        'fit_seconds': round(fit_s, 4),
+        'predict_seconds': round(predict_s, 4),
+    }
+
+
+def run_search(X, y, timestamps, mode='full', search='grid', n_iter=8, n_splits=None, n_jobs=None, seed=42,
+               families=None):
+    """Cross-validate every candidate; returns the leaderboard, best first."""
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    n_splits = n_splits or (3 if mode == 'smoke' else 5)
+    folds = time_series_folds(timestamps, n_splits)
+    todo = candidates(mode, search, n_iter, seed, families)
+
+    if n_jobs == 1:
+        _init_worker(X, y, folds, seed)
+        leaderboard = [_evaluate(c) for c in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(X, y, folds, seed)) as pool:
+            leaderboard = list(pool.map(_evaluate, todo))
+    leaderboard.sort(key=lambda row: row['cv_r2_mean'], reverse=True)
+    return leaderboard
@@ -0,0 +1,233 @@
+# NASA POWER daily-data client.
+# Fetches many sites and date ranges concurrently over one pooled session
+# (bounded connections, retries with exponential backoff) and keeps every
+# value in a local SQLite cache keyed by (lat, lon, parameter, date), so an
+# overlapping request only downloads the days it is missing. Results come
+# back as one columnar DataFrame (lat, lon, Date, one column per parameter).
+#
+# Days the API returns no data (or -999) for are cached as missing with the
+# time they were fetched. The API publishes with a lag of several days, so a
+# missing day fetched within LATENCY_DAYS of its date is only trusted for
+# MISSING_TTL seconds and then requested again; older gaps are final.
+#
+#   python nasa_power.py --site 40,-105 --start 20240912 --end 20250912
+#   python nasa_power.py --base-url http://127.0.0.1:8766 ...   (stub server)
+import argparse
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+BASE_URL = "https://power.larc.nasa.gov"
+ENDPOINT = "/api/temporal/daily/point"
+CACHE_PATH = ".nasa_power_cache.sqlite"
+DEFAULT_PARAMETERS = ["ALLSKY_SFC_SW_DWN", "T2M"]  # solar radiation, temperature
+# Column names the training pipeline expects (see nasa_power_data.csv)
+COLUMN_NAMES = {"ALLSKY_SFC_SW_DWN": "Solar_Radiation", "T2M": "Temperature"}
+FILL_VALUE = -999.0
+COORD_DECIMALS = 4
+LATENCY_DAYS = 7
+MISSING_TTL = 6 * 3600
+
+
+def _day_range(start, end):
+    return pd.date_range(pd.to_datetime(str(start), format="%Y%m%d"),
+                         pd.to_datetime(str(end), format="%Y%m%d"), freq="D")
+
+
+def _contiguous_ranges(days):
+    # Collapse sorted dates into (start, end) YYYYMMDD runs
+    if len(days) == 0:
+        return []
+    ordinals = days.to_numpy(dtype="datetime64[D]").astype(np.int64)
+    breaks = np.nonzero(np.diff(ordinals) != 1)[0] + 1
+    runs = []
+    for chunk in np.split(days, breaks):
+        runs.append((chunk[0].strftime("%Y%m%d"), chunk[-1].strftime("%Y%m%d")))
+    return runs
+
+
+class PowerCache:
+    def __init__(self, path=CACHE_PATH, latency_days=LATENCY_DAYS, missing_ttl=MISSING_TTL):
+        self.latency_days = latency_days
+        self.missing_ttl = missing_ttl
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS daily ("
+            " lat REAL, lon REAL, parameter TEXT, date INTEGER, value REAL, fetched_at REAL,"
+            " PRIMARY KEY (lat, lon, parameter, date))"
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(daily)")]
+        if "fetched_at" not in columns:
+            # Caches from before fetched_at: their missing rows are re-requested once
+            self.conn.execute("ALTER TABLE daily ADD COLUMN fetched_at REAL")
+        self.conn.commit()
+
+    def cached_dates(self, lat, lon, parameter, start, end, now=None):
+        # A missing value counts as cached while fresh, or for good once it was
+        # fetched after the API's publication lag for that day had passed
+        now = time.time() if now is None else now
+        rows = self.conn.execute(
+            "SELECT date FROM daily WHERE lat = ? AND lon = ? AND parameter = ? AND date BETWEEN ? AND ?"
+            " AND (value IS NOT NULL OR fetched_at > ?"
+            "      OR julianday(fetched_at, 'unixepoch') - julianday(substr(date, 1, 4) || '-' ||"
+            "         substr(date, 5, 2) || '-' || substr(date, 7, 2)) > ?)",
+            (lat, lon, parameter, int(start), int(end), now - self.missing_ttl, self.latency_days),
+        )
+        return {str(row[0]) for row in rows}
+
+    def load(self, lat, lon, parameters, start, end):
+        placeholders = ",".join("?" * len(parameters))
+        return pd.read_sql_query(
+            f"SELECT date, parameter, value FROM daily WHERE lat = ? AND lon = ?"
+            f" AND parameter IN ({placeholders}) AND date BETWEEN ? AND ?",
+            self.conn, params=(lat, lon, *parameters, int(start), int(end)),
+        )
+
+    def store(self, lat, lon, parameter_values, fetched_at=None):
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows = [
+            (lat, lon, parameter, int(date), None if value is None or value == FILL_VALUE else float(value),
+             fetched_at)
+            for parameter, values in parameter_values.items()
+            for date, value in values.items()
+        ]
+        self.conn.executemany("INSERT OR REPLACE INTO daily VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class NasaPowerClient:
+    def __init__(self, base_url=BASE_URL, cache_path=CACHE_PATH, max_workers=8, retries=3,
+                 backoff=0.5, timeout=30, community="RE", record_dir=None):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.base_url = base_url.rstrip("/")
+        self.cache = PowerCache(cache_path)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.community = community
+        self.record_dir = record_dir
+        self.requests_made = 0
+
+        retry = Retry(total=retries, backoff_factor=backoff, allowed_methods=["GET"],
+                      status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _missing(self, site, parameters, start, end):
+        # Missing (start, end) runs plus the parameters missing anywhere in them
+        wanted = _day_range(start, end)
+        wanted_keys = set(wanted.strftime("%Y%m%d"))
+        missing_days = set()
+        missing_params = []
+        for parameter in parameters:
+            absent = wanted_keys - self.cache.cached_dates(site[0], site[1], parameter, start, end)
+            if absent:
+                missing_days |= absent
+                missing_params.append(parameter)
+        days = wanted[wanted.strftime("%Y%m%d").isin(missing_days)]
+        return [(run, missing_params) for run in _contiguous_ranges(days)]
+
+    def _download(self, site, parameters, start, end):
+        params = {
+            "parameters": ",".join(parameters),
+            "community": self.community,
+            "latitude": site[0],
+            "longitude": site[1],
+            "start": start,
+            "end": end,
+            "format": "JSON",
+        }
+        response = self.session.get(self.base_url + ENDPOINT, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        payload = response.json()
+        if self.record_dir:
+            os.makedirs(self.record_dir, exist_ok=True)
+            name = f"{site[0]}_{site[1]}_{start}_{end}.json"
+            with open(os.path.join(self.record_dir, name), "w") as f:
+                json.dump(payload, f)
+        values = payload["properties"]["parameter"]
+        # Days the API has no data for are cached as missing (see PowerCache.cached_dates)
+        for day in _day_range(start, end).strftime("%Y%m%d"):
+            for parameter in parameters:
+                values.setdefault(parameter, {}).setdefault(day, None)
+        return site, values
+
+    def fetch(self, sites, start, end, parameters=DEFAULT_PARAMETERS, rename=True):
+        """Daily values for every site over [start, end] (YYYYMMDD), cache first."""
+        sites = [(round(float(lat), COORD_DECIMALS), round(float(lon), COORD_DECIMALS)) for lat, lon in sites]
+        jobs = [
+            (site, params, run_start, run_end)
+            for site in dict.fromkeys(sites)
+            for (run_start, run_end), params in self._missing(site, parameters, start, end)
+        ]
+        if jobs:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                downloads = list(pool.map(lambda job: self._download(*job), jobs))
+            self.requests_made += len(jobs)
+            # SQLite writes stay on the calling thread
+            for site, parameter_values in downloads:
+                self.cache.store(site[0], site[1], parameter_values)
+
+        frames = []
+        for lat, lon in dict.fromkeys(sites):
+            long = self.cache.load(lat, lon, parameters, start, end)
+            wide = long.pivot(index="date", columns="parameter", values="value").reindex(columns=parameters)
+            wide = wide.reset_index()
+            wide.insert(0, "lon", lon)
+            wide.insert(0, "lat", lat)
+            frames.append(wide)
+        result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        result = result.rename(columns={"date": "Date"})
+        result.columns.name = None
+        if rename:
+            result = result.rename(columns=COLUMN_NAMES)
+        return result
+
+
+def write_columnar(frame, path):
+    """Parquet for .parquet paths (needs pyarrow), CSV otherwise."""
+    if path.endswith(".parquet"):
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch NASA POWER daily data for many sites")
+    parser.add_argument("--site", action="append", required=True, help="lat,lon (repeatable)")
+    parser.add_argument("--start", default="20240912", help="YYYYMMDD")
+    parser.add_argument("--end", default="20250912", help="YYYYMMDD")
+    parser.add_argument("--parameters", default=",".join(DEFAULT_PARAMETERS))
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--cache", default=CACHE_PATH)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--record-dir", help="Save raw JSON responses (for the stub server)")
+    parser.add_argument("--out", default="nasa_power_sites.parquet")
+    args = parser.parse_args(argv)
+
+    sites = [tuple(float(v) for v in site.split(",")) for site in args.site]
+    client = NasaPowerClient(args.base_url, args.cache, max_workers=args.workers, record_dir=args.record_dir)
+    started = time.perf_counter()
+    frame = client.fetch(sites, args.start, args.end, args.parameters.split(","))
+    elapsed = time.perf_counter() - started
+    write_columnar(frame, args.out)
+    print(f"✅ {len(frame)} site-days for {len(sites)} sites ({client.requests_made} requests, {elapsed:.2f}s)")
+    print(f"✅ Saved: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+# Local stand-in for the NASA POWER daily point API, for offline runs.
+# Replays recorded JSON responses from fixtures/nasa_power/ (or any
+# directory of files saved with `nasa_power.py --record-dir`), slicing them
+# to the requested parameters and date range. Requests for other locations
+# are answered from the nearest recorded site.
+#
+#   python nasa_power_stub.py --port 8766
+#   python nasa_power.py --base-url http://127.0.0.1:8766 --site 40,-105
+import argparse
+import glob
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "nasa_power")
+
+
+def load_fixtures(fixture_dir=FIXTURE_DIR):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.json"))):
+        with open(path) as f:
+            payload = json.load(f)
+        lon, lat = payload["geometry"]["coordinates"][:2]
+        fixtures.append(((lat, lon), payload))
+    if not fixtures:
+        raise FileNotFoundError(f"No recorded responses in {fixture_dir}")
+    return fixtures
+
+
+class StubState:
+    def __init__(self, fixtures, fail_every=0):
+        self.fixtures = fixtures
+        self.fail_every = fail_every
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def respond(self, query):
+        lat, lon = float(query["latitude"][0]), float(query["longitude"][0])
+        start, end = query["start"][0], query["end"][0]
+        parameters = query["parameters"][0].split(",")
+        _, recorded = min(self.fixtures, key=lambda item: (item[0][0] - lat) ** 2 + (item[0][1] - lon) ** 2)
+        values = recorded["properties"]["parameter"]
+        sliced = {
+            parameter: {day: value for day, value in values.get(parameter, {}).items() if start <= day <= end}
+            for parameter in parameters
+        }
+        return {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {"parameter": sliced},
+            "header": {**recorded.get("header", {}), "start": start, "end": end},
+        }
+
+
+def make_handler(state):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            with state.lock:
+                state.requests += 1
+                count = state.requests
+            if url.path == "/stats":
+                return self._send(200, {"requests": count - 1})
+            if url.path != "/api/temporal/daily/point":
+                return self._send(404, {"messages": ["Not found"]})
+            if state.fail_every and count % state.fail_every == 0:
+                # Injected transient failure to exercise client retries
+                return self._send(503, {"messages": ["Service temporarily unavailable"]})
+            try:
+                self._send(200, state.respond(parse_qs(url.query)))
+            except (KeyError, ValueError) as e:
+                self._send(422, {"messages": [f"Invalid request: {e}"]})
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub(port=0, fixture_dir=FIXTURE_DIR, fail_every=0):
+    """Start the stub in a background thread; returns (server, base_url, state)."""
+    state = StubState(load_fixtures(fixture_dir), fail_every)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline NASA POWER stub server")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--fail-every", type=int, default=0, help="Return 503 on every Nth request")
+    args = parser.parse_args()
+    state = StubState(load_fixtures(args.fixtures), args.fail_every)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(state))
+    print(f"🛰️ NASA POWER stub on http://127.0.0.1:{args.port} ({len(state.fixtures)} recorded sites)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,298 @@
+# Tilt/azimuth optimization over the trained model.
+# For one site and a weather history, everything that does not depend on
+# the panel orientation (calendar features, solar position, the GHI ->
+# DNI/DHI split, NASA columns, system capacity) is computed once. Each
+# batch of candidate orientations then only fills the orientation columns
+# (tilt_deg, azimuth_deg, tilt_efficiency, poa_w_m2, physics_kwh) into a
+# reused copy of that base matrix, kept in the model's input dtype (see
+# inference.py), and runs one predict call per block. Night hours (no
+# irradiance) are skipped.
+#
+# A coarse tilt x azimuth grid is refined with golden-section searches
+# around the best grid cell. The physics baseline (server.js chain on the
+# transposed POA) is optimized alongside for comparison.
+#
+# Model cost is orientations x daylight hours rows. Past SCREEN_HOURS
+# daylight hours the grid is only screened on a fixed random sample of
+# SCREEN_HOURS of them (totals scaled up); the best cell is then re-scored
+# and refined on every hour, so the reported optimum is exact. For a year
+# of weather (4380 daylight hours) and the default 456-cell grid this cuts
+# the model rows from 2.2M to 0.43M: 1.9 s instead of 7.4 s on the shipped
+# forest (~230-300k rows/s, benchmarks/bench_orientation.py), same optimum.
+# Thousands of orientations can be screened over a year in seconds, but
+# every full-year evaluation still costs one forest pass over all daylight
+# hours (~15 ms); that throughput is the limit.
+#
+#   python orientation_optimizer.py weather.csv --lat 37.77 --lon -122.42
+import argparse
+import copy
+import time
+
+import numpy as np
+import pandas as pd
+
+from batch_forecast import CHUNK_ROWS, DEFAULT_SYSTEM, _weather_columns
+from features import compute_features
+from inference import Predictor
+from model_registry import load_active
+from physics_model import physics_columns, hourly_energy
+from solar_geometry import (angle_of_incidence, erbs_decomposition, solar_position, time_arrays,
+                            transpose_to_plane)
+
+ORIENTATION_FEATURES = ('tilt_deg', 'azimuth_deg', 'tilt_efficiency', 'poa_w_m2', 'physics_kwh')
+GOLDEN = (np.sqrt(5) - 1) / 2
+SCREEN_HOURS = 500
+
+
+class OrientationProblem:
+    """Annual yield of one site as a function of (tilt, azimuth)."""
+
+    def __init__(self, model, features, weather, site=None, residual=False, chunk_rows=CHUNK_ROWS):
+        # A Predictor validated at model load may be passed as the model
+        self.predictor = model if isinstance(model, Predictor) else Predictor(model, features)
+        self.features = self.predictor.features
+        self.residual = residual
+        self.chunk_rows = chunk_rows
+        self.site = {**DEFAULT_SYSTEM, **(site or {})}
+        self.evaluations = 0
+        self.model_rows = 0
+
+        weather = pd.DataFrame(weather)
+        weather['timestamp_utc'] = pd.to_datetime(weather['timestamp_utc'])
+        weather = weather.sort_values('timestamp_utc', kind='stable').reset_index(drop=True)
+        self.n_hours = len(weather)
+        columns = _weather_columns(weather)
+        daylight = np.nan_to_num(columns['ghi_w_m2']) > 0
+        columns = {name: values[daylight] for name, values in columns.items()}
+        n = int(daylight.sum())
+        for col in ('lat', 'lon', 'num_panels', 'panel_area_m2', 'panel_efficiency'):
+            columns[col] = np.full(n, float(self.site[col]))
+        self.columns = columns
+
+        # Orientation-independent part, computed once
+        day_of_year, hour = time_arrays(columns['timestamp_utc'])
+        position = solar_position(day_of_year, hour, self.site['lat'], self.site['lon'])
+        self.zenith, self.solar_azimuth = position['zenith'], position['azimuth']
+        self.dni, self.dhi = erbs_decomposition(columns['ghi_w_m2'], self.zenith, day_of_year)
+
+        fixed = [f for f in self.features if f not in ORIENTATION_FEATURES]
+        # Orientation inputs are placeholders here; no fixed feature depends on them
+        placeholder = {**columns, 'tilt_deg': np.zeros(n), 'azimuth_deg': np.full(n, 180.0)}
+        computed = {**columns, **compute_features(placeholder, fixed)}
+        self.base = np.zeros((n, len(self.features)), dtype=self.predictor.dtype)
+        self._blocks = None
+        for j, name in enumerate(self.features):
+            if name not in ORIENTATION_FEATURES:
+                self.base[:, j] = computed[name]
+        nan_mask = np.isnan(self.base)
+        if nan_mask.any():
+            self.base[nan_mask] = np.take(np.nanmedian(self.base, axis=0), np.nonzero(nan_mask)[1])
+
+    def sample(self, n_rows, seed=0):
+        """The same problem on a fixed random sample of n_rows daylight hours."""
+        rows = np.sort(np.random.default_rng(seed).choice(len(self.base), n_rows, replace=False))
+        sampled = copy.copy(self)
+        sampled.base = self.base[rows]
+        sampled.zenith, sampled.solar_azimuth = self.zenith[rows], self.solar_azimuth[rows]
+        sampled.dni, sampled.dhi = self.dni[rows], self.dhi[rows]
+        sampled.columns = {name: values[rows] for name, values in self.columns.items()}
+        sampled.evaluations = sampled.model_rows = 0
+        sampled._blocks = None
+        return sampled
+
+    def _orientation_columns(self, tilt, azimuth):
+        # (orientations, hours) arrays for every orientation-dependent feature
+        tilt = np.asarray(tilt, dtype=float)[:, None]
+        azimuth = np.asarray(azimuth, dtype=float)[:, None]
+        aoi = angle_of_incidence(self.zenith, self.solar_azimuth, tilt, azimuth)
+        shape = (len(tilt), len(self.zenith))
+        physics_inputs = {**self.columns, 'tilt_deg': tilt}
+        return {
+            'tilt_deg': np.broadcast_to(tilt, shape),
+            'azimuth_deg': np.broadcast_to(azimuth, shape),
+            'tilt_efficiency': np.maximum(np.cos(np.radians(aoi)), 0.0),
+            'poa_w_m2': transpose_to_plane(self.columns['ghi_w_m2'], self.dni, self.dhi, aoi, tilt),
+            'physics_kwh': np.broadcast_to(physics_columns(physics_inputs), shape),
+        }
+
+    def _block(self, orientations):
+        # (orientations, hours, features) input block in the model's dtype, reused across evaluations
+        if self._blocks is None or len(self._blocks) < orientations:
+            self._blocks = np.empty((orientations, len(self.base), len(self.features)), dtype=self.predictor.dtype)
+        return self._blocks
+
+    def evaluate(self, tilt, azimuth, with_model=True):
+        """Model and physics yield (kWh over the weather history) per orientation."""
+        tilt = np.atleast_1d(np.asarray(tilt, dtype=float))
+        azimuth = np.atleast_1d(np.asarray(azimuth, dtype=float))
+        n_hours = len(self.base)
+        model_kwh = np.zeros(len(tilt))
+        physics_kwh = np.zeros(len(tilt))
+        block = max(1, self.chunk_rows // max(n_hours, 1))
+        for start in range(0, len(tilt), block):
+            t, a = tilt[start:start + block], azimuth[start:start + block]
+            oriented = self._orientation_columns(t, a)
+            if with_model:
+                X = self._block(block)[:len(t)]
+                X[:] = self.base
+                for j, name in enumerate(self.features):
+                    if name in oriented:
+                        X[:, :, j] = oriented[name]
+                predictions = self.predictor.predict_matrix(X.reshape(-1, len(self.features)))
+                predictions = predictions.reshape(len(t), n_hours)
+                if self.residual:
+                    predictions = predictions + oriented['physics_kwh']
+                model_kwh[start:start + block] = predictions.sum(axis=1)
+                self.model_rows += predictions.size
+            # Physics baseline on the transposed POA (the JS chain's ghi * cos(tilt) ignores azimuth)
+            physics_kwh[start:start + block] = hourly_energy(
+                oriented['poa_w_m2'], self.columns['temperature_C'],
+                num_panels=self.site['num_panels'], panel_area=self.site['panel_area_m2'],
+                panel_efficiency=self.site['panel_efficiency'], tilt_deg=0,
+            ).sum(axis=1)
+        self.evaluations += len(tilt)
+        return model_kwh, physics_kwh
+
+    def annualize(self, kwh):
+        return kwh * 8760.0 / max(self.n_hours, 1)
+
+
+def grid_search(problem, tilts, azimuths, screen=None):
+    """Yield of every grid cell; with a sampled `screen` problem the model column is its scaled estimate."""
+    tilt_grid, azimuth_grid = np.meshgrid(np.asarray(tilts, float), np.asarray(azimuths, float), indexing='ij')
+    if screen is None:
+        model_kwh, physics_kwh = problem.evaluate(tilt_grid.ravel(), azimuth_grid.ravel())
+    else:
+        model_kwh, _ = screen.evaluate(tilt_grid.ravel(), azimuth_grid.ravel())
+        model_kwh *= len(problem.base) / len(screen.base)
+        _, physics_kwh = problem.evaluate(tilt_grid.ravel(), azimuth_grid.ravel(), with_model=False)
+    return pd.DataFrame({
+        'tilt_deg': tilt_grid.ravel(),
+        'azimuth_deg': azimuth_grid.ravel(),
+        'model_kwh': model_kwh,
+        'physics_kwh': physics_kwh,
+    })
+
+
+def golden_section(f, lo, hi, tol=0.25):
+    """Maximize a unimodal f on [lo, hi]; returns (x, f(x))."""
+    a, b = lo, hi
+    c, d = b - GOLDEN * (b - a), a + GOLDEN * (b - a)
+    fc, fd = f(c), f(d)
+    while b - a > tol:
+        if fc >= fd:
+            b, d, fd = d, c, fc
+            c = b - GOLDEN * (b - a)
+            fc = f(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + GOLDEN * (b - a)
+            fd = f(d)
+    return (c, fc) if fc >= fd else (d, fd)
+
+
+def refine(problem, column, tilt, azimuth, best, tilt_step, azimuth_step, rounds=2, tol=0.25):
+    # Alternating 1-D golden-section searches within one grid step of the best cell
+    with_model = column == 'model_kwh'
+    value = lambda t, a: problem.evaluate([t], [a], with_model)[0 if with_model else 1][0]
+    for _ in range(rounds):
+        t, v = golden_section(lambda x: value(x, azimuth), max(0.0, tilt - tilt_step),
+                              min(90.0, tilt + tilt_step), tol)
+        if v > best:
+            tilt, best = t, v
+        a, v = golden_section(lambda x: value(tilt, x), azimuth - azimuth_step, azimuth + azimuth_step, tol)
+        if v > best:
+            azimuth, best = a % 360.0, v
+    return tilt, azimuth, best
+
+
+def optimize_orientation(model, features, weather, site=None, residual=False, tilt_step=5.0,
+                         azimuth_step=15.0, azimuth_range=(0.0, 360.0), refine_rounds=2,
+                         screen_hours=SCREEN_HOURS):
+    """Yield-maximizing (tilt, azimuth) for the model and the physics baseline."""
+    started = time.perf_counter()
+    problem = OrientationProblem(model, features, weather, site, residual)
+    screen = None
+    if screen_hours and len(problem.base) > screen_hours:
+        screen = problem.sample(screen_hours)
+    setup_seconds = time.perf_counter() - started
+
+    tilts = np.arange(0.0, 90.0 + 1e-9, tilt_step)
+    azimuths = np.arange(azimuth_range[0], azimuth_range[1] - 1e-9, azimuth_step)
+    grid = grid_search(problem, tilts, azimuths, screen)
+    grid_seconds = time.perf_counter() - started - setup_seconds
+
+    result = {'site': problem.site, 'hours': problem.n_hours, 'daylight_hours': len(problem.base)}
+    for name, column in (('model', 'model_kwh'), ('physics', 'physics_kwh')):
+        row = grid.loc[grid[column].idxmax()]
+        tilt, azimuth, best = row['tilt_deg'], row['azimuth_deg'], row[column]
+        if screen is not None and column == 'model_kwh':
+            # The screened total is an estimate; refine from the cell's exact yield
+            best = problem.evaluate([tilt], [azimuth])[0][0]
+        if refine_rounds:
+            tilt, azimuth, best = refine(problem, column, tilt, azimuth, best, tilt_step, azimuth_step,
+                                         refine_rounds)
+        result[name] = {
+            'tilt_deg': round(float(tilt), 2),
+            'azimuth_deg': round(float(azimuth), 2),
+            'total_kwh': round(float(best), 3),
+            'annual_kwh': round(float(problem.annualize(best)), 3),
+        }
+    result.update({
+        'orientations_evaluated': problem.evaluations,
+        'orientations_screened': screen.evaluations if screen is not None else 0,
+        'screen_hours': len(screen.base) if screen is not None else None,
+        'model_rows': problem.model_rows + (screen.model_rows if screen is not None else 0),
+        'grid_size': len(grid),
+        'setup_seconds': round(setup_seconds, 4),
+        'grid_seconds': round(grid_seconds, 4),
+        'seconds': round(time.perf_counter() - started, 4),
+    })
+    return result, grid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find the yield-maximizing panel orientation")
+    parser.add_argument("weather", help="CSV of hourly weather: timestamp_utc, ghi_w_m2, temperature_C")
+    parser.add_argument("--lat", type=float, default=DEFAULT_SYSTEM['lat'])
+    parser.add_argument("--lon", type=float, default=DEFAULT_SYSTEM['lon'])
+    parser.add_argument("--num-panels", type=int, default=DEFAULT_SYSTEM['num_panels'])
+    parser.add_argument("--tilt-step", type=float, default=5.0, help="Coarse grid step before refinement")
+    parser.add_argument("--azimuth-step", type=float, default=15.0)
+    parser.add_argument("--no-refine", action="store_true")
+    parser.add_argument("--screen-hours", type=int, default=SCREEN_HOURS,
+                        help="Screen the grid on this many sampled daylight hours (0: every hour)")
+    parser.add_argument("--model", help="Model file (default: the current registry version, else trained_model.joblib)")
+    parser.add_argument("--metadata", help="Metadata file (default: as --model, else model_metadata.json)")
+    parser.add_argument("--grid-out", help="Save the full grid as CSV")
+    args = parser.parse_args(argv)
+
+    model, model_metadata = load_active(args.model, args.metadata)
+    try:
+        model = Predictor(model, model_metadata['features'], metadata=model_metadata)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    weather = pd.read_csv(args.weather)
+    site = {'lat': args.lat, 'lon': args.lon, 'num_panels': args.num_panels}
+
+    print(f"🧭 Optimizing orientation over {len(weather)} weather hours...")
+    result, grid = optimize_orientation(
+        model, model_metadata['features'], weather, site,
+        residual=model_metadata.get('target') == 'residual',
+        tilt_step=args.tilt_step, azimuth_step=args.azimuth_step, refine_rounds=0 if args.no_refine else 2,
+        screen_hours=args.screen_hours,
+    )
+    for name in ('model', 'physics'):
+        best = result[name]
+        print(f"✅ {name}: tilt {best['tilt_deg']}°, azimuth {best['azimuth_deg']}° -> {best['annual_kwh']:.1f} kWh/yr")
+    print(f"📊 {result['orientations_evaluated']} orientations ({result['orientations_screened']} screened) "
+          f"in {result['seconds']:.2f}s")
+    if args.grid_out:
+        grid.to_csv(args.grid_out, index=False)
+        print(f"✅ Saved: {args.grid_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
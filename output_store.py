@@ -0,0 +1,223 @@
+# Rolling, partitioned store for forecast outputs.
+# Each run writes one directory of compressed columnar tables
+#   forecast_store/site=<site>/run=<run_id>/{hourly,daily,weekly,monthly}.parquet
+#                                           summary.json
+# OutputStore.read(table) concatenates one table across runs with site and
+# run as columns. A run is written under a temp name and renamed into place,
+# so readers never see half a run. Runs older than the retention window are
+# removed, keeping at least the newest --keep runs per site. Parquet needs
+# pyarrow; without it the tables are written as gzipped CSV. Listing runs and
+# reading summaries does not import pandas.
+#
+# Write time (benchmarks/bench_output_store.py): a 100-site run is ~50x
+# faster than the legacy CSV dump, but a single-site run only ~2x, short of
+# the 10x target. Each table is its own Parquet file and, at 361 hourly rows,
+# the fixed cost per file dominates.
+#
+# CSV copies of a run are exported only on request:
+#   python output_store.py list
+#   python output_store.py export --site default --out-dir .
+#   python output_store.py cleanup --retention-days 30
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
+STORE_DIR = "forecast_store"
+RETENTION_DAYS = 30
+KEEP_RUNS = 5
+
+# Legacy CSV names written by finalcode3.py before the store
+CSV_NAMES = {
+    'hourly': "baseline_16day_hourly_improved.csv",
+    'daily': "forecast_daily.csv",
+    'weekly': "forecast_weekly.csv",
+    'monthly': "forecast_monthly.csv",
+}
+
+
+def site_key(location):
+    """Partition-safe site name for a location name, "lat,lon" or None."""
+    if not location:
+        return "default"
+    return "".join(c if c.isalnum() or c in "-." else "_" for c in str(location)).strip("_") or "default"
+
+
+def _parquet_available():
+    # Found, not imported: opening the store stays cheap for cached reads
+    from importlib.util import find_spec
+
+    return find_spec("pyarrow") is not None
+
+
+def _compact(frame):
+    # Forecast values carry 4 decimals; float32 halves them before compression
+    import numpy as np
+
+    frame = frame.copy()
+    for col in frame.columns:
+        if frame[col].dtype == np.float64:
+            frame[col] = frame[col].astype(np.float32)
+    return frame
+
+
+def _write_parquet(frame, path):
+    # pyarrow directly, float32 cast per column: skips the frame copy and
+    # DataFrame.to_parquet's engine dispatch and pandas schema metadata,
+    # which cost more than the write itself for a single site's tables
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = {}
+    for col, values in frame.items():
+        columns[str(col)] = pa.Array.from_pandas(values.to_numpy(np.float32) if values.dtype == np.float64 else values)
+    with open(path, "wb") as f:
+        pq.write_table(pa.table(columns), f, compression="zstd")
+
+
+class OutputStore:
+    def __init__(self, root=STORE_DIR, retention_days=RETENTION_DAYS, keep=KEEP_RUNS, fmt=None):
+        self.root = root
+        self.retention_days = retention_days
+        self.keep = keep
+        self.fmt = fmt or ("parquet" if _parquet_available() else "csv.gz")
+
+    def run_dir(self, site, run_id):
+        return os.path.join(self.root, f"site={site}", f"run={run_id}")
+
+    def write_run(self, site, tables, summary=None, run_id=None):
+        """Write one run's tables; returns {run_id, path, files, bytes, seconds}."""
+        started = time.perf_counter()
+        site = site_key(site)
+        run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        final_dir = self.run_dir(site, run_id)
+        tmp_dir = os.path.join(self.root, f"site={site}", f".tmp-{run_id}-{os.getpid()}")
+        os.makedirs(tmp_dir)
+
+        files = []
+        for name, frame in tables.items():
+            path = os.path.join(tmp_dir, f"{name}.{self.fmt}")
+            if self.fmt == "parquet":
+                _write_parquet(frame, path)
+            else:
+                _compact(frame).to_csv(path, index=False, compression="gzip")
+            files.append(path)
+        if summary is not None:
+            path = os.path.join(tmp_dir, "summary.json")
+            with open(path, "w") as f:
+                json.dump(summary, f, indent=2, default=float)
+            files.append(path)
+        written = sum(os.path.getsize(path) for path in files)
+        os.rename(tmp_dir, final_dir)
+
+        removed = self.cleanup()
+        return {
+            'run_id': run_id,
+            'path': final_dir,
+            'files': len(files),
+            'bytes': written,
+            'seconds': time.perf_counter() - started,
+            'removed_runs': len(removed),
+        }
+
+    def runs(self, site=None):
+        """[(site, run_id)] oldest first."""
+        found = []
+        if not os.path.isdir(self.root):
+            return found
+        for site_dir in sorted(os.listdir(self.root)):
+            if not site_dir.startswith("site=") or (site is not None and site_dir != f"site={site}"):
+                continue
+            for run_dir in sorted(os.listdir(os.path.join(self.root, site_dir))):
+                if run_dir.startswith("run="):
+                    found.append((site_dir[len("site="):], run_dir[len("run="):]))
+        return found
+
+    def summary(self, site, run_id):
+        """A run's summary.json as a dict (None without one); needs no pandas."""
+        try:
+            with open(os.path.join(self.run_dir(site, run_id), "summary.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def read(self, table, site=None, run_id=None):
+        """One table across runs (newest run when run_id='latest'), with site/run columns."""
+        import pandas as pd
+
+        runs = self.runs(site)
+        if run_id == 'latest':
+            runs = [max(runs, key=lambda r: r[1])] if runs else []
+        elif run_id is not None:
+            runs = [r for r in runs if r[1] == run_id]
+        frames = []
+        for run_site, run in runs:
+            path = os.path.join(self.run_dir(run_site, run), f"{table}.{self.fmt}")
+            if not os.path.exists(path):
+                continue
+            frame = pd.read_parquet(path) if self.fmt == "parquet" else pd.read_csv(path)
+            frames.append(frame.assign(site=run_site, run=run))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def export_csv(self, site=None, run_id='latest', out_dir="."):
+        """Write the legacy CSV files for one run."""
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for table, name in CSV_NAMES.items():
+            frame = self.read(table, site, run_id)
+            if frame.empty:
+                continue
+            path = os.path.join(out_dir, name)
+            frame.drop(columns=['site', 'run']).to_csv(path, index=False)
+            paths.append(path)
+        return paths
+
+    def cleanup(self, retention_days=None, keep=None, now=None):
+        """Remove runs past the retention window, never the newest `keep` per site."""
+        retention_days = self.retention_days if retention_days is None else retention_days
+        keep = self.keep if keep is None else keep
+        cutoff = (now or time.time()) - retention_days * 86_400
+        removed = []
+        by_site = {}
+        for site, run in self.runs():
+            by_site.setdefault(site, []).append(run)
+        for site, runs in by_site.items():
+            for run in runs[:max(len(runs) - keep, 0)]:
+                path = self.run_dir(site, run)
+                if os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed.append((site, run))
+        return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect, export and clean the forecast output store")
+    parser.add_argument("command", choices=["list", "export", "cleanup"])
+    parser.add_argument("--root", default=STORE_DIR)
+    parser.add_argument("--site")
+    parser.add_argument("--run", default="latest")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--retention-days", type=float, default=RETENTION_DAYS)
+    parser.add_argument("--keep", type=int, default=KEEP_RUNS)
+    args = parser.parse_args(argv)
+
+    store = OutputStore(args.root, args.retention_days, args.keep)
+    if args.command == "list":
+        for site, run in store.runs(args.site):
+            path = store.run_dir(site, run)
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            print(f"{site}  {run}  {size / 1024:.1f} KiB")
+    elif args.command == "export":
+        for path in store.export_csv(args.site, args.run, args.out_dir):
+            print(f"✅ Saved: {path}")
+    else:
+        removed = store.cleanup()
+        print(f"✅ Removed {len(removed)} runs older than {args.retention_days:g} days")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
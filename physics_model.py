@@ -0,0 +1,71 @@
+# NumPy port of calculateHourlyEnergy() from server.js.
+# Same chain - POA from tilt, NOCT cell temperature, temperature coefficient,
+# soiling, system derate, inverter efficiency and clipping - evaluated over
+# whole arrays at once. Inputs broadcast, so (sites, 1) system parameters
+# against (hours,) weather give a (sites, hours) result in one call.
+#
+# Used as a feature (physics_kwh), as the baseline for residual training
+# (merge2csv5.py --residual) and for physics + ML serving (finalcode3.py).
+import numpy as np
+
+# Defaults of the /baseline-16day route in server.js
+PHYSICS_DEFAULTS = {
+    'num_panels': 20,
+    'panel_area': 1.6,
+    'panel_efficiency': 0.2,
+    'inverter_efficiency': 0.96,
+    'tilt_deg': 30,
+    'temp_coeff': -0.004,
+    'soiling_factor': 0.95,
+    'system_derate': 0.86,
+    'inverter_rated_power': None,  # W; None or <= 0 disables clipping
+    'noct': 45,
+}
+
+
+def hourly_energy(ghi, temp_c, num_panels=20, panel_area=1.6, panel_efficiency=0.2,
+                  inverter_efficiency=0.96, tilt_deg=30, temp_coeff=-0.004, soiling_factor=0.95,
+                  system_derate=0.86, inverter_rated_power=None, noct=45, decimals=None):
+    """AC energy in kWh per hour; missing ghi/temperature give 0 like the JS version.
+
+    decimals=4 reproduces the JS `toFixed(4)` rounding.
+    """
+    ghi = np.asarray(ghi, dtype=float)
+    temp_c = np.asarray(temp_c, dtype=float)
+    missing = np.isnan(ghi) | np.isnan(temp_c)
+
+    poa = ghi * np.cos(np.radians(tilt_deg))
+    cell_temp = temp_c + (np.asarray(noct, dtype=float) - 20) * (poa / 800.0)
+    temp_factor = 1 + temp_coeff * (cell_temp - 25)
+    dc_power_w = poa * np.multiply(panel_area, panel_efficiency) * num_panels * temp_factor
+    ac_power_w = dc_power_w * soiling_factor * system_derate * inverter_efficiency
+    if inverter_rated_power is not None:
+        rated = np.asarray(inverter_rated_power, dtype=float)
+        clip = np.nan_to_num(rated, nan=0.0) > 0
+        ac_power_w = np.where(clip, np.minimum(ac_power_w, rated), ac_power_w)
+
+    energy = np.where(missing, 0.0, ac_power_w / 1000)
+    if decimals is not None:
+        energy = np.round(energy, decimals)
+    return energy
+
+
+def physics_columns(columns):
+    """hourly_energy() over a mapping of arrays using the telemetry column names.
+
+    Panel specs, inverter efficiency and inverter_max_ac_kw (kW, used as the
+    clipping limit) are taken from the columns when present.
+    """
+    def column(name, default):
+        return np.asarray(columns[name], dtype=float) if name in columns else default
+
+    rated_kw = column('inverter_max_ac_kw', None)
+    return hourly_energy(
+        columns['ghi_w_m2'], columns['temperature_C'],
+        num_panels=column('num_panels', PHYSICS_DEFAULTS['num_panels']),
+        panel_area=column('panel_area_m2', PHYSICS_DEFAULTS['panel_area']),
+        panel_efficiency=column('panel_efficiency', PHYSICS_DEFAULTS['panel_efficiency']),
+        inverter_efficiency=column('inverter_efficiency', PHYSICS_DEFAULTS['inverter_efficiency']),
+        tilt_deg=column('tilt_deg', PHYSICS_DEFAULTS['tilt_deg']),
+        inverter_rated_power=None if rated_kw is None else rated_kw * 1000,
+    )
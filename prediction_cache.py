@@ -0,0 +1,325 @@
+# Memoized predictions for repeated, near-identical inputs.
+# Forecast requests keep sending the same standard systems (20 panels, 30°
+# tilt, 180° azimuth) and irradiance/temperature values that repeat at
+# sensor resolution. CachedPredictor keys each row on its raw inputs - the
+# timestamp, weather, site and system columns the features are computed
+# from (features.INPUT_COLUMNS, plus model features taken as-is) - snapped
+# to a grid (RESOLUTION, e.g. 1 W/m² and 0.1 °C; unlisted inputs are used
+# as-is). Derived features such as solar_elevation, poa_w_m2 and physics_kwh
+# are not part of the key: they follow from the inputs, and quantizing them
+# separately split one input row over many keys. The rows are de-duplicated,
+# answered from a bounded in-process LRU and then an optional on-disk SQLite
+# tier, and only the remaining unique rows have their features recomputed
+# from the snapped inputs and go to the model in one batch. The model always
+# sees the snapped row, so a cached value does not depend on which raw value
+# came first. Rows with a missing (NaN) input skip the cache.
+#
+# The cache is bound to a key built from the model version, its training
+# date, the feature list and the resolution. Binding a new key (the
+# prediction server does this on every model load or hot swap) empties the
+# memory tier and switches to that key's database file; requests still
+# running on the old model neither read nor write the new entries. Database
+# files are named by model version and only those of versions older than
+# every version the registry still retains are deleted (prune), so another
+# process serving a retained version keeps its file.
+#
+#   cache = PredictionCache(capacity=100_000, disk_dir=".prediction_cache")
+#   predictor = CachedPredictor(model, metadata['features'], cache, model_key(metadata, cache.resolution),
+#                               metadata=metadata)
+#   predictions = predictor.predict(columns)      # predict_matrix/predict_trees skip the cache
+#   cache.prune(ModelRegistry().versions())
+#   cache.stats()                                 # hit rate, model rows, latency
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from features import FEATURE_REGISTRY, INPUT_COLUMNS, compute_features
+from inference import CHUNK_ROWS, Predictor
+
+CAPACITY = 100_000
+CACHE_DIR = ".prediction_cache"
+# Steps for raw inputs; timestamps are keyed in whole seconds
+RESOLUTION = {
+    'ghi_w_m2': 1.0,
+    'temperature_C': 0.1,
+    'Temperature': 0.1,
+    'Solar_Radiation': 0.001,
+}
+SQL_BATCH = 500
+DB_PATTERN = re.compile(r"predictions-v(\d+)-[0-9a-f]+\.sqlite$")
+
+
+def parse_resolution(text):
+    """'ghi_w_m2=5,temperature_C=0.5' -> {'ghi_w_m2': 5.0, 'temperature_C': 0.5}."""
+    resolution = {}
+    for item in filter(None, (part.strip() for part in (text or "").split(","))):
+        name, _, step = item.partition("=")
+        try:
+            resolution[name.strip()] = float(step)
+        except ValueError:
+            raise ValueError(f"Bad cache resolution {item!r}; expected feature=step") from None
+    return resolution
+
+
+def model_key(metadata, resolution):
+    """Cache namespace for one model version at one quantization."""
+    identity = {
+        'version': metadata.get('model_version'),
+        'training_date': metadata.get('training_date'),
+        'features': metadata.get('features'),
+        'resolution': resolution,
+    }
+    return hashlib.sha1(json.dumps(identity, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class PredictionCache:
+    """Bounded LRU of quantized feature row -> prediction, plus an optional SQLite tier."""
+
+    def __init__(self, capacity=CAPACITY, resolution=None, disk_dir=None):
+        self.capacity = capacity
+        self.resolution = {**RESOLUTION, **(resolution or {})}
+        self.disk_dir = disk_dir
+        self.key = None
+        self._entries = OrderedDict()
+        self._db = None
+        self._path = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.lookups = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.model_rows = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lookup_seconds = 0.0
+        self.model_seconds = 0.0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def bind(self, key, version=None):
+        """Serve `key`'s model from now on; anything cached for another model is dropped."""
+        with self._lock:
+            if key == self.key:
+                return
+            if self.key is not None:
+                self.invalidations += 1
+            self.key = key
+            self._entries.clear()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            if self.disk_dir:
+                tag = key if version is None else f"v{int(version):04d}-{key}"
+                self._path = os.path.join(self.disk_dir, f"predictions-{tag}.sqlite")
+                self._db = sqlite3.connect(self._path, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS predictions (key BLOB PRIMARY KEY, value REAL)")
+
+    def prune(self, retained_versions):
+        """Delete the database files of model versions older than every retained one."""
+        if not self.disk_dir or not retained_versions:
+            return []
+        oldest = min(retained_versions)
+        removed = []
+        with self._lock:
+            for path in glob.glob(os.path.join(self.disk_dir, "predictions-v*.sqlite")):
+                match = DB_PATTERN.search(os.path.basename(path))
+                if match and int(match.group(1)) < oldest and path != self._path:
+                    os.remove(path)
+                    removed.append(path)
+        return removed
+
+    def get_many(self, key, rows):
+        """(values, found) for a list of row keys; nothing is found for a stale model key."""
+        values = np.zeros(len(rows))
+        found = np.zeros(len(rows), dtype=bool)
+        with self._lock:
+            if key != self.key:
+                return values, found
+            for i, row in enumerate(rows):
+                value = self._entries.get(row)
+                if value is not None:
+                    self._entries.move_to_end(row)
+                    values[i] = value
+                    found[i] = True
+            if self._db is not None and not found.all():
+                missing = {rows[i]: i for i in np.flatnonzero(~found)}
+                pending = list(missing)
+                for start in range(0, len(pending), SQL_BATCH):
+                    batch = pending[start:start + SQL_BATCH]
+                    query = f"SELECT key, value FROM predictions WHERE key IN ({','.join('?' * len(batch))})"
+                    for row, value in self._db.execute(query, batch):
+                        i = missing[bytes(row)]
+                        values[i] = value
+                        found[i] = True
+                        self._remember(bytes(row), value)
+                        self.disk_hits += 1
+        return values, found
+
+    def put_many(self, key, rows, values):
+        with self._lock:
+            if key != self.key:
+                return
+            for row, value in zip(rows, values):
+                self._remember(row, float(value))
+            if self._db is not None:
+                with self._db:
+                    self._db.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?)",
+                                         zip(rows, map(float, values)))
+
+    def _remember(self, row, value):
+        self._entries[row] = value
+        self._entries.move_to_end(row)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def record(self, lookups, hits, model_rows, lookup_seconds, model_seconds):
+        with self._lock:
+            self.calls += 1
+            self.lookups += lookups
+            self.hits += hits
+            self.model_rows += model_rows
+            self.lookup_seconds += lookup_seconds
+            self.model_seconds += model_seconds
+
+    def stats(self):
+        with self._lock:
+            calls = max(self.calls, 1)
+            return {
+                'entries': len(self._entries),
+                'capacity': self.capacity,
+                'disk': self._db is not None,
+                'calls': self.calls,
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'hit_rate': round(self.hits / self.lookups, 4) if self.lookups else None,
+                'model_rows': self.model_rows,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'lookup_ms_per_call': round(1000 * self.lookup_seconds / calls, 4),
+                'model_ms_per_call': round(1000 * self.model_seconds / calls, 4),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class CachedPredictor(Predictor):
+    """Predictor whose predict() goes through a PredictionCache bound to this model."""
+
+    def __init__(self, model, features, cache, key, chunk_rows=CHUNK_ROWS, metadata=None):
+        super().__init__(model, features, chunk_rows, metadata)
+        self.cache = cache
+        self.key = key
+        self.computed = [name for name in self.features if name in FEATURE_REGISTRY]
+        # Model features that are inputs themselves (e.g. the NASA daily columns)
+        self.inputs = INPUT_COLUMNS + [name for name in self.features
+                                       if name not in FEATURE_REGISTRY and name not in INPUT_COLUMNS]
+        cache.bind(key, (metadata or {}).get('model_version'))
+
+    def _key_columns(self, columns):
+        # (names, arrays) of the raw inputs present; the timestamp as seconds
+        names, arrays = [], []
+        for name in self.inputs:
+            if name in columns:
+                values = np.asarray(columns[name])
+                if name == 'timestamp_utc':
+                    values = values.astype('datetime64[s]').astype(np.int64)
+                names.append(name)
+                arrays.append(values)
+        return names, arrays
+
+    def _snap(self, names, arrays, rows, start, stop):
+        # Grid indices for quantized inputs, raw values for the rest (float64 either way)
+        keys = np.empty((stop - start, len(names)))
+        for j, (name, values) in enumerate(zip(names, arrays)):
+            if values.ndim == 0:
+                keys[:, j] = values
+            else:
+                keys[:, j] = values[start:stop] if rows is None else values[rows[start:stop]]
+            step = self.cache.resolution.get(name, 0.0)
+            if step > 0:
+                keys[:, j] = np.rint(keys[:, j] / step)
+        return keys
+
+    def _unsnap(self, names, keys):
+        # Feature columns recomputed from snapped inputs
+        inputs = {}
+        for j, name in enumerate(names):
+            step = self.cache.resolution.get(name, 0.0)
+            values = keys[:, j] * step if step > 0 else keys[:, j]
+            if name == 'timestamp_utc':
+                values = values.astype(np.int64).astype('datetime64[s]').astype('datetime64[ns]')
+            inputs[name] = values
+        columns = {name: inputs[name] for name in self.features if name in inputs}
+        columns.update(compute_features(inputs, self.computed))
+        return columns
+
+    @staticmethod
+    def _take(columns, features, idx):
+        return {name: values if np.ndim(values) == 0 else np.asarray(values)[idx]
+                for name, values in ((name, columns[name]) for name in features)}
+
+    def _cached(self, names, keys, prefix):
+        started = time.perf_counter()
+        keys = np.ascontiguousarray(keys)
+        rows = keys.view(np.dtype((np.void, keys.itemsize * keys.shape[1]))).ravel()
+        unique, first, inverse, counts = np.unique(rows, return_index=True, return_inverse=True,
+                                                   return_counts=True)
+        row_keys = [prefix + row.tobytes() for row in unique]
+        values, found = self.cache.get_many(self.key, row_keys)
+        model_seconds = 0.0
+        misses = np.flatnonzero(~found)
+        if len(misses):
+            model_started = time.perf_counter()
+            values[misses] = super().predict(self._unsnap(names, keys[first[misses]]))
+            model_seconds = time.perf_counter() - model_started
+            self.cache.put_many(self.key, [row_keys[i] for i in misses], values[misses])
+        lookup_seconds = time.perf_counter() - started - model_seconds
+        self.cache.record(len(keys), int(counts[found].sum()), len(misses), lookup_seconds, model_seconds)
+        return values[inverse.ravel()]
+
+    def predict(self, columns, mask=None, out=None):
+        """Predictions for every row (or every True row of `mask`), cached per snapped input row."""
+        if 'timestamp_utc' not in columns:
+            # Bare feature columns (no raw inputs to key on) go straight to the model
+            return super().predict(columns, mask, out)
+        rows = None if mask is None else np.flatnonzero(mask)
+        names, arrays = self._key_columns(columns)
+        # Keys of different input layouts never collide
+        prefix = hashlib.sha1("|".join(names).encode()).digest()[:8]
+        n = self._length(self._arrays(columns), rows)
+        if out is None:
+            out = np.empty(n)
+        for start in range(0, n, self.chunk_rows):
+            stop = min(start + self.chunk_rows, n)
+            keys = self._snap(names, arrays, rows, start, stop)
+            finite = np.isfinite(keys).all(axis=1)
+            if finite.all():
+                out[start:stop] = self._cached(names, keys, prefix)
+                continue
+            idx = np.arange(start, stop) if rows is None else rows[start:stop]
+            chunk = out[start:stop]
+            if finite.any():
+                chunk[finite] = self._cached(names, keys[finite], prefix)
+            chunk[~finite] = super().predict(self._take(columns, self.features, idx[~finite]))
+        return out
+
+    def predict_matrix(self, X, out=None):
+        """Uncached: bulk matrices (orientation sweeps) go straight to the model."""
+        X = np.asarray(X)
+        if X.ndim == 2:
+            X = np.ascontiguousarray(X, dtype=self.dtype)
+        return super().predict_matrix(X, out)
@@ -0,0 +1,308 @@
+# Long-lived prediction service.
+# Loads the model registry's current version (trained_model.joblib and
+# model_metadata.json before anything is published, or --model/--metadata)
+# once, keeps it warm and answers predict(site, system, weather) requests
+# over HTTP or a Unix socket.
+#
+#   python prediction_server.py --port 8765
+#   python prediction_server.py --unix-socket /tmp/solar_predict.sock
+#   python prediction_server.py --predict-file payload.json   (one-shot, cold)
+#   python prediction_server.py --registry model_versions      (hot-swap)
+#   python prediction_server.py --cache-size 100000 [--cache-dir]
+#
+# With --registry the model comes from the registry's CURRENT bundle and a
+# watcher thread polls the pointer. A new version is loaded in the
+# background and swapped in with one reference assignment; every request
+# works on the snapshot it started with, so in-flight requests finish on the
+# old model and none are dropped. Roll back with `model_registry.py rollback`.
+#
+# With --cache-size, /predict and /predict/batch go through a quantized LRU
+# of predictions (prediction_cache.py) that is re-bound, and so emptied, on
+# every model load or swap. With --cache-dir, SQLite files of model versions
+# older than every version the registry retains are pruned at the same time.
+# /health reports its hit rate and latency.
+#
+# POST /predict
+#   {"site": {"lat": 37.77, "lon": -122.42},
+#    "system": {"tilt_deg": 30, "azimuth_deg": 180, "num_panels": 20},
+#    "weather": {"timestamp_utc": [...], "ghi_w_m2": [...], "temperature_C": [...]}}
+#
+# POST /predict/batch
+#   {"systems": {"system_id": [...], "tilt_deg": [...], ...}, "weather": {... "site_id": [...]}}
+#
+# POST /optimize
+#   {"site": {"lat": 37.77, "lon": -122.42, "num_panels": 20}, "weather": {...},
+#    "tilt_step": 5, "azimuth_step": 15}
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from batch_forecast import DEFAULT_FEATURES, feature_columns, forecast_batch
+from inference import Predictor
+from model_registry import ModelRegistry, ModelWatcher, load_active
+from orientation_optimizer import optimize_orientation
+from prediction_cache import CACHE_DIR, CachedPredictor, PredictionCache, model_key, parse_resolution
+
+MODEL_PATH = "trained_model.joblib"
+METADATA_PATH = "model_metadata.json"
+
+# Everything one request needs; replaced as a whole on a hot swap
+ModelState = namedtuple('ModelState', ['model', 'metadata', 'features', 'residual', 'version', 'predictor'])
+
+
+def make_state(model, metadata, cache=None):
+    metadata.setdefault('model_name', type(model).__name__)
+    # Feature order is checked here, once per loaded model, not per request
+    if cache is not None:
+        # Binding the new model's key invalidates everything cached for the old one
+        predictor = CachedPredictor(model, metadata['features'], cache, model_key(metadata, cache.resolution),
+                                    metadata=metadata)
+    else:
+        predictor = Predictor(model, metadata['features'], metadata=metadata)
+    return ModelState(model, metadata, predictor.features, metadata.get('target') == 'residual',
+                      metadata.get('model_version'), predictor)
+
+
+class PredictionService:
+    def __init__(self, model_path=None, metadata_path=None, registry=None, cache=None):
+        started = time.perf_counter()
+        self.registry = registry
+        self.cache = cache
+        if registry is not None:
+            model, metadata = registry.load()
+        else:
+            # The registry's current bundle when one is published, else the top-level files
+            model, metadata = load_active(model_path, metadata_path, default_metadata={'features': DEFAULT_FEATURES})
+        self.state = self._make_state(model, metadata)
+        self.load_seconds = time.perf_counter() - started
+        self.requests_served = 0
+        self.swaps = 0
+        self.watcher = None
+        self._lock = threading.Lock()
+
+    # Read-only views of the current snapshot
+    model = property(lambda self: self.state.model)
+    metadata = property(lambda self: self.state.metadata)
+    features = property(lambda self: self.state.features)
+    residual = property(lambda self: self.state.residual)
+
+    def _make_state(self, model, metadata):
+        state = make_state(model, metadata, self.cache)
+        if self.cache is not None:
+            self.cache.prune((self.registry or ModelRegistry()).versions())
+        return state
+
+    def swap(self, model, metadata):
+        # A single assignment: requests already running keep their old snapshot
+        self.state = self._make_state(model, metadata)
+        with self._lock:
+            self.swaps += 1
+
+    def watch(self, interval=1.0):
+        if self.registry is None:
+            raise ValueError("Hot swap needs a model registry")
+        self.watcher = ModelWatcher(self.registry, self.swap, interval).start()
+        return self.watcher
+
+    def predict(self, site, system, weather):
+        state = self.state
+        columns, index = feature_columns([{**(site or {}), **(system or {})}], pd.DataFrame(weather), state.features)
+        predictions = state.predictor.predict(columns)
+        if state.residual:
+            predictions += columns['physics_kwh']
+        with self._lock:
+            self.requests_served += 1
+        return {
+            'site': site or {},
+            'timestamp_utc': index['timestamp_utc'].dt.strftime('%Y-%m-%dT%H:%M:%S').tolist(),
+            'predicted_ac_kwh': [round(float(v), 4) for v in predictions],
+            'total_kwh': round(float(predictions.sum()), 4),
+            'model_used': state.metadata.get('model_name'),
+            'model_version': state.version,
+        }
+
+    def predict_batch(self, systems, weather, site_key='site_id'):
+        state = self.state
+        result = forecast_batch(state.predictor, state.features, pd.DataFrame(systems), pd.DataFrame(weather),
+                                site_key, residual=state.residual)
+        with self._lock:
+            self.requests_served += 1
+        response = {'model_used': state.metadata.get('model_name'), 'model_version': state.version}
+        for name, frame in result.items():
+            frame = frame.copy()
+            for col in ('timestamp_utc', 'period'):
+                if col in frame.columns:
+                    frame[col] = frame[col].dt.strftime('%Y-%m-%dT%H:%M:%S')
+            response[name] = frame.to_dict(orient='list')
+        return response
+
+    def optimize(self, site, weather, tilt_step=5.0, azimuth_step=15.0):
+        state = self.state
+        result, _ = optimize_orientation(state.predictor, state.features, pd.DataFrame(weather), site,
+                                         residual=state.residual, tilt_step=float(tilt_step),
+                                         azimuth_step=float(azimuth_step))
+        result['model_version'] = state.version
+        with self._lock:
+            self.requests_served += 1
+        return result
+
+    def health(self):
+        state = self.state
+        health = {
+            'status': 'OK',
+            'model_used': state.metadata.get('model_name'),
+            'model_version': state.version,
+            'engine': type(state.model).__name__,
+            'features': len(state.features),
+            'load_seconds': round(self.load_seconds, 4),
+            'requests_served': self.requests_served,
+            'swaps': self.swaps,
+        }
+        if self.watcher is not None and self.watcher.last_swap_seconds is not None:
+            health['last_swap_seconds'] = round(self.watcher.last_swap_seconds, 4)
+        if self.cache is not None:
+            health['cache'] = self.cache.stats()
+        return health
+
+
+def make_handler(service, quiet=True):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, service.health())
+            else:
+                self._send_json(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            if self.path not in ("/predict", "/predict/batch", "/optimize"):
+                self._send_json(404, {'error': 'Not found'})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if 'weather' not in request:
+                    raise ValueError("'weather' is required")
+                if self.path == "/optimize":
+                    result = service.optimize(request.get('site'), request['weather'],
+                                              request.get('tilt_step', 5.0), request.get('azimuth_step', 15.0))
+                elif self.path == "/predict/batch":
+                    result = service.predict_batch(request.get('systems', []), request['weather'],
+                                                   request.get('site_key', 'site_id'))
+                else:
+                    result = service.predict(request.get('site'), request.get('system'), request['weather'])
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {'error': str(e), 'code': 'INVALID_REQUEST'})
+                return
+            except Exception as e:
+                self._send_json(500, {'error': str(e), 'code': 'PREDICTION_FAILED'})
+                return
+            self._send_json(200, result)
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+        def address_string(self):
+            # Unix socket peers have no (host, port) pair
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    return PredictionHandler
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(service, host="127.0.0.1", port=8765, unix_socket=None, quiet=True):
+    handler = make_handler(service, quiet=quiet)
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = UnixHTTPServer(unix_socket, handler)
+        where = f"unix:{unix_socket}"
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        where = f"http://{host}:{server.server_address[1]}"
+    print(f"✅ Model loaded in {service.load_seconds:.3f}s ({service.metadata.get('model_name')})")
+    print(f"🚀 Prediction server listening on {where}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if unix_socket and os.path.exists(unix_socket):
+            os.remove(unix_socket)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm solar prediction server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PREDICTION_PORT", 8765)))
+    parser.add_argument("--unix-socket", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--model", help=f"Model file (default: the current registry version, else {MODEL_PATH})")
+    parser.add_argument("--metadata", help=f"Metadata file (default: as --model, else {METADATA_PATH})")
+    parser.add_argument("--registry", nargs="?", const="model_versions",
+                        help="Serve the registry's current version and hot-swap when it changes")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between registry checks")
+    parser.add_argument("--cache-size", type=int, default=int(os.environ.get("PREDICTION_CACHE_SIZE", 0)),
+                        help="Cache up to this many quantized input rows (0: no cache)")
+    parser.add_argument("--cache-resolution", default=os.environ.get("PREDICTION_CACHE_RESOLUTION"),
+                        help="Quantization steps, e.g. ghi_w_m2=1,temperature_C=0.1 (see prediction_cache.RESOLUTION)")
+    parser.add_argument("--cache-dir", nargs="?", const=CACHE_DIR, default=os.environ.get("PREDICTION_CACHE_DIR"),
+                        help="Also keep cached predictions in SQLite under this directory (default .prediction_cache)")
+    parser.add_argument("--predict-file", help="Answer a single JSON request from a file and exit")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.registry) if args.registry else None
+    cache = None
+    if args.cache_size > 0:
+        try:
+            cache = PredictionCache(args.cache_size, parse_resolution(args.cache_resolution), args.cache_dir)
+        except ValueError as e:
+            parser.error(str(e))
+    try:
+        service = PredictionService(args.model, args.metadata, registry, cache)
+    except FileNotFoundError:
+        print(f"❌ {args.registry or args.model or MODEL_PATH} not found. "
+              f"Please run merge2csv5.py first to train the model.")
+        return 1
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    if args.predict_file:
+        with open(args.predict_file, "r") as f:
+            request = json.load(f)
+        result = service.predict(request.get('site'), request.get('system'), request['weather'])
+        json.dump(result, sys.stdout)
+        return 0
+
+    if registry is not None:
+        service.watch(args.poll_interval)
+    serve(service, args.host, args.port, args.unix_socket, quiet=not args.verbose)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
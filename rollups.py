@@ -0,0 +1,153 @@
+# Single-pass calendar rollups for hourly forecasts.
+# Timestamps become integer day codes (days since the epoch), optionally in
+# a local timezone so "daily" means the site's day rather than the UTC day.
+# One np.bincount over (system code, day code) pairs is the only pass over
+# the hourly rows; weeks (Monday-start) and months are bincounts over that
+# per-day table, and the fleet totals one more over each result.
+#
+# Labels match the pandas version they replace: daily -> the day,
+# weekly -> the Sunday ending the week (resample('W')), monthly -> the
+# month's last day (resample('M')).
+#
+#   from rollups import rollup
+#   tables = rollup(hourly['timestamp_utc'], hourly['predicted_ac_kwh'], hourly['system_id'])
+#   tables['daily'], tables['fleet_weekly'], ...
+import numpy as np
+import pandas as pd
+
+PERIODS = ('daily', 'weekly', 'monthly')
+NS_PER_DAY = 86_400 * 10**9
+NS_PER_SLOT = 900 * 10**9  # quarter hour
+# Dense (systems x periods) tables up to this many cells per input row
+DENSE_CELLS_PER_ROW = 4
+
+
+def local_nanoseconds(timestamps, tz=None):
+    """int64 wall-clock nanoseconds since the epoch.
+
+    Naive timestamps are taken as UTC. With tz they are converted to that
+    zone's local time (DST included) before the calendar is applied.
+    """
+    values = timestamps.to_numpy() if hasattr(timestamps, 'to_numpy') else np.asarray(timestamps)
+    if values.dtype.kind == 'M':
+        # Naive datetime64 column: reinterpret in place, no conversion pass
+        utc = values.astype('datetime64[ns]', copy=False).view(np.int64)
+        if tz is None:
+            return utc
+    else:
+        timestamps = pd.DatetimeIndex(pd.to_datetime(values))
+        if tz is None:
+            # Aware input without an explicit zone: use its own local time
+            return timestamps.tz_localize(None).as_unit('ns').asi8
+        if timestamps.tz is not None:
+            timestamps = timestamps.tz_convert('UTC').tz_localize(None)
+        utc = timestamps.as_unit('ns').asi8
+    if len(utc) == 0:
+        return utc
+    # UTC offsets only change at transitions, which fall on quarter hours:
+    # convert one timestamp per quarter hour of the span and gather
+    slots = utc // NS_PER_SLOT
+    lo, hi = slots.min(), slots.max()
+    if hi - lo + 1 > len(slots):
+        local = pd.DatetimeIndex(utc.astype('datetime64[ns]')).tz_localize('UTC').tz_convert(tz)
+        return local.tz_localize(None).as_unit('ns').asi8
+    grid = pd.DatetimeIndex((np.arange(lo, hi + 1) * NS_PER_SLOT).astype('datetime64[ns]')).tz_localize('UTC')
+    offsets = grid.tz_convert(tz).tz_localize(None).as_unit('ns').asi8 - grid.as_unit('ns').asi8
+    return utc + offsets[slots - lo]
+
+
+def period_codes(period, days):
+    """int64 period code for each day code (days since the epoch)."""
+    if period == 'daily':
+        return days
+    if period == 'weekly':
+        # 1970-01-01 was a Thursday; +3 makes weeks start on Monday
+        return (days + 3) // 7
+    if period == 'monthly':
+        if len(days) == 0:
+            return days
+        # Month of each distinct day via a small lookup table, then one gather
+        lo = days.min()
+        table = np.arange(lo, days.max() + 1).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        return table[days - lo]
+    raise ValueError(f"Unknown period: {period}")
+
+
+def calendar_codes(timestamps, periods=PERIODS, tz=None):
+    """{period: int64 code per row} from one pass over the timestamps."""
+    days = local_nanoseconds(timestamps, tz) // NS_PER_DAY
+    return {period: period_codes(period, days) for period in periods}
+
+
+def period_labels(period, codes):
+    """datetime64[D] label for each code, as pandas would label the period."""
+    codes = np.asarray(codes, dtype=np.int64)
+    if period == 'daily':
+        return codes.astype('datetime64[D]')
+    if period == 'weekly':
+        return (codes * 7 + 3).astype('datetime64[D]')  # the Sunday ending the week
+    if period == 'monthly':
+        return (codes + 1).astype('datetime64[M]').astype('datetime64[D]') - np.timedelta64(1, 'D')
+    raise ValueError(f"Unknown period: {period}")
+
+
+def _sum_by(system_codes, n_systems, period_codes, values):
+    """(system code, period code, total) for every (system, period) that has rows."""
+    if len(period_codes) == 0:
+        return period_codes, period_codes, np.zeros(0)
+    lo = int(period_codes.min())
+    span = int(period_codes.max()) - lo + 1
+    cells = system_codes * span + (period_codes - lo)
+    if n_systems * span <= max(DENSE_CELLS_PER_ROW * len(cells), 1 << 16):
+        totals = np.bincount(cells, weights=values, minlength=n_systems * span)
+        occupied = np.flatnonzero(np.bincount(cells, minlength=n_systems * span))
+        totals = totals[occupied]
+    else:
+        # Sparse calendars (many systems over long, gappy ranges): sort instead
+        occupied, inverse = np.unique(cells, return_inverse=True)
+        totals = np.bincount(inverse, weights=values, minlength=len(occupied))
+    return occupied // span, lo + occupied % span, totals
+
+
+def rollup(timestamps, values, system_ids=None, periods=PERIODS, tz=None, name='predicted_ac_kwh',
+           fleet=True):
+    """Calendar totals per system and fleet-wide.
+
+    Returns {period: DataFrame(system_id, period, '<period>_<name>')} and,
+    with fleet=True, {'fleet_<period>': DataFrame(period, '<period>_<name>')}.
+    Without system_ids there is a single series: {period: DataFrame(period, ...)}.
+    Empty input gives the same tables with no rows.
+    """
+    values = np.asarray(values, dtype=float)
+    if np.isnan(values).any():
+        values = np.nan_to_num(values)
+    if system_ids is None:
+        system_codes, systems = np.zeros(len(values), dtype=np.int64), None
+    else:
+        system_codes, systems = pd.factorize(np.asarray(system_ids), sort=True)
+    n_systems = 1 if systems is None else len(systems)
+
+    tables = {}
+    # The only pass over the rows: totals per (system, local day). Weeks and
+    # months are whole days, so they roll up from this much smaller table.
+    days = local_nanoseconds(timestamps, tz) // NS_PER_DAY
+    day_systems, day_codes, day_totals = _sum_by(system_codes, n_systems, days, values)
+    for period in periods:
+        column = f'{period}_{name}'
+        if period == 'daily':
+            sys_idx, codes, totals = day_systems, day_codes, day_totals
+        else:
+            sys_idx, codes, totals = _sum_by(day_systems, n_systems, period_codes(period, day_codes), day_totals)
+        if systems is None:
+            tables[period] = pd.DataFrame({'period': period_labels(period, codes), column: totals})
+            continue
+        tables[period] = pd.DataFrame({
+            'system_id': systems[sys_idx],
+            'period': period_labels(period, codes),
+            column: totals,
+        })
+        if fleet:
+            _, fleet_codes, fleet_totals = _sum_by(np.zeros(len(totals), dtype=np.int64), 1, codes, totals)
+            tables[f'fleet_{period}'] = pd.DataFrame({'period': period_labels(period, fleet_codes),
+                                                      column: fleet_totals})
+    return tables
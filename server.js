@@ -35,7 +35,30 @@ if (!fs.existsSync(OUTPUT_DIR)) {
 }
 app.use('/downloads', express.static(OUTPUT_DIR));
 
+// Per-request CSVs only back the download link; keep the newest few for a while
+const OUTPUT_RETENTION_HOURS = Number(process.env.OUTPUT_RETENTION_HOURS || 24);
+const OUTPUT_MAX_FILES = Number(process.env.OUTPUT_MAX_FILES || 50);
+
+function pruneOutputs() {
+  try {
+    const cutoff = Date.now() - OUTPUT_RETENTION_HOURS * 3600 * 1000;
+    const files = fs.readdirSync(OUTPUT_DIR)
+      .filter(file => file.startsWith('solar_prediction_') && file.endsWith('.csv'))
+      .map(file => ({ file, mtime: fs.statSync(path.join(OUTPUT_DIR, file)).mtimeMs }))
+      .sort((a, b) => b.mtime - a.mtime);
+    files.forEach(({ file, mtime }, i) => {
+      if (i >= OUTPUT_MAX_FILES || mtime < cutoff) {
+        fs.unlinkSync(path.join(OUTPUT_DIR, file));
+      }
+    });
+  } catch (err) {
+    console.warn("Output cleanup failed:", err.message);
+  }
+}
+
 const GEOCODE_API_KEY = process.env.GEOCODE_API_KEY;
+// Optional warm Python prediction server (python prediction_server.py)
+const ML_SERVER_URL = process.env.ML_SERVER_URL;
 
 
 // ----------------- helpers -----------------
@@ -94,6 +117,7 @@ async function fetchForecast(lat, lon) {
   const data = await res.json();
   if (!data || !data.hourly || !Array.isArray(data.hourly.time)) throw new Error("Weather API failed");
   return { 
+    utcOffsetSeconds: data.utc_offset_seconds || 0,
     time: data.hourly.time, 
     ghi: data.hourly.shortwave_radiation, 
     temp: data.hourly.temperature_2m,
@@ -105,6 +129,13 @@ async function fetchForecast(lat, lon) {
   };
 }
 
+// Open-Meteo times are local (timezone=auto); shift them to UTC ISO strings
+function forecastTimesUTC(forecast) {
+  return forecast.time.map(t =>
+    new Date(Date.parse(`${t}:00Z`) - forecast.utcOffsetSeconds * 1000).toISOString().slice(0, 19)
+  );
+}
+
 function calculateHourlyEnergy({ ghi, tempC, numPanels, panelArea, panelEfficiency, inverterEfficiency, tiltDeg, tempCoeff, soilingFactor, systemDerate, inverterRatedPower, noct }) {
   if (ghi === null || tempC === null) return 0;
 
@@ -149,6 +180,33 @@ async function fetchPVWattsHourly(params) {
   return body.outputs.ac;
 }
 
+// ----------------- ML prediction server helper -----------------
+async function fetchMLForecast({ lat, lon, forecast, tiltDeg, azimuth, numPanels, panelArea, panelEfficiency }) {
+  const resp = await fetch(`${ML_SERVER_URL}/predict`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      site: { lat, lon },
+      system: { tilt_deg: tiltDeg, azimuth_deg: azimuth, num_panels: numPanels, panel_area_m2: panelArea, panel_efficiency: panelEfficiency },
+      weather: {
+        timestamp_utc: forecastTimesUTC(forecast),
+        ghi_w_m2: forecast.ghi.map(v => v || 0),
+        temperature_C: forecast.temp.map(v => v || 0)
+      }
+    })
+  });
+  if (!resp.ok) {
+    const text = await resp.text();
+    throw new Error(`ML server error ${resp.status}: ${text}`);
+  }
+  const body = await resp.json();
+  return {
+    hourly: body.predicted_ac_kwh,
+    totalKWh: +body.total_kwh.toFixed(2),
+    model: body.model_used
+  };
+}
+
 // ----------------- 16-day prediction endpoint -----------------
 app.post("/api/predict/16days", async (req, res) => {
   try {
@@ -260,6 +318,16 @@ app.post("/api/predict/16days", async (req, res) => {
       }
     }
 
+    // ML forecast from the warm prediction server (optional)
+    let mlForecast = null;
+    if (ML_SERVER_URL) {
+      try {
+        mlForecast = await fetchMLForecast({ lat, lon, forecast, tiltDeg, azimuth, numPanels, panelArea, panelEfficiency });
+      } catch (e) {
+        console.warn("ML forecast failed:", e.message);
+      }
+    }
+
     // Calculate optimal angles (simple optimization)
     const optimalTilt = Math.abs(lat);
     const optimalAzimuth = 180; // South-facing for Northern Hemisphere
@@ -301,6 +369,7 @@ app.post("/api/predict/16days", async (req, res) => {
     }
     
     fs.writeFileSync(filePath, csv);
+    pruneOutputs();
 
     // Response structure
     const response = {
@@ -326,6 +395,7 @@ app.post("/api/predict/16days", async (req, res) => {
       },
       recommendations,
       pvwatts: pvwattsComparison,
+      ml: mlForecast,
       downloadUrl: `/downloads/${fileName}`,
       timestamp: new Date().toISOString()
     };
@@ -358,11 +428,16 @@ app.post("/api/predict/16days", async (req, res) => {
 });
 
 // ----------------- Baseline CSV endpoint for Python scripts -----------------
+// ?location=<name> or ?lat=..&lon=.. (default: San Francisco). With
+// ?resolution=hourly the raw hourly arrays are returned instead of daily
+// averages (format=json: columnar {timestamp_utc: [...], ...}). Responses carry
+// an ETag (Express answers matching If-None-Match with 304) and may be cached
+// for an hour, since the upstream forecast only changes hourly.
 app.get("/baseline-16day", async (req, res) => {
   try {
     // Default parameters for baseline generation
     const defaultParams = {
-      location: "San Francisco, CA",
+      location: req.query.location || "San Francisco, CA",
       numPanels: 20,
       panelArea: 1.6,
       panelEfficiency: 0.2,
@@ -376,14 +451,37 @@ app.get("/baseline-16day", async (req, res) => {
       noct: 45
     };
 
-    const geo = await geocodeLocation(defaultParams.location);
-    const lat = geo.lat;
-    const lon = geo.lon;
+    let lat = parseFloat(req.query.lat);
+    let lon = parseFloat(req.query.lon);
+    if (!Number.isFinite(lat) || !Number.isFinite(lon)) {
+      const geo = await geocodeLocation(defaultParams.location);
+      lat = geo.lat;
+      lon = geo.lon;
+    }
     const tiltDeg = defaultParams.tilt ?? Math.abs(lat);
 
     // Fetch forecast
     const forecast = await fetchForecast(lat, lon);
 
+    if (req.query.resolution === "hourly") {
+      const timestamps = forecastTimesUTC(forecast);
+      const hourly = {
+        lat,
+        lon,
+        timestamp_utc: timestamps,
+        ghi_w_m2: forecast.ghi,
+        temperature_C: forecast.temp
+      };
+      res.setHeader('Cache-Control', 'public, max-age=3600');
+      if (req.query.format === "json") {
+        return res.json(hourly);
+      }
+      const rows = timestamps.map((t, i) => ({ timestamp_utc: t, ghi_w_m2: forecast.ghi[i], temperature_C: forecast.temp[i] }));
+      res.setHeader('Content-Type', 'text/csv');
+      res.setHeader('Content-Disposition', 'attachment; filename="baseline_16day_hourly.csv"');
+      return res.send(new Parser({ fields: ["timestamp_utc", "ghi_w_m2", "temperature_C"] }).parse(rows));
+    }
+
     // Physics-based daily energy (aggregated from hourly)
     const dailyResults = [];
     for (let i = 0; i < forecast.time.length; i += 24) {
@@ -415,16 +513,20 @@ app.get("/baseline-16day", async (req, res) => {
       dailyResults.push({
         Date: dayData[0].split('T')[0], // Extract date part
         ghi_w_m2: Math.round(avgGhi * 100) / 100,
-        temperature_C: Math.round(avgTemp * 100) / 100
+        temperature_C: Math.round(avgTemp * 100) / 100,
+        // Resolved site, so the ML pipeline computes sun position for it
+        lat,
+        lon
       });
     }
 
     // Convert to CSV
-    const parser = new Parser({ fields: ["Date", "ghi_w_m2", "temperature_C"] });
+    const parser = new Parser({ fields: ["Date", "ghi_w_m2", "temperature_C", "lat", "lon"] });
     const csv = parser.parse(dailyResults);
 
     res.setHeader('Content-Type', 'text/csv');
     res.setHeader('Content-Disposition', 'attachment; filename="baseline_16day.csv"');
+    res.setHeader('Cache-Control', 'public, max-age=3600');
     res.send(csv);
 
   } catch (err) {
@@ -444,7 +546,8 @@ app.get("/health", (req, res) => {
     services: {
       geocoding: "Nominatim",
       weather: "Open-Meteo",
-      pvwatts: PVWATTS_API_KEY ? "Available" : "Not configured"
+      pvwatts: PVWATTS_API_KEY ? "Available" : "Not configured",
+      ml: ML_SERVER_URL ? "Available" : "Not configured"
     }
   });
 });
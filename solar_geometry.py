@@ -0,0 +1,124 @@
+# Vectorized solar position and plane-of-array (POA) irradiance.
+# Shared by the training (merge2csv5.py) and prediction (finalcode3.py,
+# batch_forecast.py) pipelines. Everything is plain NumPy broadcasting, so
+# timestamps of shape (hours,) combine with lat/lon of shape (sites, 1) to
+# give (sites, hours) results without any per-row Python.
+#
+# Angles are in degrees; azimuths are measured clockwise from north
+# (180 = south-facing). Naive timestamps are treated as UTC.
+import numpy as np
+import pandas as pd
+
+SOLAR_CONSTANT = 1367.0  # W/m²
+DEFAULT_ALBEDO = 0.2
+# San Francisco, the location server.js uses for /baseline-16day
+DEFAULT_LAT = 37.7749
+DEFAULT_LON = -122.4194
+
+
+def time_arrays(timestamps):
+    """Day of year and fractional UTC hour for an array of timestamps."""
+    ts = pd.DatetimeIndex(pd.to_datetime(np.asarray(timestamps).ravel()))
+    if ts.tz is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    values = ts.to_numpy(dtype="datetime64[ns]")
+    days = values.astype("datetime64[D]")
+    day_of_year = (days - values.astype("datetime64[Y]").astype("datetime64[D]")).astype(np.int64) + 1
+    hour = (values - days).astype(np.int64) / 3.6e12
+    shape = np.shape(timestamps)
+    return day_of_year.reshape(shape), hour.reshape(shape)
+
+
+def declination_and_eot(day_of_year, hour=12.0):
+    # Spencer (1971) Fourier series; returns declination (deg) and the
+    # equation of time (minutes)
+    gamma = 2 * np.pi / 365.0 * (np.asarray(day_of_year) - 1 + (np.asarray(hour) - 12) / 24.0)
+    declination = (0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma)
+                   - 0.006758 * np.cos(2 * gamma) + 0.000907 * np.sin(2 * gamma)
+                   - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma))
+    eot = 229.18 * (0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+                    - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma))
+    return np.degrees(declination), eot
+
+
+def solar_position(day_of_year, hour, lat, lon):
+    """Declination, hour angle, zenith, elevation and azimuth (all degrees)."""
+    declination, eot = declination_and_eot(day_of_year, hour)
+    true_solar_minutes = np.asarray(hour) * 60.0 + eot + 4.0 * np.asarray(lon)
+    hour_angle = true_solar_minutes / 4.0 - 180.0
+
+    lat_r = np.radians(lat)
+    dec_r = np.radians(declination)
+    ha_r = np.radians(hour_angle)
+    cos_zenith = np.sin(lat_r) * np.sin(dec_r) + np.cos(lat_r) * np.cos(dec_r) * np.cos(ha_r)
+    zenith = np.degrees(np.arccos(np.clip(cos_zenith, -1.0, 1.0)))
+    azimuth = np.degrees(np.arctan2(
+        np.sin(ha_r), np.cos(ha_r) * np.sin(lat_r) - np.tan(dec_r) * np.cos(lat_r)
+    )) + 180.0
+    return {
+        'declination': declination,
+        'hour_angle': hour_angle,
+        'zenith': zenith,
+        'elevation': 90.0 - zenith,
+        'azimuth': azimuth,
+    }
+
+
+def angle_of_incidence(zenith, solar_azimuth, tilt, surface_azimuth):
+    """Angle between the sun and the panel normal (degrees)."""
+    zen_r = np.radians(zenith)
+    tilt_r = np.radians(tilt)
+    cos_aoi = (np.cos(zen_r) * np.cos(tilt_r)
+               + np.sin(zen_r) * np.sin(tilt_r) * np.cos(np.radians(np.asarray(solar_azimuth) - surface_azimuth)))
+    return np.degrees(np.arccos(np.clip(cos_aoi, -1.0, 1.0)))
+
+
+def erbs_decomposition(ghi, zenith, day_of_year):
+    """Split GHI into direct-normal (DNI) and diffuse-horizontal (DHI)."""
+    ghi = np.maximum(np.asarray(ghi, dtype=float), 0.0)
+    extraterrestrial = SOLAR_CONSTANT * (1 + 0.033 * np.cos(2 * np.pi * np.asarray(day_of_year) / 365.0))
+    cos_zenith = np.cos(np.radians(zenith))
+    kt = np.clip(ghi / (extraterrestrial * np.maximum(cos_zenith, 0.065)), 0.0, 1.0)
+
+    diffuse_fraction = np.where(
+        kt <= 0.22, 1.0 - 0.09 * kt,
+        np.where(kt <= 0.8,
+                 0.9511 - 0.1604 * kt + 4.388 * kt ** 2 - 16.638 * kt ** 3 + 12.336 * kt ** 4,
+                 0.165))
+    dhi = ghi * diffuse_fraction
+    sun_up = np.asarray(zenith) < 90.0
+    dni = np.where(sun_up, (ghi - dhi) / np.maximum(cos_zenith, 0.065), 0.0)
+    return dni, np.where(sun_up, dhi, ghi)
+
+
+def transpose_to_plane(ghi, dni, dhi, aoi, tilt, albedo=DEFAULT_ALBEDO):
+    """Isotropic-sky POA from already decomposed irradiance (orientation-only work)."""
+    cos_tilt = np.cos(np.radians(tilt))
+    beam = dni * np.maximum(np.cos(np.radians(aoi)), 0.0)
+    sky_diffuse = dhi * (1 + cos_tilt) / 2.0
+    ground = np.asarray(ghi, dtype=float) * albedo * (1 - cos_tilt) / 2.0
+    return np.maximum(beam + sky_diffuse + ground, 0.0)
+
+
+def poa_irradiance(ghi, zenith, solar_azimuth, tilt, surface_azimuth, day_of_year, albedo=DEFAULT_ALBEDO):
+    """Isotropic-sky plane-of-array irradiance and angle of incidence."""
+    dni, dhi = erbs_decomposition(ghi, zenith, day_of_year)
+    aoi = angle_of_incidence(zenith, solar_azimuth, tilt, surface_azimuth)
+    return {'poa_w_m2': transpose_to_plane(ghi, dni, dhi, aoi, tilt, albedo), 'aoi': aoi}
+
+
+def geometry_features(timestamps, lat, lon, ghi, tilt, surface_azimuth, albedo=DEFAULT_ALBEDO):
+    """The solar_elevation / tilt_efficiency / poa_w_m2 model features."""
+    lat, lon, ghi, tilt, surface_azimuth = (
+        np.asarray(v, dtype=float) for v in (lat, lon, ghi, tilt, surface_azimuth)
+    )
+    day_of_year, hour = time_arrays(timestamps)
+    position = solar_position(day_of_year, hour, lat, lon)
+    poa = poa_irradiance(ghi, position['zenith'], position['azimuth'], tilt, surface_azimuth,
+                         day_of_year, albedo)
+    return {
+        'solar_elevation': np.maximum(position['elevation'], 0.0),
+        'solar_azimuth': position['azimuth'],
+        'tilt_efficiency': np.maximum(np.cos(np.radians(poa['aoi'])), 0.0),
+        'poa_w_m2': poa['poa_w_m2'],
+    }
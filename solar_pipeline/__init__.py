@@ -0,0 +1,25 @@
+# Solar forecasting pipeline as an importable package.
+#
+#   from solar_pipeline import load_model, predict, train
+#   python -m solar_pipeline {train,predict,fetch} --help
+#
+# Importing the package or its CLI loads no third-party modules; pandas,
+# scikit-learn and requests are imported by the functions that use them,
+# and the model is read from disk, never trained on import.
+_EXPORTS = {
+    'train': 'training',
+    'load_model': 'prediction',
+    'predict': 'prediction',
+    'cached_run': 'prediction',
+    'fetch_baseline': 'baseline',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    return getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
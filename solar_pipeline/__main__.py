@@ -0,0 +1,3 @@
+from solar_pipeline.cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,15 @@
+# Backend 16-day baseline weather for the prediction pipeline.
+#
+#   python -m solar_pipeline fetch --location 40,-105 --hourly --out baseline.csv
+#
+# Thin wrapper over baseline_client (pooled, TTL-cached, ETag revalidation);
+# pandas and requests load on the first fetch.
+import os
+
+
+def fetch_baseline(location=None, hourly=False, url=None):
+    """Daily means (Date, ghi_w_m2, temperature_C, lat, lon) or, with hourly=True, hourly arrays."""
+    from baseline_client import BASELINE_URL, BaselineClient
+
+    url = url or os.environ.get("BASELINE_URL", BASELINE_URL)
+    return BaselineClient(url).fetch(location, resolution='hourly' if hourly else 'daily')
@@ -0,0 +1,199 @@
+# Command line for the pipeline package.
+#
+#   python -m solar_pipeline train [--smoke] [--residual] [--compact] [--stream|--incremental ...]
+#   python -m solar_pipeline predict [--location 40,-105] [--hourly] [--quantiles] [--max-age 3600]
+#   python -m solar_pipeline fetch [--location NAME] [--hourly] [--out baseline.csv]
+#
+# merge2csv5.py and finalcode3.py are the train and predict commands. Only
+# argparse and the stdlib load before a command runs, so --help and a
+# cached prediction (--max-age, answered from the output store) return
+# without importing pandas or scikit-learn.
+import argparse
+import os
+import sys
+
+from instrumentation import RunReport
+
+
+def _env_float(name):
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="solar_pipeline", description="Solar power training and forecasting")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="Train the solar power ML model",
+                                description="Train the solar power ML model")
+    train.add_argument("--stream", action="store_true",
+                       help="Bounded-memory streaming training (see stream_train.py for its options)")
+    train.add_argument("--incremental", action="store_true",
+                       help="Train only on telemetry past the published watermarks (see incremental_train.py)")
+    train.add_argument("--smoke", action="store_true", help="Seeded fast model search (small grid, 3 folds)")
+    train.add_argument("--search", choices=["grid", "random"], default="grid")
+    train.add_argument("--n-iter", type=int, default=8, help="Candidates to draw for --search random")
+    train.add_argument("--family", choices=["RandomForest", "HistGradientBoosting", "Ridge", "LinearRegression"],
+                       help="Search only this model family (quantile bands need a RandomForest)")
+    train.add_argument("--jobs", type=int, default=None, help="Model-search worker processes")
+    train.add_argument("--residual", action="store_true",
+                       help="Train on measured - physics (server.js calculateHourlyEnergy) and serve physics + ML")
+    train.add_argument("--compact", action="store_true",
+                       help="Drop low-importance features and shrink the forest within --compact-budget")
+    train.add_argument("--compact-budget", type=float, default=None, metavar="R2",
+                       help="Validation R² the compacted forest may lose (default 0.005)")
+    train.add_argument("--min-importance", type=float, default=None,
+                       help="Features below this importance are dropped by --compact (default 0.001)")
+    train.add_argument("--telemetry", default="synthetic_solar_hourly.csv", help="Hourly telemetry CSV")
+    train.add_argument("--nasa", default="nasa_power_data.csv", help="NASA POWER daily CSV")
+    RunReport.add_arguments(train)
+
+    predict = commands.add_parser("predict", help="Solar power prediction for the 16-day baseline",
+                                  description="Solar power prediction for the 16-day baseline")
+    predict.add_argument("--location", default=os.environ.get("BASELINE_LOCATION"),
+                         help='Location name or "lat,lon" (default: the backend default)')
+    predict.add_argument("--url", default=os.environ.get("BASELINE_URL"), help="Backend /baseline-16day URL")
+    predict.add_argument("--hourly", action="store_true",
+                         default=os.environ.get("BASELINE_RESOLUTION") == "hourly",
+                         help="Use the backend's hourly irradiance/temperature arrays instead of daily means")
+    predict.add_argument("--quantiles", action="store_true",
+                         default=os.environ.get("FORECAST_QUANTILES") == "1",
+                         help="Add P10/P50/P90 bands from the forest's per-tree predictions")
+    predict.add_argument("--csv", action="store_true", default=os.environ.get("FORECAST_CSV") == "1",
+                         help="Also export the run as the legacy CSV files and prediction_summary.json")
+    predict.add_argument("--tz", default=os.environ.get("FORECAST_TZ"),
+                         help="Roll up by local days in this timezone (timestamps are UTC), e.g. America/Los_Angeles")
+    predict.add_argument("--max-age", type=float, default=_env_float("FORECAST_MAX_AGE"), metavar="SECONDS",
+                         help="Reuse the newest stored run for the location when it is this recent "
+                              "(and made by the current model with the same options)")
+    predict.add_argument("--store", default=None, help="Output store directory (default: forecast_store)")
+    RunReport.add_arguments(predict)
+
+    fetch = commands.add_parser("fetch", help="Fetch the 16-day baseline weather",
+                                description="Fetch the 16-day baseline weather")
+    fetch.add_argument("--location", default=os.environ.get("BASELINE_LOCATION"))
+    fetch.add_argument("--url", default=os.environ.get("BASELINE_URL"))
+    fetch.add_argument("--hourly", action="store_true")
+    fetch.add_argument("--out", help="CSV path (default: print the first rows)")
+    return parser
+
+
+def show_summary(summary, run_path=None, csv=False):
+    print("\n🎉 Solar Power Prediction Complete!")
+    print("=" * 50)
+    print(f"📅 Forecast Period: {summary['forecast_period_days']} days")
+    print(f"⚡ Total Predicted Output: {summary['total_predicted_kwh']:.2f} kWh")
+    print(f"📊 Daily Average: {summary['daily_average_kwh']:.2f} kWh/day")
+    print(f"📈 Peak Daily Output: {summary['max_daily_kwh']:.2f} kWh")
+    print(f"📉 Minimum Daily Output: {summary['min_daily_kwh']:.2f} kWh")
+    print(f"🤖 Model Used: {summary['model_used']}")
+    if summary.get('model_performance'):
+        print(f"🎯 Model Accuracy (R²): {summary['model_performance']['r2']:.4f}")
+    bands = summary.get('total_predicted_kwh_quantiles')
+    if bands:
+        print(f"📐 Total P10/P50/P90: {bands['p10']:.2f} / {bands['p50']:.2f} / {bands['p90']:.2f} kWh")
+
+    if run_path:
+        print("\n📁 Generated Files:")
+        print(f"   - {run_path}/ (hourly, daily, weekly, monthly tables and summary)")
+        if csv:
+            print("   - baseline_16day_hourly_improved.csv, forecast_daily/weekly/monthly.csv, prediction_summary.json")
+
+
+def run_train(args, extra):
+    inputs = ["--telemetry", args.telemetry, "--nasa", args.nasa]
+    # Bounded-memory streaming mode for fleet-scale telemetry
+    if args.stream:
+        from stream_train import main as stream_main
+        return stream_main(inputs + extra)
+    # Incremental mode: warm-start on the rows that arrived since the last training
+    if args.incremental:
+        from incremental_train import main as incremental_main
+        return incremental_main(inputs + extra)
+
+    from .training import train
+
+    print("🚀 Starting ML Training Pipeline...")
+    # Stage timings/memory -> run_report_training.json (--instrument or SOLAR_INSTRUMENT=1)
+    report = RunReport.from_args(args, "training")
+    try:
+        train(args.telemetry, args.nasa, smoke=args.smoke, search=args.search, n_iter=args.n_iter,
+              jobs=args.jobs, residual=args.residual, compact=args.compact, compact_budget=args.compact_budget,
+              min_importance=args.min_importance, family=args.family, report=report)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    report.finish()
+
+    print("\n🎉 ML Training Pipeline Complete!")
+    print("=" * 50)
+    return 0
+
+
+def run_predict(args):
+    if args.max_age is not None:
+        from .prediction import cached_run
+
+        summary = cached_run(args.location, args.max_age, args.store, hourly=args.hourly, quantiles=args.quantiles,
+                             tz=args.tz)
+        if summary is not None:
+            print(f"♻️ Reusing run {summary['run_id']} ({summary['age_seconds']:.0f}s old)")
+            show_summary(summary)
+            return 0
+
+    from .prediction import predict
+
+    print("🚀 Starting Solar Power Prediction Pipeline...")
+    # Stage timings/memory -> run_report_prediction.json (--instrument or SOLAR_INSTRUMENT=1)
+    report = RunReport.from_args(args, "prediction")
+    try:
+        result = predict(args.location, hourly=args.hourly, quantiles=args.quantiles, csv=args.csv, tz=args.tz,
+                         url=args.url, store_root=args.store, report=report)
+    except FileNotFoundError as e:
+        print(f"❌ {e.filename or e} not found. Please run `python -m solar_pipeline train` first to train the model.")
+        return 1
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        print("💡 Make sure the backend server is accessible (BASELINE_URL)")
+        return 1
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    report.finish()
+
+    show_summary(result['summary'], result['run']['path'], args.csv)
+    print("\n✅ Pipeline execution successful!")
+    print("🚀 Ready for frontend integration!")
+    return 0
+
+
+def run_fetch(args):
+    from .baseline import fetch_baseline
+
+    try:
+        baseline = fetch_baseline(args.location, args.hourly, args.url)
+    except Exception as e:
+        print(f"❌ Failed to fetch baseline data: {e}")
+        return 1
+    if args.out:
+        baseline.to_csv(args.out, index=False)
+        print(f"✅ Saved: {args.out} ({len(baseline)} rows)")
+    else:
+        print(baseline.head(24).to_string(index=False))
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and not (args.command == "train" and (args.stream or args.incremental)):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.command == "train":
+        return run_train(args, extra)
+    if args.command == "predict":
+        return run_predict(args)
+    return run_fetch(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
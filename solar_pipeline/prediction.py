@@ -0,0 +1,321 @@
+# Prediction pipeline: trained model from disk + the backend's 16-day
+# baseline weather -> hourly forecast, daily/weekly/monthly rollups and a
+# run in the output store.
+#
+#   python -m solar_pipeline predict [--hourly] [--quantiles] [--csv]   (or finalcode3.py)
+#   from solar_pipeline import predict; result = predict(location="Denver")
+#
+# The model is loaded from the model registry's current version (or, before
+# anything is published, trained_model.joblib / model_metadata.json), using
+# the memory-mapped forest export when the metadata names one; it is never
+# retrained.
+# cached_run() answers from the newest stored run made by the current model
+# with the same options, without importing pandas or scikit-learn.
+import json
+import os
+import time
+from datetime import datetime
+
+from instrumentation import RunReport
+
+MODEL_PATH = "trained_model.joblib"
+METADATA_PATH = "model_metadata.json"
+DEFAULT_FEATURES = ['ghi_w_m2', 'temperature_C', 'tilt_deg', 'azimuth_deg', 'num_panels']
+# System-specific inputs when the caller gives none
+DEFAULT_SYSTEM = {'tilt_deg': 30, 'azimuth_deg': 180, 'num_panels': 20}
+# Hourly columns kept in the output store besides predicted_ac_kwh[_pNN]
+OUTPUT_COLUMNS = ['timestamp_utc', 'ghi_w_m2', 'temperature_C', 'physics_kwh']
+
+
+def load_metadata(metadata_path=METADATA_PATH):
+    try:
+        with open(metadata_path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"⚠️ {metadata_path} not found. Using default feature list.")
+        return {'features': list(DEFAULT_FEATURES)}
+
+
+def load_model(model_path=None, metadata_path=None):
+    """(model, metadata) as published by training; raises FileNotFoundError without a model.
+
+    With no paths given, the registry's current version is loaded when one is
+    published: its CURRENT pointer names a matching model and metadata, which
+    the legacy top-level copies do not guarantee mid-swap.
+    """
+    from forest_export import load_model as load_forest
+    from model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    if model_path is None and metadata_path is None and registry.current() is not None:
+        return registry.load()
+    # Metadata first: it says whether a memory-mapped forest export exists
+    metadata = load_metadata(metadata_path or METADATA_PATH)
+    return load_forest(model_path or MODEL_PATH, metadata), metadata
+
+
+def current_metadata():
+    """Metadata of the model load_model() would load, read without loading the model."""
+    from model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    if registry.current() is not None:
+        return registry.metadata()
+    try:
+        with open(METADATA_PATH, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def run_options(hourly=False, quantiles=False, tz=None, system=None):
+    """What a stored run was requested with; cached_run only reuses a run with the same options."""
+    return {'hourly': bool(hourly), 'quantiles': bool(quantiles), 'tz': tz,
+            'system': {**DEFAULT_SYSTEM, **(system or {})}}
+
+
+def cached_run(location=None, max_age=None, store_root=None, hourly=False, quantiles=False, tz=None, system=None,
+               metadata=None):
+    """Summary of the newest stored run for `location` that the current model made with these options.
+
+    None when there is no such run younger than max_age seconds. metadata
+    defaults to the current model's (current_metadata()); runs from another
+    model version or training date are never reused.
+    """
+    from output_store import STORE_DIR, OutputStore, site_key
+
+    metadata = current_metadata() if metadata is None else metadata
+    model = {'version': metadata.get('model_version'), 'training_date': metadata.get('training_date')}
+    options = run_options(hourly, quantiles, tz, system)
+    store = OutputStore(store_root or STORE_DIR)
+    site = site_key(location)
+    now = time.time()
+    for _, run_id in reversed(store.runs(site)):
+        age = now - os.path.getmtime(store.run_dir(site, run_id))
+        if max_age is not None and age > max_age:
+            # Runs are listed oldest first: every earlier one is older still
+            return None
+        summary = store.summary(site, run_id)
+        if summary is None or summary.get('options') != options or summary.get('model') != model:
+            continue
+        summary.setdefault('run_id', run_id)
+        summary['age_seconds'] = round(age, 1)
+        return summary
+    return None
+
+
+def prepare_hourly(baseline, hourly=False, system=None):
+    """Hourly model inputs from the backend's daily means or hourly arrays."""
+    import pandas as pd
+
+    from features import daily_nasa_proxies
+
+    if not hourly:
+        print("⏰ Converting daily data to hourly...")
+        # Create hourly data by resampling and forward filling
+        baseline['timestamp_utc'] = pd.to_datetime(baseline['Date'])
+        baseline = baseline.set_index('timestamp_utc').resample('h').ffill().reset_index()
+    if 'lat' not in baseline.columns or 'lon' not in baseline.columns:
+        # Sun position and POA then come from features.INPUT_DEFAULTS (San Francisco)
+        print("⚠️ Baseline has no site coordinates; solar geometry uses the default site")
+
+    # Add system-specific features (default values)
+    for col, value in {**DEFAULT_SYSTEM, **(system or {})}.items():
+        baseline[col] = value
+
+    # Add NASA features if they were used in training (use same values as weather data)
+    if hourly:
+        # Same daily values the prediction server derives (features.daily_nasa_proxies)
+        baseline['Solar_Radiation'], baseline['Temperature'] = daily_nasa_proxies(
+            baseline['timestamp_utc'], baseline['ghi_w_m2'], baseline['temperature_C'])
+    else:
+        baseline['Solar_Radiation'] = baseline['ghi_w_m2'] / 1000  # Convert W/m² to MJ/m²
+        baseline['Temperature'] = baseline['temperature_C']
+    return baseline
+
+
+def predict(location=None, hourly=False, quantiles=False, csv=False, tz=None, url=None, system=None,
+            model=None, metadata=None, store_root=None, report=None):
+    """Forecast the 16-day baseline and save it as one output store run.
+
+    location is a name or "lat,lon" (the backend defaults to San Francisco);
+    system overrides DEFAULT_SYSTEM; model may be a loaded model or an
+    inference.Predictor. Raises ValueError when the model's features do not
+    match the metadata. Returns {'hourly', 'daily', 'weekly', 'monthly',
+    'summary', 'run'}.
+    """
+    import numpy as np
+
+    from features import FeatureStore, engineer_features
+    from inference import Predictor
+    from output_store import STORE_DIR, OutputStore, site_key
+    from quantile_forecast import aggregate_bands, quantile_bands
+    from rollups import calendar_codes, period_labels, rollup
+    from .baseline import fetch_baseline
+
+    report = report or RunReport("prediction", enabled=False)
+    # Recorded with the run so cached_run only reuses it for the same request
+    options = run_options(hourly, quantiles, tz, system)
+
+    # ====== 1. Load trained model ======
+    print("📦 Loading trained model...")
+    report.begin("load_model")
+    if model is None:
+        model, loaded = load_model()
+        metadata = metadata or loaded
+    elif metadata is None:
+        metadata = load_metadata()
+    if 'model_name' in metadata:
+        print(f"✅ Model metadata loaded: {metadata['model_name']}")
+        print(f"📊 Model performance: R² = {metadata['performance']['r2']:.4f}")
+    # Feature order is checked here, once, instead of on every predict call
+    predictor = model if isinstance(model, Predictor) else Predictor(model, metadata['features'], metadata=metadata)
+    model = predictor.source
+    print(f"✅ Model loaded successfully ({type(model).__name__})")
+
+    if quantiles and not (hasattr(model, 'predict_trees') or metadata.get('model_name') == 'RandomForest'):
+        print(f"⚠️ Quantile bands need a RandomForest; {metadata.get('model_name')} gives point forecasts only")
+        quantiles = False
+
+    # ====== 2. Fetch baseline data from backend ======
+    print("🌐 Fetching baseline data from backend...")
+    report.begin("fetch")
+    # Cached per location for an hour, then revalidated with the stored ETag
+    try:
+        baseline = fetch_baseline(location, hourly, url)
+    except Exception as e:
+        raise RuntimeError(f"Failed to fetch baseline data: {e}") from e
+    print(f"✅ Fetched {'hourly' if hourly else 'daily'} baseline data: {baseline.shape[0]} "
+          f"{'hours' if hourly else 'days'}")
+
+    # ====== 3. Convert daily to hourly data ======
+    report.begin("prepare")
+    baseline_hourly = prepare_hourly(baseline, hourly, system)
+    print(f"✅ Created hourly data: {baseline_hourly.shape[0]} hours")
+
+    # ====== 4. Feature engineering ======
+    print("⚙️ Engineering features...")
+    report.begin("features", rows=len(baseline_hourly))
+    # Panel specs default to the same 1.6 m² / 20% values the training pipeline uses
+    baseline_hourly = engineer_features(baseline_hourly, names=metadata['features'], store=FeatureStore())
+    print(f"✅ Feature engineering complete")
+
+    # ====== 5. Make predictions ======
+    print("🔮 Making ML predictions...")
+    stage = report.begin("predict")
+
+    # Get required features for the model
+    required_features = metadata['features']
+    available_features = [col for col in required_features if col in baseline_hourly.columns]
+    if len(available_features) < len(required_features):
+        print(f"⚠️ Warning: Only {len(available_features)}/{len(required_features)} features available")
+        print(f"Available: {available_features}")
+        print(f"Required: {required_features}")
+
+    # With true hourly input, night hours (no irradiance) produce nothing and skip the model
+    if hourly:
+        daylight = (baseline_hourly['ghi_w_m2'] > 0).to_numpy()
+    else:
+        daylight = np.ones(len(baseline_hourly), dtype=bool)
+    # Float32 matrix straight from the feature columns, no per-call DataFrame
+    mask = None if daylight.all() else daylight
+
+    residual = metadata.get('target') == 'residual'
+    predictions = np.zeros(len(baseline_hourly))
+    trees = None
+    if quantiles:
+        # Every tree's prediction for every hour; night hours stay 0 in all trees
+        trees = np.zeros((predictor.n_estimators, len(baseline_hourly)))
+    if daylight.any():
+        if trees is not None:
+            trees[:, daylight] = predictor.predict_trees(baseline_hourly, mask=mask)
+            if residual:
+                trees[:, daylight] += baseline_hourly.loc[daylight, 'physics_kwh'].to_numpy()
+            # The forest's point forecast is the mean over its trees
+            predictions = trees.mean(axis=0)
+        else:
+            predictions[daylight] = predictor.predict(baseline_hourly, mask=mask)
+            if residual:
+                # Residual model: served output is the physics estimate plus the learned correction
+                predictions[daylight] += baseline_hourly.loc[daylight, 'physics_kwh'].to_numpy()
+    baseline_hourly['predicted_ac_kwh'] = predictions
+    if trees is not None:
+        for band, values in quantile_bands(trees).items():
+            baseline_hourly[f'predicted_ac_kwh_{band}'] = values
+    print(f"✅ Generated {int(daylight.sum())} predictions ({int((~daylight).sum())} night hours skipped)")
+    stage.rows = int(daylight.sum())
+
+    # ====== 6. Generate aggregated forecasts ======
+    print("📊 Generating aggregated forecasts...")
+    report.begin("aggregate", rows=len(baseline_hourly))
+
+    # One pass: integer day/week/month codes, one bincount per rollup
+    tables = rollup(baseline_hourly['timestamp_utc'], baseline_hourly['predicted_ac_kwh'], tz=tz)
+    forecasts = {
+        'daily': tables['daily'].rename(columns={'period': 'Date'}),
+        'weekly': tables['weekly'].rename(columns={'period': 'timestamp_utc'}),
+        'monthly': tables['monthly'].rename(columns={'period': 'timestamp_utc'}),
+    }
+
+    # P10/P50/P90 of each period's total across trees
+    if trees is not None:
+        codes = calendar_codes(baseline_hourly['timestamp_utc'], tz=tz)
+        for name, forecast in forecasts.items():
+            key = 'Date' if name == 'daily' else 'timestamp_utc'
+            bands = aggregate_bands(trees, period_labels(name, codes[name]), name=f'{name}_predicted_ac_kwh')
+            bands = bands.drop(columns=f'{name}_predicted_ac_kwh').rename(columns={'period': key})
+            bands[key] = bands[key].astype(forecast[key].dtype)
+            forecasts[name] = forecast.merge(bands, on=key, how='left')
+
+    print(f"✅ Generated forecasts:")
+    print(f"   - Daily: {len(forecasts['daily'])} days")
+    print(f"   - Weekly: {len(forecasts['weekly'])} weeks")
+    print(f"   - Monthly: {len(forecasts['monthly'])} months")
+
+    # ====== 7. Generate summary statistics ======
+    print("📈 Generating summary statistics...")
+    report.begin("summary")
+
+    daily_kwh = forecasts['daily']['daily_predicted_ac_kwh']
+    summary = {
+        'prediction_date': datetime.now().isoformat(),
+        'forecast_period_days': len(forecasts['daily']),
+        'total_predicted_kwh': round(float(baseline_hourly['predicted_ac_kwh'].sum()), 2),
+        'daily_average_kwh': round(float(baseline_hourly['predicted_ac_kwh'].mean()) * 24, 2),  # hourly -> daily
+        'max_daily_kwh': round(float(daily_kwh.max()), 2),
+        'min_daily_kwh': round(float(daily_kwh.min()), 2),
+        'model_used': metadata.get('model_name'),
+        'model_performance': metadata.get('performance'),
+        'model': {'version': metadata.get('model_version'), 'training_date': metadata.get('training_date')},
+        'options': options,
+    }
+    if trees is not None:
+        total_bands = quantile_bands(trees.sum(axis=1, keepdims=True))
+        summary['total_predicted_kwh_quantiles'] = {band: round(float(v[0]), 2) for band, v in total_bands.items()}
+        summary['quantile_trees'] = int(trees.shape[0])
+
+    # ====== 8. Save results ======
+    print("💾 Saving results...")
+    report.begin("save")
+
+    # One compressed columnar run in the rolling store; engineered features are
+    # recomputable from the inputs, so only inputs and outputs are kept
+    hourly_columns = [col for col in baseline_hourly.columns
+                      if col in OUTPUT_COLUMNS or col.startswith('predicted_ac_kwh')]
+    store = OutputStore(store_root or STORE_DIR)
+    run = store.write_run(location, {'hourly': baseline_hourly[hourly_columns], **forecasts}, summary)
+    summary['run_id'] = run['run_id']
+    print(f"✅ Saved run {run['run_id']}: {run['path']} ({run['bytes'] / 1024:.1f} KiB in {run['seconds'] * 1000:.1f} ms)")
+
+    # Legacy CSV/JSON files only when asked for
+    if csv:
+        for path in store.export_csv(site_key(location), run['run_id']):
+            print(f"✅ Saved: {path}")
+        with open("prediction_summary.json", "w") as f:
+            json.dump(summary, f, indent=2)
+        print("✅ Saved: prediction_summary.json")
+
+    report.note(model_name=metadata.get('model_name'), run_id=run['run_id'], bytes_written=run['bytes'],
+                hourly=hourly, quantiles=trees is not None)
+    report.end()
+    return {'hourly': baseline_hourly, **forecasts, 'summary': summary, 'run': run}
@@ -0,0 +1,340 @@
+# Training pipeline: hourly telemetry + NASA POWER daily values -> features ->
+# time-series model search -> a published model registry version.
+#
+#   python -m solar_pipeline train [--smoke] [--residual]   (or merge2csv5.py)
+#   from solar_pipeline import train; result = train(smoke=True)
+#
+# pandas and scikit-learn are imported when train() runs, not on import.
+import time
+from datetime import datetime
+
+from instrumentation import RunReport
+
+TELEMETRY_PATH = "synthetic_solar_hourly.csv"
+NASA_PATH = "nasa_power_data.csv"
+
+
+def load_datasets(telemetry_path=TELEMETRY_PATH, nasa_path=NASA_PATH):
+    """(hourly telemetry, NASA daily) frames; writes dummy datasets when missing."""
+    import numpy as np
+    import pandas as pd
+
+    # Load synthetic solar data (hourly measurements)
+    try:
+        synthetic_data = pd.read_csv(telemetry_path)
+        print(f"✅ Loaded synthetic data: {synthetic_data.shape[0]} rows")
+    except FileNotFoundError:
+        print(f"❌ {telemetry_path} not found. Creating dummy dataset...")
+        # Create a simple dummy dataset if file doesn't exist
+        dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='h')
+        synthetic_data = pd.DataFrame({
+            'timestamp_utc': dates,
+            'measured_ac_kwh': np.random.uniform(0, 5, len(dates)),
+            'ghi_w_m2': np.random.uniform(0, 1000, len(dates)),
+            'temperature_C': np.random.uniform(10, 35, len(dates)),
+            'tilt_deg': np.random.choice([20, 25, 30, 35], len(dates)),
+            'azimuth_deg': np.random.choice([170, 180, 190], len(dates)),
+            'num_panels': np.random.choice([15, 20, 25, 30], len(dates))
+        })
+        synthetic_data.to_csv(telemetry_path, index=False)
+        print(f"✅ Created dummy synthetic data: {synthetic_data.shape[0]} rows")
+
+    # Load NASA power data (daily)
+    try:
+        nasa_data = pd.read_csv(nasa_path)
+        print(f"✅ Loaded NASA data: {nasa_data.shape[0]} rows")
+    except FileNotFoundError:
+        print(f"❌ {nasa_path} not found. Creating dummy dataset...")
+        # Create dummy NASA data
+        dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='D')
+        nasa_data = pd.DataFrame({
+            'Date': dates.strftime('%Y%m%d'),
+            'Solar_Radiation': np.random.uniform(15, 25, len(dates)),
+            'Temperature': np.random.uniform(15, 30, len(dates))
+        })
+        nasa_data.to_csv(nasa_path, index=False)
+        print(f"✅ Created dummy NASA data: {nasa_data.shape[0]} rows")
+    return synthetic_data, nasa_data
+
+
+def sample_prediction(model, features, residual=False):
+    """Predict one representative midday hour with every feature the model uses."""
+    import pandas as pd
+
+    from physics_model import hourly_energy
+
+    sample_data = {
+        'ghi_w_m2': [500],
+        'temperature_C': [25],
+        'tilt_deg': [30],
+        'azimuth_deg': [180],
+        'num_panels': [20],
+        'hour': [12],
+        'day_of_year': [180],
+        'month': [6],
+        'is_weekend': [False],
+        'solar_elevation': [70],
+        'daylight_hours': [1],
+        'system_capacity': [6.4],
+        'tilt_efficiency': [0.8],
+        'poa_w_m2': [450]
+    }
+
+    # Add NASA features if they were used in training
+    if 'Solar_Radiation' in features:
+        sample_data['Solar_Radiation'] = [20]
+    if 'Temperature' in features:
+        sample_data['Temperature'] = [25]
+    if 'physics_kwh' in features:
+        sample_data['physics_kwh'] = list(hourly_energy([500], [25], num_panels=20, tilt_deg=30))
+
+    # Filter to available features
+    sample_input = pd.DataFrame(sample_data)[features]
+    prediction = model.predict(sample_input)[0]
+    if residual:
+        prediction += sample_data['physics_kwh'][0]
+    return float(prediction)
+
+
+def train(telemetry_path=TELEMETRY_PATH, nasa_path=NASA_PATH, smoke=False, search="grid", n_iter=8, jobs=None,
+          residual=False, compact=False, compact_budget=None, min_importance=None, family=None, registry=None,
+          report=None):
+    """Search, fit, evaluate and publish a model.
+
+    residual=True trains on measured - physics (server.js calculateHourlyEnergy)
+    for physics + ML serving. compact=True prunes low-importance features and
+    shrinks a RandomForest within compact_budget (validation R² lost, see
+    compaction.py). family restricts the search to one model family (quantile
+    bands and the flat forest export need a RandomForest). Returns {'model',
+    'metadata', 'version_dir'}.
+    """
+    import numpy as np
+    import pandas as pd
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+    from sklearn.model_selection import train_test_split
+
+    from features import FEATURE_SET_VERSION, FeatureStore, engineer_features, model_features
+    from incremental_train import watermarks_from
+    from model_registry import ModelRegistry
+    from model_selection import make_estimator, run_search
+    from spatial_join import NasaGrid, join_daily
+    from stream_train import Reservoir
+
+    report = report or RunReport("training", enabled=False)
+
+    # ====== 1. Load and prepare datasets ======
+    print("📊 Loading datasets...")
+    stage = report.begin("load")
+    synthetic_data, nasa_data = load_datasets(telemetry_path, nasa_path)
+    stage.rows = len(synthetic_data)
+
+    # ====== 2. Data preprocessing ======
+    print("🔧 Preprocessing data...")
+    stage = report.begin("merge")
+
+    # Convert timestamps
+    synthetic_data['timestamp_utc'] = pd.to_datetime(synthetic_data['timestamp_utc'])
+
+    # Each system reads the daily values of its nearest NASA POWER site (one
+    # KD-tree lookup per system, then a (site, day) gather); a NASA file
+    # without lat/lon is one series for every system
+    merged_data, join_stats = join_daily(synthetic_data, NasaGrid(nasa_data))
+    if join_stats['max_km'] is not None:
+        print(f"🌍 {join_stats['systems']} systems -> {join_stats['sites_used']}/{join_stats['sites']} NASA sites "
+              f"(farthest {join_stats['max_km']:.1f} km)")
+    if join_stats['unmatched_rows']:
+        print(f"⚠️ {join_stats['unmatched_rows']} of {join_stats['rows']} telemetry rows have no NASA day; dropped")
+
+    print(f"✅ Merged dataset shape: {merged_data.shape}")
+    stage.rows = len(merged_data)
+
+    # ====== 3. Feature engineering ======
+    print("⚙️ Engineering features...")
+    stage = report.begin("features", rows=len(merged_data))
+
+    feature_store = FeatureStore()
+    merged_data = engineer_features(merged_data, store=feature_store)
+    print(f"✅ Feature cache: {feature_store.hits} hits, {feature_store.misses} misses")
+    print(f"✅ Feature engineering complete. Features: {list(merged_data.columns)}")
+
+    # ====== 4. Prepare training data ======
+    print("📋 Preparing training data...")
+    stage = report.begin("prepare", rows=len(merged_data))
+
+    # Define feature columns (NASA features are included when present)
+    feature_cols = model_features(merged_data.columns)
+    if residual:
+        # The physics estimate is both the baseline and an input of the residual model
+        feature_cols = feature_cols + ['physics_kwh']
+
+    # Filter available features
+    available_features = [col for col in feature_cols if col in merged_data.columns]
+    print(f"Available features for training: {available_features}")
+
+    # Check if we have the target variable
+    if 'measured_ac_kwh' not in merged_data.columns:
+        raise ValueError("Target variable 'measured_ac_kwh' not found in data")
+
+    X = merged_data[available_features]
+    y = merged_data['measured_ac_kwh']
+    if residual:
+        y = y - merged_data['physics_kwh']
+        print(f"✅ Residual target: measured - physics (physics MAE {mean_absolute_error(merged_data['measured_ac_kwh'], merged_data['physics_kwh']):.4f})")
+
+    print(f"✅ Training features: {available_features}")
+    print(f"✅ Training samples: {X.shape[0]}")
+
+    # ====== 5. Model selection ======
+    print("🤖 Searching models...")
+
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    stage = report.begin("search", rows=len(X_train))
+
+    # Cross-validate every candidate on time-ordered folds of the training split
+    search_mode = "smoke" if smoke else "full"
+    search_started = time.perf_counter()
+    leaderboard = run_search(
+        X_train.to_numpy(dtype=float), y_train.to_numpy(dtype=float),
+        merged_data.loc[X_train.index, 'timestamp_utc'].to_numpy(),
+        mode=search_mode, search=search, n_iter=n_iter, n_jobs=jobs, seed=42,
+        families=[family] if family else None,
+    )
+    search_seconds = time.perf_counter() - search_started
+
+    print(f"🏁 Leaderboard ({len(leaderboard)} candidates, {search_seconds:.1f}s):")
+    for row in leaderboard[:5]:
+        print(f"   {row['family']} {row['params']} - CV R²: {row['cv_r2_mean']:.4f} ± {row['cv_r2_std']:.4f} ({row['fit_seconds']:.2f}s)")
+
+    # ====== 6. Model evaluation ======
+    print("📈 Evaluating best model...")
+
+    stage = report.begin("fit", rows=len(X_train))
+    best = leaderboard[0]
+    model_name = best['family']
+    model = make_estimator(model_name, best['params'], seed=42)
+    if model_name == "RandomForest":
+        model.set_params(n_jobs=-1)
+    model.fit(X_train, y_train)
+
+    stage = report.begin("evaluate", rows=len(X_test))
+    best_pred = model.predict(X_test)
+    if residual:
+        # Score the served output (physics + ML) against the measured energy
+        best_pred = best_pred + X_test['physics_kwh'].to_numpy()
+        y_test = y_test + X_test['physics_kwh']
+    best_mae = mean_absolute_error(y_test, best_pred)
+    best_mse = mean_squared_error(y_test, best_pred)
+    best_r2 = r2_score(y_test, best_pred)
+    print(f"🏆 Selected {model_name} {best['params']} - MAE: {best_mae:.4f}, MSE: {best_mse:.4f}, R²: {best_r2:.4f}")
+    model_params = best['params']
+
+    # ====== 6b. Compaction ======
+    compaction = None
+    if compact and model_name == "RandomForest":
+        from compaction import BUDGET_R2, MIN_IMPORTANCE, compact_forest
+
+        print("🗜️ Compacting model...")
+        stage = report.begin("compact", rows=len(X_train))
+        # Candidates are compared on a validation slice of the training split
+        result = compact_forest(
+            model, X_train, y_train, X_test, y_test, available_features,
+            budget=BUDGET_R2 if compact_budget is None else compact_budget,
+            min_importance=MIN_IMPORTANCE if min_importance is None else min_importance,
+            keep=['physics_kwh'] if residual else (), offset_column='physics_kwh' if residual else None,
+        )
+        compaction = result['report']
+        for row in compaction['candidates']:
+            print(f"   {row['n_estimators']} trees, depth {row['max_depth']}: validation R² {row['r2']:.4f}, "
+                  f"{row['rows_per_s']:,} rows/s, {row['nodes']:,} nodes")
+        if compaction['compacted']:
+            model, available_features = result['model'], result['features']
+            model_params = {**model_params, **result['params']}
+            X_train, X_test = X_train[available_features], X_test[available_features]
+            best_pred = model.predict(X_test)
+            if residual:
+                best_pred = best_pred + X_test['physics_kwh'].to_numpy()
+            best_mae = mean_absolute_error(y_test, best_pred)
+            best_mse = mean_squared_error(y_test, best_pred)
+            best_r2 = r2_score(y_test, best_pred)
+            print(f"✅ Compacted to {model_params['n_estimators']} trees, depth {model_params['max_depth']}, "
+                  f"{len(available_features)} features (dropped {compaction['dropped_features']}) - "
+                  f"R²: {best_r2:.4f}, {compaction['speedup']}x rows/s, {compaction['size_ratio']:.0%} of the size")
+        else:
+            print(f"⚠️ No smaller forest within the R² budget; keeping the full model")
+    elif compact:
+        print(f"⚠️ Compaction needs a RandomForest; keeping {model_name}")
+
+    # ====== 7. Save model and metadata ======
+    print("💾 Saving model...")
+    stage = report.begin("save")
+
+    registry = registry or ModelRegistry()
+
+    # Save model metadata
+    model_metadata = {
+        'model_name': model_name,
+        'model_version': registry.next_version(),
+        'features': available_features,
+        'feature_set_version': FEATURE_SET_VERSION,
+        'target': 'residual' if residual else 'measured_ac_kwh',
+        'training_date': datetime.now().isoformat(),
+        'training_mode': 'full',
+        # Latest telemetry per system; `train --incremental` trains past these
+        'watermarks': watermarks_from(merged_data),
+        'training_samples': len(X_train),
+        'test_samples': len(X_test),
+        'performance': {
+            'mae': float(best_mae),
+            'mse': float(best_mse),
+            'r2': float(best_r2)
+        },
+        'model_params': model_params,
+        'model_selection': {
+            'mode': search_mode,
+            'search': search,
+            'families': [family] if family else None,
+            'cv': 'time_series',
+            'seconds': round(search_seconds, 3),
+            'leaderboard': leaderboard
+        },
+        'feature_importance': {}
+    }
+    if compaction is not None:
+        # Accuracy/latency of every forest tried against the full model
+        model_metadata['compaction'] = compaction
+
+    # Add feature importance for tree models that expose it
+    if hasattr(model, 'feature_importances_'):
+        feature_importance = dict(zip(available_features, model.feature_importances_))
+        model_metadata['feature_importance'] = feature_importance
+        print("🔍 Top 5 most important features:")
+        for feature, importance in sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)[:5]:
+            print(f"   {feature}: {importance:.4f}")
+
+    # Replay sample of the training rows, mixed into later incremental runs
+    replay = Reservoir(50_000, len(available_features), seed=42)
+    replay.add(X_train.to_numpy(dtype=np.float32), y_train.to_numpy(dtype=np.float32))
+
+    # Publish an immutable bundle (model, metadata, replay sample and, for a
+    # forest, the flat memory-mappable export) and make it the current version
+    version_dir = registry.publish(model, model_metadata, replay)
+
+    print("✅ Model training complete!")
+    print(f"📁 Saved files:")
+    print(f"   - trained_model.joblib (model)")
+    print(f"   - model_metadata.json (metadata)")
+    print(f"   - {version_dir}/ (version {model_metadata['model_version']})")
+    print(f"🎯 Model ready for production use!")
+
+    # ====== 8. Test model with sample prediction ======
+    print("🧪 Testing model with sample prediction...")
+    stage = report.begin("sample_prediction", rows=1)
+    prediction = sample_prediction(model, available_features, residual)
+    print(f"🔮 Sample prediction: {prediction:.4f} kWh")
+    print("✅ Model test successful!")
+
+    report.note(model_name=model_name, model_version=model_metadata['model_version'],
+                training_samples=len(X_train), features=len(available_features))
+    report.end()
+    return {'model': model, 'metadata': model_metadata, 'version_dir': version_dir}
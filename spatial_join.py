@@ -0,0 +1,177 @@
+# Spatial join of hourly fleet telemetry to daily NASA POWER values.
+# NASA POWER serves its meteorology on a 0.5° x 0.625° grid. NasaGrid takes
+# the daily values of every fetched site (nasa_power.py output: lat, lon,
+# Date, one column per parameter) and builds two things:
+#   - a KD-tree over the sites as unit vectors, so nearest means
+#     great-circle nearest, including across the dateline
+#   - one dense (site x day) array per parameter
+# join_daily maps each system_id to its nearest site once. Each telemetry
+# row then reads its (site, day) value with a single array gather, with no
+# merge on rounded coordinates. Rows with no NASA value for their day (or
+# with a site farther than max_km) are dropped and counted. When no row
+# matches, ValueError names the date ranges instead of returning an empty
+# frame.
+#
+# A NASA file without lat/lon (nasa_power_data.csv) is one series, used for
+# every system, as before.
+#
+#   grid = NasaGrid(nasa_frame)                    # or NasaGrid.from_csv(path)
+#   merged, stats = join_daily(telemetry, grid, max_km=100)
+#   lats, lons = grid_cell(systems['lat'], systems['lon'])   # cells to fetch for a fleet
+import numpy as np
+import pandas as pd
+
+EARTH_KM = 6371.0
+CELL_LAT = 0.5
+CELL_LON = 0.625
+NASA_COLUMNS = ['Solar_Radiation', 'Temperature']
+
+
+def grid_cell(lat, lon):
+    """Center of the NASA POWER 0.5° x 0.625° cell holding each point."""
+    lat = np.clip(np.round(np.asarray(lat, dtype=float) / CELL_LAT) * CELL_LAT, -90.0, 90.0)
+    lon = np.round(np.asarray(lon, dtype=float) / CELL_LON) * CELL_LON
+    return lat, (lon + 180.0) % 360.0 - 180.0
+
+
+def _unit_vectors(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def day_keys(dates):
+    """Days since the epoch for datetimes or YYYYMMDD values."""
+    dates = pd.Series(dates)
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates.astype(str), format='%Y%m%d')
+    return dates.to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+class NasaGrid:
+    """Daily NASA POWER values as dense (site x day) arrays with a KD-tree over the sites."""
+
+    def __init__(self, nasa, columns=None):
+        columns = [col for col in (columns or NASA_COLUMNS) if col in nasa.columns]
+        if len(nasa) == 0:
+            raise ValueError("NASA POWER data is empty")
+        days = day_keys(nasa['Date'])
+        if 'lat' in nasa.columns and 'lon' in nasa.columns:
+            sites = pd.MultiIndex.from_arrays([nasa['lat'].astype(float), nasa['lon'].astype(float)])
+            codes, unique = sites.factorize()
+            self.lat = unique.get_level_values(0).to_numpy()
+            self.lon = unique.get_level_values(1).to_numpy()
+            from scipy.spatial import cKDTree
+
+            self.tree = cKDTree(_unit_vectors(self.lat, self.lon))
+        else:
+            # One unlocated series: every system reads it
+            codes = np.zeros(len(nasa), dtype=np.int64)
+            self.lat = self.lon = None
+            self.tree = None
+
+        self.columns = columns
+        self.n_sites = int(codes.max()) + 1
+        self.first_day = int(days.min())
+        self.n_days = int(days.max()) - self.first_day + 1
+        self.available = np.zeros((self.n_sites, self.n_days), dtype=bool)
+        self.available[codes, days - self.first_day] = True
+        self.values = {}
+        for col in columns:
+            values = nasa[col].to_numpy()
+            if values.dtype.kind != 'f':
+                values = values.astype(float)
+            table = np.full((self.n_sites, self.n_days), np.nan, dtype=values.dtype)
+            table[codes, days - self.first_day] = values
+            self.values[col] = table
+
+    @classmethod
+    def from_csv(cls, path, columns=None):
+        columns = columns or NASA_COLUMNS
+        return cls(pd.read_csv(path, dtype={'Date': 'string', **{col: 'float32' for col in columns}}), columns)
+
+    @property
+    def located(self):
+        return self.tree is not None
+
+    def date_range(self):
+        first = np.datetime64(self.first_day, 'D')
+        return str(first), str(first + self.n_days - 1)
+
+    def nearest(self, lat, lon):
+        """(site index, great-circle km) of the nearest site to each point."""
+        n = len(np.atleast_1d(lat))
+        if self.tree is None:
+            return np.zeros(n, dtype=np.int64), np.full(n, np.nan)
+        chord, site = self.tree.query(_unit_vectors(np.atleast_1d(lat), np.atleast_1d(lon)))
+        return site.astype(np.int64), 2 * EARTH_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+
+    def lookup(self, sites, days):
+        """({column: values}, matched) for each (site, day); site -1 never matches."""
+        pos = np.asarray(days, dtype=np.int64) - self.first_day
+        sites = np.asarray(sites, dtype=np.int64)
+        matched = (pos >= 0) & (pos < self.n_days) & (sites >= 0)
+        pos, sites = np.where(matched, pos, 0), np.where(matched, sites, 0)
+        matched &= self.available[sites, pos]
+        return {col: table[sites, pos] for col, table in self.values.items()}, matched
+
+
+def nearest_sites(grid, codes, lat=None, lon=None, max_km=None):
+    """(site per row, km per system) with the nearest site looked up once per system code.
+
+    codes are 0..k-1 system codes per row (pd.factorize); a system farther
+    than max_km gets site -1.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    if not grid.located or lat is None or lon is None:
+        if grid.n_sites > 1:
+            raise ValueError(f"Telemetry has no lat/lon to choose among {grid.n_sites} NASA POWER sites")
+        return np.zeros(len(codes), dtype=np.int64), None
+    # Factorized codes are numbered in order of first appearance
+    _, first = np.unique(codes, return_index=True)
+    site_of, km = grid.nearest(np.asarray(lat)[first], np.asarray(lon)[first])
+    if max_km is not None:
+        site_of = np.where(km > max_km, -1, site_of)
+    return site_of[codes], km
+
+
+def join_daily(telemetry, grid, max_km=None, suffix='_nasa'):
+    """Hourly telemetry rows joined to their nearest site's daily values; returns (frame, stats).
+
+    Rows without a NASA value are dropped. Raises ValueError when none match.
+    """
+    n = len(telemetry)
+    has_coords = 'lat' in telemetry.columns and 'lon' in telemetry.columns
+    if 'system_id' in telemetry.columns:
+        codes, _ = pd.factorize(telemetry['system_id'])
+    elif has_coords:
+        codes, _ = pd.MultiIndex.from_arrays([telemetry['lat'], telemetry['lon']]).factorize()
+    else:
+        codes = np.zeros(n, dtype=np.int64)
+    lat = telemetry['lat'].to_numpy() if has_coords else None
+    lon = telemetry['lon'].to_numpy() if has_coords else None
+    sites, km = nearest_sites(grid, codes, lat, lon, max_km)
+    days = pd.to_datetime(telemetry['timestamp_utc']).to_numpy(dtype='datetime64[D]').astype(np.int64)
+    values, matched = grid.lookup(sites, days)
+
+    stats = {
+        'systems': int(codes.max()) + 1 if n else 0,
+        'sites': grid.n_sites,
+        'sites_used': int(len(np.unique(sites[matched]))),
+        'max_km': round(float(km.max()), 3) if km is not None and len(km) else None,
+        'systems_beyond_max_km': int((km > max_km).sum()) if km is not None and max_km is not None else 0,
+        'rows': n,
+        'matched_rows': int(matched.sum()),
+        'unmatched_rows': int(n - matched.sum()),
+    }
+    if n and not matched.any():
+        first, last = np.datetime64(int(days.min()), 'D'), np.datetime64(int(days.max()), 'D')
+        nasa_first, nasa_last = grid.date_range()
+        beyond = f", {stats['systems_beyond_max_km']} system(s) beyond {max_km} km" if max_km is not None else ""
+        raise ValueError(f"No telemetry row has NASA POWER data: telemetry covers {first}..{last}, "
+                         f"NASA {nasa_first}..{nasa_last} at {grid.n_sites} site(s){beyond}")
+
+    joined = telemetry.copy() if matched.all() else telemetry.loc[matched].copy()
+    for col, column_values in values.items():
+        joined[col + suffix if col in telemetry.columns else col] = column_values[matched]
+    return joined, stats
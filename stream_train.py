@@ -0,0 +1,277 @@
+# Streaming, bounded-memory training mode for merge2csv5.py.
+#
+#   python merge2csv5.py --stream [--chunk-rows 500000] [--learner sgd|hgb]
+#
+# Telemetry is read in chunks with explicit dtypes; each row gets the daily
+# NASA POWER values of its nearest NASA site by integer date key
+# (spatial_join.py: no hourly copy, no full merge), and features are built
+# per chunk. The merged frame never exists in full:
+#   sgd - StandardScaler + SGDRegressor updated with partial_fit per chunk
+#   hgb - HistGradientBoostingRegressor fit on a bounded reservoir sample
+# A bounded reservoir of held-out rows is kept for evaluation, and peak
+# memory is reported and recorded in the metadata. The model is published
+# as a new model registry version (model_registry.py) and made current,
+# with the target and per-system watermarks (latest timestamp_utc streamed)
+# that `--incremental` trains past.
+import argparse
+import resource
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURE_SET_VERSION, compute_features, model_features
+from model_registry import VERSIONS_DIR, ModelRegistry
+from spatial_join import NasaGrid, nearest_sites
+
+TELEMETRY_PATH = "synthetic_solar_hourly.csv"
+NASA_PATH = "nasa_power_data.csv"
+TELEMETRY_DTYPES = {
+    'system_id': 'string',
+    'timestamp_utc': 'string',
+    'lat': 'float32',
+    'lon': 'float32',
+    'num_panels': 'int16',
+    'panel_area_m2': 'float32',
+    'panel_efficiency': 'float32',
+    'inverter_efficiency': 'float32',
+    'inverter_max_ac_kw': 'float32',
+    'tilt_deg': 'float32',
+    'azimuth_deg': 'float32',
+    'ghi_w_m2': 'float32',
+    'temperature_C': 'float32',
+    'measured_ac_kwh': 'float32',
+}
+TARGET = 'measured_ac_kwh'
+HOLDOUT_EVERY = 5  # every 5th row is held out, like the 80/20 split
+
+
+def load_nasa_daily(path=NASA_PATH):
+    # Daily NASA values as dense (site, day) arrays; sites carry lat/lon when the file has them
+    return NasaGrid.from_csv(path)
+
+
+def join_daily(columns, nasa):
+    # Inner join of hourly rows to their nearest NASA site's value for the calendar date
+    days = columns['timestamp_utc'].astype('datetime64[D]').astype(np.int64)
+    lat, lon = columns.get('lat'), columns.get('lon')
+    if lat is not None and lon is not None:
+        codes, _ = pd.MultiIndex.from_arrays([lat, lon]).factorize()
+    else:
+        codes = np.zeros(len(days), dtype=np.int64)
+    sites, _ = nearest_sites(nasa, codes, lat, lon)
+    nasa_columns, matched = nasa.lookup(sites, days)
+    joined = {name: values[matched] for name, values in columns.items()}
+    for name, values in nasa_columns.items():
+        joined[name] = values[matched]
+    return joined
+
+
+class Reservoir:
+    """Fixed-size uniform sample of rows seen so far (Algorithm R, vectorized per chunk)."""
+
+    def __init__(self, capacity, n_features, seed=42):
+        self.X = np.empty((capacity, n_features), dtype=np.float32)
+        self.y = np.empty(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def size(self):
+        return min(self.seen, self.capacity)
+
+    def add(self, X, y):
+        n = len(X)
+        fill = max(0, min(self.capacity - self.seen, n))
+        self.X[self.seen:self.seen + fill] = X[:fill]
+        self.y[self.seen:self.seen + fill] = y[:fill]
+        if fill < n:
+            # Row i (global index t) replaces a random slot with probability capacity / (t + 1)
+            t = self.seen + np.arange(fill, n)
+            slots = (self.rng.random(n - fill) * (t + 1)).astype(np.int64)
+            keep = slots < self.capacity
+            self.X[slots[keep]] = X[fill:][keep]
+            self.y[slots[keep]] = y[fill:][keep]
+        self.seen += n
+
+
+def advance_watermarks(watermarks, system_ids, timestamps):
+    """Move per-system watermarks (system_id -> datetime64[ns]) up to the given rows."""
+    if len(system_ids) == 0:
+        return watermarks
+    latest = pd.Series(timestamps).groupby(system_ids).max()
+    for sid, ts in latest.items():
+        ts = np.datetime64(ts, 'ns')
+        watermarks[sid] = max(watermarks.get(sid, ts), ts)
+    return watermarks
+
+
+def iter_chunks(path, chunk_rows, nasa, features, row_filter=None, target=TARGET, watermarks=None):
+    """(X, y, row_id) per chunk; row_filter(chunk) -> bool mask selects rows to keep.
+
+    With a watermarks dict, the latest timestamp of every system's yielded rows is tracked in it.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [col for col in TELEMETRY_DTYPES if col in header]
+    dtypes = {col: TELEMETRY_DTYPES[col] for col in usecols}
+    offset = 0
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunk_rows):
+        chunk.index = np.arange(offset, offset + len(chunk))
+        offset += len(chunk)
+        if row_filter is not None:
+            chunk = chunk[row_filter(chunk)]
+            if chunk.empty:
+                continue
+        columns = {col: chunk[col].to_numpy() for col in usecols if col not in ('system_id', 'timestamp_utc')}
+        columns['timestamp_utc'] = pd.to_datetime(chunk['timestamp_utc']).to_numpy(dtype='datetime64[ns]')
+        columns['row_id'] = chunk.index.to_numpy()
+        if watermarks is not None and 'system_id' in chunk.columns:
+            columns['system_id'] = chunk['system_id'].to_numpy(dtype=object)
+
+        columns = join_daily(columns, nasa)
+        columns.update(compute_features(columns, features))
+        X = np.column_stack([np.asarray(columns[col], dtype=np.float32) for col in features])
+        y = np.asarray(columns[TARGET], dtype=np.float32)
+        if target == 'residual':
+            y = y - np.asarray(columns['physics_kwh'], dtype=np.float32)
+        valid = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+        if 'system_id' in columns:
+            advance_watermarks(watermarks, columns['system_id'][valid], columns['timestamp_utc'][valid])
+        yield X[valid], y[valid], columns['row_id'][valid]
+
+
+def peak_memory_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def train_streaming(path=TELEMETRY_PATH, nasa_path=NASA_PATH, chunk_rows=500_000, learner='sgd',
+                    sample_rows=1_000_000, holdout_rows=200_000, epochs=1, seed=42):
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from sklearn.linear_model import SGDRegressor
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    nasa = load_nasa_daily(nasa_path)
+    header = pd.read_csv(path, nrows=0).columns
+    features = model_features(list(header) + ['Solar_Radiation', 'Temperature'])
+
+    holdout = Reservoir(holdout_rows, len(features), seed)
+    sample = Reservoir(sample_rows, len(features), seed + 1) if learner == 'hgb' else None
+    scaler = StandardScaler()
+    regressor = SGDRegressor(learning_rate='adaptive', eta0=0.01, random_state=seed)
+    rows_seen = train_rows = 0
+    chunks = 0
+    watermarks = {}
+
+    for epoch in range(epochs if learner == 'sgd' else 1):
+        for X, y, row_id in iter_chunks(path, chunk_rows, nasa, features,
+                                        watermarks=watermarks if epoch == 0 else None):
+            is_holdout = row_id % HOLDOUT_EVERY == 0
+            if epoch == 0:
+                holdout.add(X[is_holdout], y[is_holdout])
+                rows_seen += len(X)
+                train_rows += int((~is_holdout).sum())
+                chunks += 1
+            X_train, y_train = X[~is_holdout], y[~is_holdout]
+            if len(X_train) == 0:
+                continue
+            if learner == 'sgd':
+                if epoch == 0:
+                    scaler.partial_fit(X_train)
+                regressor.partial_fit(scaler.transform(X_train), y_train)
+            else:
+                sample.add(X_train, y_train)
+
+    if learner == 'sgd':
+        model = Pipeline([('scaler', scaler), ('regressor', regressor)])
+        model_name = "SGDRegressor"
+    else:
+        model = HistGradientBoostingRegressor(max_iter=200, random_state=seed)
+        model.fit(pd.DataFrame(sample.X[:sample.size], columns=features), sample.y[:sample.size])
+        model_name = "HistGradientBoosting"
+
+    X_test = pd.DataFrame(holdout.X[:holdout.size], columns=features)
+    y_test = holdout.y[:holdout.size]
+    y_pred = model.predict(X_test)
+    performance = {
+        'mae': float(mean_absolute_error(y_test, y_pred)),
+        'mse': float(mean_squared_error(y_test, y_pred)),
+        'r2': float(r2_score(y_test, y_pred)),
+    }
+    stats = {
+        'rows_seen': rows_seen,
+        'train_rows': train_rows,
+        'chunks': chunks,
+        'sample_rows': sample.size if sample is not None else None,
+        # Same ISO strings as incremental_train.watermarks_from
+        'watermarks': {str(sid): pd.Timestamp(ts).isoformat() for sid, ts in sorted(watermarks.items())},
+    }
+    return model, model_name, features, performance, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming, bounded-memory training")
+    parser.add_argument("--telemetry", default=TELEMETRY_PATH)
+    parser.add_argument("--nasa", default=NASA_PATH)
+    parser.add_argument("--chunk-rows", type=int, default=500_000)
+    parser.add_argument("--learner", choices=["sgd", "hgb"], default="sgd")
+    parser.add_argument("--sample-rows", type=int, default=1_000_000,
+                        help="Reservoir size for the hgb learner")
+    parser.add_argument("--holdout-rows", type=int, default=200_000)
+    parser.add_argument("--epochs", type=int, default=1, help="Passes over the telemetry (sgd only)")
+    parser.add_argument("--versions-dir", default=VERSIONS_DIR)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    print("🚀 Starting streaming ML training...")
+    tracemalloc.start()
+    started = time.perf_counter()
+    model, model_name, features, performance, stats = train_streaming(
+        args.telemetry, args.nasa, args.chunk_rows, args.learner,
+        args.sample_rows, args.holdout_rows, args.epochs, args.seed,
+    )
+    elapsed = time.perf_counter() - started
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"✅ Streamed {stats['rows_seen']} rows in {stats['chunks']} chunks ({elapsed:.1f}s)")
+    print(f"🤖 {model_name} - MAE: {performance['mae']:.4f}, MSE: {performance['mse']:.4f}, R²: {performance['r2']:.4f}")
+    print(f"🧠 Peak memory: {peak_memory_mb():.1f} MB RSS, {traced_peak / 2**20:.1f} MB traced allocations")
+
+    registry = ModelRegistry(args.versions_dir)
+    watermarks = stats.pop('watermarks')
+    model_metadata = {
+        'model_name': model_name,
+        'model_version': registry.next_version(),
+        'features': features,
+        'feature_set_version': FEATURE_SET_VERSION,
+        'target': TARGET,
+        'training_date': datetime.now().isoformat(),
+        'training_mode': 'streaming',
+        # Latest telemetry per system; `train --incremental` trains past these
+        'watermarks': watermarks,
+        'training_samples': stats['train_rows'],
+        'test_samples': min(stats['rows_seen'] - stats['train_rows'], args.holdout_rows),
+        'performance': performance,
+        'feature_importance': {},
+        'streaming': {
+            **stats,
+            'chunk_rows': args.chunk_rows,
+            'seconds': round(elapsed, 3),
+            'peak_rss_mb': round(peak_memory_mb(), 1),
+            'peak_traced_mb': round(traced_peak / 2**20, 1),
+        },
+    }
+    # Immutable bundle + atomic CURRENT switch; serving and --incremental pick it up
+    version_dir = registry.publish(model, model_metadata, activate=True)
+    print(f"✅ Published model version {model_metadata['model_version']}: {version_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
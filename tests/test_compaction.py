@@ -0,0 +1,56 @@
+# Compaction chooses its forest without looking at the test set.
+import numpy as np
+import pandas as pd
+import pytest
+
+from compaction import compact_forest
+
+FEATURES = ['ghi_w_m2', 'physics_kwh', 'noise']
+
+
+@pytest.fixture(scope="module")
+def data():
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(5)
+    X = pd.DataFrame({'ghi_w_m2': rng.uniform(0, 1000, 800), 'physics_kwh': rng.uniform(0, 5, 800),
+                      'noise': rng.normal(size=800)})
+    y = X['ghi_w_m2'] * 0.004 + rng.normal(scale=0.05, size=800)
+    X_train, X_test, y_train, y_test = X[:600], X[600:], y[:600], y[600:]
+    model = RandomForestRegressor(n_estimators=16, max_depth=8, random_state=0).fit(X_train, y_train)
+    return model, X_train, y_train, X_test, y_test
+
+
+def test_selection_ignores_the_test_set(data):
+    model, X_train, y_train, X_test, y_test = data
+    result = compact_forest(model, X_train, y_train, X_test, y_test, FEATURES, budget=0.01)
+    scrambled = compact_forest(model, X_train, y_train, X_test, y_test.sample(frac=1, random_state=1),
+                               FEATURES, budget=0.01)
+    assert result['report']['compacted']
+    assert scrambled['params'] == result['params']
+    validation = [(row['n_estimators'], row['max_depth'], row['r2']) for row in result['report']['candidates']]
+    assert [(row['n_estimators'], row['max_depth'], row['r2'])
+            for row in scrambled['report']['candidates']] == validation
+    assert scrambled['report']['test']['r2'] < result['report']['test']['r2']
+
+
+def test_kept_forest_is_refit_on_the_training_split(data):
+    model, X_train, y_train, X_test, y_test = data
+    result = compact_forest(model, X_train, y_train, X_test, y_test, FEATURES, budget=0.01,
+                            min_importance=0.05)
+    report = result['report']
+    assert report['validation_rows'] == 120
+    assert 'noise' in report['dropped_features']
+    assert result['model'].n_features_in_ == len(result['features'])
+    assert result['model'].get_params()['n_estimators'] == result['params']['n_estimators']
+    assert report['test']['r2'] > 0.9
+    assert report['test']['nodes'] == sum(tree.tree_.node_count for tree in result['model'].estimators_)
+
+
+def test_offset_column_scores_on_the_served_scale(data):
+    model, X_train, y_train, X_test, y_test = data
+    served = y_test + X_test['physics_kwh']
+    result = compact_forest(model, X_train, y_train, X_test, served, FEATURES, budget=0.01,
+                            keep=['physics_kwh'], offset_column='physics_kwh')
+    assert 'physics_kwh' in result['features']
+    assert result['report']['test']['r2'] > 0.9
@@ -0,0 +1,48 @@
+# The flat memory-mapped forest predicts what the sklearn forest predicts.
+import numpy as np
+import pytest
+
+from forest_export import FlatForest, export_forest
+
+
+@pytest.fixture(scope="module")
+def forest():
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 5)).astype(np.float32)
+    y = X[:, 0] * 3 + np.sin(X[:, 1]) + rng.normal(scale=0.1, size=len(X))
+    model = RandomForestRegressor(n_estimators=12, max_depth=8, random_state=0).fit(X, y)
+    X_new = rng.normal(size=(300, 5)).astype(np.float32)
+    return model, X_new
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_predict_matches_sklearn(forest, tmp_path, mmap):
+    model, X = forest
+    flat = FlatForest(**export_forest(model, str(tmp_path / "forest.npy")), mmap=mmap)
+    assert flat.n_estimators == len(model.estimators_)
+    assert flat.n_features_in_ == X.shape[1]
+    np.testing.assert_allclose(flat.predict(X), model.predict(X))
+
+
+def test_per_tree_outputs_match_estimators(forest, tmp_path):
+    model, X = forest
+    flat = FlatForest(**export_forest(model, str(tmp_path / "forest.npy")))
+    expected = np.stack([tree.predict(X) for tree in model.estimators_])
+    # Blocks smaller than the input exercise the block boundaries
+    np.testing.assert_allclose(flat.predict_trees(X, block_rows=64), expected)
+
+
+def test_float64_input(forest, tmp_path):
+    model, X = forest
+    flat = FlatForest(**export_forest(model, str(tmp_path / "forest.npy")))
+    np.testing.assert_allclose(flat.predict(X.astype(np.float64)), model.predict(X))
+
+
+def test_rejects_non_forest(tmp_path):
+    from sklearn.linear_model import LinearRegression
+
+    model = LinearRegression().fit(np.eye(3), [1.0, 2.0, 3.0])
+    with pytest.raises(ValueError):
+        export_forest(model, str(tmp_path / "forest.npy"))
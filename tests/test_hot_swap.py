@@ -0,0 +1,139 @@
+# Hot swaps through the model registry while the prediction server is under load.
+import json
+import threading
+import time
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import FEATURE_SET_VERSION
+from model_registry import ModelRegistry
+from prediction_server import PredictionService, make_handler
+
+FEATURES = ['ghi_w_m2', 'temperature_C', 'tilt_deg', 'azimuth_deg', 'num_panels', 'hour', 'solar_elevation',
+            'tilt_efficiency', 'poa_w_m2']
+PAYLOAD = {
+    'site': {'lat': 37.77, 'lon': -122.42},
+    'system': {'tilt_deg': 30, 'azimuth_deg': 180, 'num_panels': 20},
+    'weather': {
+        'timestamp_utc': pd.date_range("2025-06-01", periods=48, freq="h").strftime('%Y-%m-%dT%H:%M:%S').tolist(),
+        'ghi_w_m2': [max(0.0, 900 * np.sin((h % 24 - 13) / 12 * np.pi)) for h in range(48)],
+        'temperature_C': [20.0] * 48,
+    },
+}
+
+
+def forest(n_estimators, seed):
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.uniform(0, 1, (200, len(FEATURES))), columns=FEATURES)
+    return RandomForestRegressor(n_estimators=n_estimators, max_depth=4, random_state=seed).fit(X, X.sum(axis=1))
+
+
+def metadata(**extra):
+    return {'model_name': 'RandomForest', 'features': FEATURES, 'feature_set_version': FEATURE_SET_VERSION,
+            'model_version': None, **extra}
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "model_versions"), sync_legacy=False)
+    registry.publish(forest(10, 1), metadata())
+    registry.publish(forest(5, 2), metadata())
+    return registry
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def test_hot_swap_under_load_drops_no_requests(registry):
+    service = PredictionService(registry=registry)
+    watcher = service.watch(interval=0.01)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/predict"
+    body = json.dumps(PAYLOAD).encode("utf-8")
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    answers, failures = [], []
+
+    def client():
+        while not stop.is_set():
+            try:
+                response = post(url, body)
+                with lock:
+                    answers.append((time.perf_counter(), response['model_version'], len(response['predicted_ac_kwh'])))
+            except Exception as e:
+                with lock:
+                    failures.append(repr(e))
+
+    clients = [threading.Thread(target=client) for _ in range(4)]
+    for thread in clients:
+        thread.start()
+    swap_seconds = []
+    try:
+        for target in [1, 2, 1, 2, 1, 2]:
+            activated = time.perf_counter()
+            registry.activate(target)
+            deadline = time.perf_counter() + 5
+            while watcher.version != target and time.perf_counter() < deadline:
+                time.sleep(0.001)
+            assert watcher.version == target
+            swap_seconds.append(watcher.last_swap_seconds)
+            # Requests keep being answered, by the new version, after the swap
+            while time.perf_counter() < deadline:
+                with lock:
+                    if any(t > activated and v == target for t, v, _ in answers):
+                        break
+                time.sleep(0.005)
+            else:
+                pytest.fail(f"No request answered by version {target} after activating it")
+    finally:
+        stop.set()
+        for thread in clients:
+            thread.join()
+        server.shutdown()
+        server.server_close()
+        watcher.stop()
+
+    assert failures == []
+    assert {v for _, v, _ in answers} == {1, 2}
+    assert all(n == 48 for _, _, n in answers)
+    assert service.swaps == 6
+    # Load + swap happens off the request path; it is bounded by a bundle load
+    assert max(swap_seconds) < 2.0
+
+
+def test_in_flight_request_keeps_its_snapshot(registry):
+    service = PredictionService(registry=registry)
+    assert service.state.version == 2
+    snapshot = service.state
+    model, meta = registry.load(1)
+    service.swap(model, meta)
+    assert service.state.version == 1
+    # The replaced snapshot is untouched and still predicts
+    assert snapshot.version == 2
+    assert len(snapshot.predictor.predict({name: np.ones(3) for name in FEATURES})) == 3
+
+
+def test_bad_bundle_keeps_the_current_model(registry):
+    service = PredictionService(registry=registry)
+    watcher = service.watch(interval=60)
+    try:
+        # Trained on feature set 1: refused at load, before any swap
+        registry.publish(forest(5, 3), metadata(feature_set_version=1))
+        with pytest.raises(ValueError):
+            watcher.check()
+        assert service.state.version == 2
+        assert service.swaps == 0
+    finally:
+        watcher.stop()
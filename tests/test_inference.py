@@ -0,0 +1,83 @@
+# Predictor: input dtype, feature checks and the array paths.
+import numpy as np
+import pandas as pd
+import pytest
+
+from inference import Predictor
+
+FEATURES = ['ghi_w_m2', 'solar_elevation', 'is_daylight']
+
+
+@pytest.fixture(scope="module")
+def training():
+    rng = np.random.default_rng(4)
+    X = pd.DataFrame({
+        'ghi_w_m2': rng.uniform(0, 1000, 300),
+        'solar_elevation': rng.uniform(0, 70, 300),
+        'is_daylight': rng.integers(0, 2, 300).astype(bool),
+    })
+    y = X['ghi_w_m2'] * 0.005 + X['solar_elevation'] * 0.01
+    return X, y.to_numpy()
+
+
+@pytest.fixture(scope="module")
+def forest(training):
+    from sklearn.ensemble import RandomForestRegressor
+
+    return RandomForestRegressor(n_estimators=8, random_state=0).fit(*training)
+
+
+@pytest.fixture(scope="module")
+def linear(training):
+    from sklearn.linear_model import LinearRegression
+
+    return LinearRegression().fit(*training)
+
+
+def test_dtype_follows_the_model(forest, linear):
+    assert Predictor(forest, FEATURES).dtype == np.float32
+    assert Predictor(linear, FEATURES).dtype == np.float64
+
+
+@pytest.mark.parametrize("name", ["forest", "linear"])
+def test_predictions_match_the_dataframe_path(request, training, name):
+    model = request.getfixturevalue(name)
+    X, _ = training
+    predictor = Predictor(model, FEATURES, chunk_rows=64)  # several chunks
+    expected = model.predict(X[FEATURES])
+    np.testing.assert_allclose(predictor.predict(X), expected)
+    np.testing.assert_allclose(predictor.predict_matrix(X.to_numpy(dtype=float)), expected)
+    mask = X['is_daylight'].to_numpy()
+    np.testing.assert_allclose(predictor.predict(X, mask=mask), expected[mask])
+
+
+def test_scalar_columns_broadcast(forest):
+    predictor = Predictor(forest, FEATURES)
+    columns = {'ghi_w_m2': np.array([100.0, 800.0]), 'solar_elevation': 45.0, 'is_daylight': True}
+    expected = forest.predict(pd.DataFrame({'ghi_w_m2': [100.0, 800.0], 'solar_elevation': [45.0, 45.0],
+                                            'is_daylight': [True, True]}))
+    np.testing.assert_allclose(predictor.predict(columns), expected)
+
+
+def test_missing_features_are_rejected(forest, training):
+    X, _ = training
+    with pytest.raises(ValueError, match=r"Missing model features: \['solar_elevation'\]"):
+        Predictor(forest, FEATURES).predict(X.drop(columns=['solar_elevation']))
+
+
+def test_feature_order_is_checked_at_load(forest):
+    with pytest.raises(ValueError, match="does not match metadata"):
+        Predictor(forest, list(reversed(FEATURES)))
+    with pytest.raises(ValueError, match="expects 3 features"):
+        Predictor(forest, FEATURES[:2])
+
+
+def test_stale_feature_set_is_rejected(forest):
+    with pytest.raises(ValueError, match="feature set v1"):
+        Predictor(forest, FEATURES, metadata={'feature_set_version': 1})
+    Predictor(forest, FEATURES, metadata={'feature_set_version': 2})
+
+
+def test_matrix_shape_is_checked(forest):
+    with pytest.raises(ValueError, match="Expected a"):
+        Predictor(forest, FEATURES).predict_matrix(np.zeros((4, 2)))
@@ -0,0 +1,46 @@
+# Missing NASA POWER days are only cached for good once the publication lag has passed.
+import calendar
+import sqlite3
+
+from nasa_power import FILL_VALUE, MISSING_TTL, PowerCache
+
+SITE = (40.0, -105.0)
+
+
+def epoch(day):
+    return calendar.timegm((int(day[:4]), int(day[4:6]), int(day[6:]), 12, 0, 0))
+
+
+def test_recent_missing_days_expire(tmp_path):
+    cache = PowerCache(str(tmp_path / "power.sqlite"))
+    fetched_at = epoch("20250612")
+    cache.store(*SITE, {'T2M': {'20250601': 21.5, '20250602': FILL_VALUE, '20250610': FILL_VALUE,
+                                '20250611': None}}, fetched_at=fetched_at)
+
+    fresh = cache.cached_dates(*SITE, 'T2M', 20250601, 20250611, now=fetched_at + 60)
+    assert fresh == {'20250601', '20250602', '20250610', '20250611'}
+    # Values and gaps older than the lag stay; recent gaps are requested again
+    stale = cache.cached_dates(*SITE, 'T2M', 20250601, 20250611, now=fetched_at + MISSING_TTL + 1)
+    assert stale == {'20250601', '20250602'}
+
+
+def test_refetch_replaces_missing_value(tmp_path):
+    cache = PowerCache(str(tmp_path / "power.sqlite"))
+    cache.store(*SITE, {'T2M': {'20250610': FILL_VALUE}}, fetched_at=epoch("20250612"))
+    cache.store(*SITE, {'T2M': {'20250610': 19.0}}, fetched_at=epoch("20250620"))
+    assert cache.load(*SITE, ['T2M'], 20250610, 20250610)['value'].tolist() == [19.0]
+    assert cache.cached_dates(*SITE, 'T2M', 20250610, 20250610) == {'20250610'}
+
+
+def test_cache_without_fetched_at_is_migrated(tmp_path):
+    path = str(tmp_path / "power.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE daily (lat REAL, lon REAL, parameter TEXT, date INTEGER, value REAL,"
+                 " PRIMARY KEY (lat, lon, parameter, date))")
+    conn.executemany("INSERT INTO daily VALUES (?, ?, ?, ?, ?)",
+                     [(*SITE, 'T2M', 20250601, 21.5), (*SITE, 'T2M', 20250602, None)])
+    conn.commit()
+    conn.close()
+
+    cache = PowerCache(path)
+    assert cache.cached_dates(*SITE, 'T2M', 20250601, 20250602) == {'20250601'}
@@ -0,0 +1,68 @@
+# physics_model.hourly_energy against calculateHourlyEnergy() in server.js.
+import json
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from physics_model import hourly_energy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE = os.path.join(ROOT, "fixtures", "physics", "calculate_hourly_energy.json")
+JS_RUNNER = os.path.join(ROOT, "benchmarks", "calculate_hourly_energy.mjs")
+JS_ARGS = {
+    'numPanels': 'num_panels', 'panelArea': 'panel_area', 'panelEfficiency': 'panel_efficiency',
+    'inverterEfficiency': 'inverter_efficiency', 'tiltDeg': 'tilt_deg', 'tempCoeff': 'temp_coeff',
+    'soilingFactor': 'soiling_factor', 'systemDerate': 'system_derate',
+    'inverterRatedPower': 'inverter_rated_power', 'noct': 'noct',
+}
+
+
+def load_cases():
+    with open(FIXTURE) as f:
+        return json.load(f)
+
+
+def column(cases, key):
+    return np.array([np.nan if case[key] is None else case[key] for case in cases], dtype=float)
+
+
+def python_energy(cases):
+    kwargs = {py: column(cases, js) for js, py in JS_ARGS.items()}
+    return hourly_energy(column(cases, 'ghi'), column(cases, 'tempC'), decimals=4, **kwargs)
+
+
+def test_matches_server_js_fixture():
+    cases = load_cases()
+    np.testing.assert_array_equal(python_energy(cases), column(cases, 'ac_kWh'))
+
+
+def test_fixture_covers_missing_inputs_and_clipping():
+    cases = load_cases()
+    assert any(case['ghi'] is None or case['tempC'] is None for case in cases)
+    assert any(case['inverterRatedPower'] for case in cases)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_matches_current_server_js():
+    # Re-evaluates the fixture inputs with the calculateHourlyEnergy in server.js today
+    cases = load_cases()
+    output = subprocess.run(["node", JS_RUNNER, os.path.join(ROOT, "server.js")], input=json.dumps(cases),
+                            capture_output=True, text=True, check=True).stdout
+    live = json.loads(output)
+    np.testing.assert_array_equal(python_energy(cases), column(live, 'ac_kWh'))
+
+
+def test_sites_by_hours_broadcast_matches_per_site_calls():
+    rng = np.random.default_rng(0)
+    ghi, temp = rng.uniform(0, 1000, 48), rng.uniform(-5, 40, 48)
+    num_panels = np.array([[10], [25], [40]])
+    tilt = np.array([[5.0], [30.0], [45.0]])
+    grid = hourly_energy(ghi, temp, num_panels=num_panels, tilt_deg=tilt, inverter_rated_power=4000.0)
+    assert grid.shape == (3, 48)
+    for i in range(3):
+        np.testing.assert_array_equal(
+            grid[i], hourly_energy(ghi, temp, num_panels=num_panels[i, 0], tilt_deg=tilt[i, 0],
+                                   inverter_rated_power=4000.0))
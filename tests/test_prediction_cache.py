@@ -0,0 +1,87 @@
+# Prediction cache keys and SQLite files shared between processes.
+import os
+
+import numpy as np
+import pandas as pd
+
+from batch_forecast import feature_columns
+from features import FEATURE_SET_VERSION
+from inference import Predictor
+from prediction_cache import CachedPredictor, PredictionCache, model_key
+
+FEATURES = ['ghi_w_m2', 'temperature_C', 'tilt_deg', 'azimuth_deg', 'num_panels', 'hour', 'solar_elevation',
+            'tilt_efficiency', 'poa_w_m2', 'physics_kwh']
+SITE = {'lat': 37.77, 'lon': -122.42, 'tilt_deg': 30, 'azimuth_deg': 180, 'num_panels': 20}
+
+
+def model():
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.uniform(0, 1, (200, len(FEATURES))), columns=FEATURES)
+    return RandomForestRegressor(n_estimators=5, max_depth=4, random_state=1).fit(X, X.sum(axis=1))
+
+
+def metadata(version):
+    return {'model_name': 'RandomForest', 'features': FEATURES, 'feature_set_version': FEATURE_SET_VERSION,
+            'model_version': version}
+
+
+def weather(noise=0.0):
+    hours = pd.date_range("2025-06-01", periods=48, freq="h")
+    ghi = np.array([max(0.0, 900 * np.sin((h % 24 - 13) / 12 * np.pi)) for h in range(48)]).round()
+    return pd.DataFrame({'timestamp_utc': hours, 'ghi_w_m2': ghi + noise, 'temperature_C': 20.0 + noise / 10})
+
+
+def cached_predictor(cache, version, forest=None):
+    meta = metadata(version)
+    return CachedPredictor(forest or model(), FEATURES, cache, model_key(meta, cache.resolution), metadata=meta)
+
+
+def test_rows_are_keyed_on_raw_inputs():
+    cache = PredictionCache(10_000)
+    forest = model()
+    predictor = cached_predictor(cache, 1, forest)
+    columns, _ = feature_columns([SITE], weather(), FEATURES)
+    first = predictor.predict(columns)
+    # Noise below the input resolution moves every derived feature but hits the same keys
+    jittered, _ = feature_columns([SITE], weather(noise=0.2), FEATURES)
+    assert not np.array_equal(jittered['physics_kwh'], columns['physics_kwh'])
+    second = predictor.predict(jittered)
+    assert cache.stats()['hits'] == len(first)
+    np.testing.assert_array_equal(first, second)
+    # Snapped inputs on the grid reproduce the uncached prediction exactly
+    np.testing.assert_allclose(first, Predictor(forest, FEATURES).predict(columns))
+
+
+def test_missing_inputs_skip_the_cache():
+    cache = PredictionCache(10_000)
+    predictor = cached_predictor(cache, 1)
+    columns, _ = feature_columns([SITE], weather(), FEATURES)
+    columns['temperature_C'] = columns['temperature_C'].copy()
+    columns['temperature_C'][:5] = np.nan
+    predictions = predictor.predict(columns)
+    assert np.isfinite(predictions).all()
+    assert cache.stats()['lookups'] == len(predictions) - 5
+
+
+def test_bind_keeps_other_processes_files(tmp_path):
+    first = PredictionCache(10_000, disk_dir=str(tmp_path))
+    second = PredictionCache(10_000, disk_dir=str(tmp_path))
+    cached_predictor(first, 1).predict(feature_columns([SITE], weather(), FEATURES)[0])
+    cached_predictor(second, 2)
+    assert len(os.listdir(tmp_path)) == 2
+
+    # The first process still reads and writes its own file
+    reopened = PredictionCache(10_000, disk_dir=str(tmp_path))
+    cached_predictor(reopened, 1).predict(feature_columns([SITE], weather(), FEATURES)[0])
+    assert reopened.stats()['disk_hits'] == 48
+
+
+def test_prune_removes_only_versions_before_the_retained_ones(tmp_path):
+    caches = [PredictionCache(10_000, disk_dir=str(tmp_path)) for _ in range(3)]
+    for version, cache in enumerate(caches, start=1):
+        cached_predictor(cache, version)
+    removed = caches[2].prune([2, 3])
+    assert [os.path.basename(path)[:17] for path in removed] == ["predictions-v0001"]
+    assert sorted(name[:17] for name in os.listdir(tmp_path)) == ["predictions-v0002", "predictions-v0003"]
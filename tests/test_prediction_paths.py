@@ -0,0 +1,50 @@
+# The prediction server and `predict --hourly` give the model the same inputs for the same weather.
+import os
+
+import numpy as np
+import pandas as pd
+
+from batch_forecast import feature_columns
+from features import engineer_features
+from prediction_server import PredictionService
+from solar_pipeline.prediction import prepare_hourly
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SITE = {'lat': 40.0, 'lon': -105.0}
+SYSTEM = {'tilt_deg': 25, 'azimuth_deg': 170, 'num_panels': 16}
+
+
+def hourly_weather():
+    hours = pd.date_range("2025-06-01", periods=72, freq="h")
+    ghi = np.clip(900 * np.sin((hours.hour.to_numpy() - 12) / 12 * np.pi), 0, None).round(1)
+    return pd.DataFrame({'timestamp_utc': hours, 'ghi_w_m2': ghi, 'temperature_C': 15 + hours.hour.to_numpy() / 4})
+
+
+def cli_frame(features):
+    baseline = hourly_weather().assign(**SITE)
+    return engineer_features(prepare_hourly(baseline, hourly=True, system=SYSTEM), names=features)
+
+
+def test_nasa_proxies_are_daily_values():
+    service_columns, _ = feature_columns([{**SITE, **SYSTEM}], hourly_weather(), ['Solar_Radiation', 'Temperature'])
+    weather = hourly_weather()
+    first_day = weather['timestamp_utc'] < "2025-06-02"
+    np.testing.assert_allclose(service_columns['Solar_Radiation'][:24], weather.loc[first_day, 'ghi_w_m2'].sum() / 1000)
+    np.testing.assert_allclose(service_columns['Temperature'][:24], weather.loc[first_day, 'temperature_C'].mean())
+
+
+def test_server_and_cli_agree():
+    service = PredictionService(os.path.join(ROOT, "trained_model.joblib"), os.path.join(ROOT, "model_metadata.json"))
+    features = service.features
+    frame = cli_frame(features)
+    columns, _ = feature_columns([{**SITE, **SYSTEM}], hourly_weather(), features)
+    for name in features:
+        np.testing.assert_allclose(np.asarray(columns[name], dtype=float), frame[name].to_numpy(dtype=float),
+                                   rtol=1e-6, err_msg=name)
+
+    weather = hourly_weather()
+    payload = {'timestamp_utc': weather['timestamp_utc'].dt.strftime('%Y-%m-%dT%H:%M:%S'),
+               'ghi_w_m2': weather['ghi_w_m2'], 'temperature_C': weather['temperature_C']}
+    served = service.predict(SITE, SYSTEM, payload)
+    cli = service.state.predictor.predict(frame)
+    np.testing.assert_allclose(served['predicted_ac_kwh'], np.round(cli, 4), atol=1e-4)
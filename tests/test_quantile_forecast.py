@@ -0,0 +1,52 @@
+# Quantile bands across the trees of a forest.
+import numpy as np
+import pytest
+
+from forest_export import FlatForest, export_forest
+from quantile_forecast import aggregate_bands, quantile_bands, tree_predictions
+
+
+@pytest.fixture(scope="module")
+def forest():
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(1)
+    X = rng.uniform(0, 1000, size=(500, 3)).astype(np.float32)
+    y = X[:, 0] * 0.004 + rng.normal(scale=0.3, size=len(X))
+    model = RandomForestRegressor(n_estimators=30, max_depth=6, random_state=0).fit(X, y)
+    return model, rng.uniform(0, 1000, size=(200, 3)).astype(np.float32)
+
+
+def test_bands_are_monotone_around_the_point_forecast(forest):
+    model, X = forest
+    trees = tree_predictions(model, X)
+    bands = quantile_bands(trees)
+    assert sorted(bands) == ['p10', 'p50', 'p90']
+    assert np.all(bands['p10'] <= bands['p50'])
+    assert np.all(bands['p50'] <= bands['p90'])
+    point = trees.mean(axis=0)
+    np.testing.assert_allclose(point, model.predict(X))
+    assert np.all((bands['p10'] <= point) & (point <= bands['p90']))
+
+
+def test_bands_match_np_quantile():
+    trees = np.random.default_rng(2).normal(size=(25, 40))
+    bands = quantile_bands(trees, (0.05, 0.5, 0.95))
+    for q in (0.05, 0.5, 0.95):
+        np.testing.assert_allclose(bands[f"p{int(round(q * 100))}"], np.quantile(trees, q, axis=0))
+
+
+def test_flat_forest_trees_match_sklearn(forest, tmp_path):
+    model, X = forest
+    flat = FlatForest(**export_forest(model, str(tmp_path / "forest.npy")))
+    np.testing.assert_allclose(tree_predictions(flat, X), tree_predictions(model, X))
+
+
+def test_period_bands_are_quantiles_of_tree_totals():
+    trees = np.random.default_rng(3).uniform(size=(20, 6))
+    frame = aggregate_bands(trees, ['b', 'a', 'b', 'a', 'b', 'a'])
+    assert frame['period'].tolist() == ['a', 'b']
+    totals_a = trees[:, [1, 3, 5]].sum(axis=1)
+    assert frame['predicted_ac_kwh'].iloc[0] == pytest.approx(totals_a.mean())
+    assert frame['predicted_ac_kwh_p90'].iloc[0] == pytest.approx(np.quantile(totals_a, 0.9))
+    assert np.all(frame['predicted_ac_kwh_p10'] <= frame['predicted_ac_kwh_p90'])
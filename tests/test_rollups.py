@@ -0,0 +1,32 @@
+# Calendar rollups keep their documented columns for empty forecasts.
+import numpy as np
+import pandas as pd
+import pytest
+
+from rollups import PERIODS, rollup
+
+HOURS = pd.Series(pd.date_range("2025-06-01", periods=72, freq="h"))
+
+
+@pytest.mark.parametrize("tz", [None, "America/Denver"])
+def test_empty_single_series(tz):
+    tables = rollup(HOURS[:0], np.zeros(0), tz=tz)
+    assert sorted(tables) == sorted(PERIODS)
+    for period in PERIODS:
+        assert list(tables[period].columns) == ['period', f'{period}_predicted_ac_kwh']
+        assert len(tables[period]) == 0
+
+
+def test_empty_fleet_matches_non_empty_layout():
+    full = rollup(HOURS, np.ones(len(HOURS)), ['a'] * len(HOURS))
+    empty = rollup(HOURS[:0], np.zeros(0), [])
+    assert sorted(empty) == sorted(full)
+    for name, frame in empty.items():
+        assert list(frame.columns) == list(full[name].columns)
+        assert len(frame) == 0
+        assert frame['period'].dtype.kind == 'M'
+
+
+def test_daily_totals():
+    tables = rollup(HOURS, np.ones(len(HOURS)))
+    assert tables['daily']['daily_predicted_ac_kwh'].tolist() == [24.0, 24.0, 24.0]
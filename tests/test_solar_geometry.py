@@ -0,0 +1,57 @@
+# Solar position against known values and the POA identities.
+import numpy as np
+import pandas as pd
+import pytest
+
+from solar_geometry import declination_and_eot, geometry_features, solar_position, time_arrays
+
+GREENWICH = (51.4769, -0.0005)
+
+
+def test_declination_at_solstices_and_equinox():
+    declination, _ = declination_and_eot(np.array([172, 355, 79]))
+    np.testing.assert_allclose(declination, [23.44, -23.44, 0.0], atol=0.5)
+
+
+def test_greenwich_summer_solstice_noon():
+    # 2025-06-21 12:00 UTC: the sun is within a few minutes of transit, elevation ~61.9°
+    day_of_year, hour = time_arrays(pd.to_datetime(["2025-06-21 12:00"]))
+    position = solar_position(day_of_year, hour, *GREENWICH)
+    assert position['elevation'][0] == pytest.approx(61.9, abs=0.2)
+    assert position['azimuth'][0] == pytest.approx(180.0, abs=2.0)
+
+
+def test_true_solar_noon_zenith_is_latitude_minus_declination():
+    lat, lon = 37.7749, -122.4194
+    day_of_year = np.arange(1, 366)
+    _, eot = declination_and_eot(day_of_year, 12 - lon / 15)
+    hour = 12 - lon / 15 - eot / 60  # UTC hour of transit
+    position = solar_position(day_of_year, hour, lat, lon)
+    np.testing.assert_allclose(position['hour_angle'], 0.0, atol=0.05)
+    np.testing.assert_allclose(position['zenith'], np.abs(lat - position['declination']), atol=0.05)
+    np.testing.assert_allclose(position['azimuth'], 180.0, atol=0.5)
+
+
+def test_morning_sun_is_east_and_evening_sun_west():
+    # Denver on the equinox: 15:00 UTC is 09:00 local, 23:00 UTC is 17:00 local
+    position = solar_position(79, np.array([15.0, 23.0]), 39.74, -104.99)
+    assert 60 < position['azimuth'][0] < 135
+    assert 225 < position['azimuth'][1] < 300
+    assert np.all(position['elevation'] > 0)
+
+
+def test_time_arrays_converts_aware_timestamps_to_utc():
+    aware = pd.to_datetime(["2025-06-21 05:30"]).tz_localize("America/Denver")
+    day_of_year, hour = time_arrays(aware)
+    assert day_of_year[0] == 172
+    assert hour[0] == pytest.approx(11.5)
+
+
+def test_flat_panel_poa_equals_ghi_in_daylight():
+    timestamps = pd.date_range("2025-06-21 16:00", periods=6, freq="h")  # Denver mid-day
+    ghi = np.array([500.0, 700.0, 850.0, 900.0, 850.0, 700.0])
+    features = geometry_features(timestamps, 39.74, -104.99, ghi, 0.0, 180.0)
+    np.testing.assert_allclose(features['poa_w_m2'], ghi, rtol=1e-6)
+    night = geometry_features(pd.to_datetime(["2025-06-21 08:00"]), 39.74, -104.99, [0.0], 30.0, 180.0)
+    assert night['solar_elevation'][0] == 0.0
+    assert night['poa_w_m2'][0] == 0.0
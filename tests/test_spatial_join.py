@@ -0,0 +1,67 @@
+# Nearest NASA POWER site lookup and the daily join.
+import numpy as np
+import pandas as pd
+import pytest
+
+from spatial_join import NasaGrid, grid_cell, join_daily, nearest_sites
+
+
+def nasa_frame(sites, dates=("20250601", "20250602")):
+    rows = [{'lat': lat, 'lon': lon, 'Date': date, 'Solar_Radiation': float(i), 'Temperature': 20.0 + i}
+            for i, (lat, lon) in enumerate(sites) for date in dates]
+    return pd.DataFrame(rows)
+
+
+def test_known_nearest_site():
+    # Denver, San Francisco, New York
+    grid = NasaGrid(nasa_frame([(39.75, -105.0), (37.75, -122.5), (40.75, -74.0)]))
+    codes = np.array([0, 0, 1, 2, 1])
+    lat = np.array([37.77, 37.77, 40.71, 39.74, 40.71])
+    lon = np.array([-122.42, -122.42, -74.01, -104.99, -74.01])
+    sites, km = nearest_sites(grid, codes, lat, lon)
+    assert sites.tolist() == [1, 1, 2, 0, 2]
+    assert len(km) == 3
+    assert np.all(km < 10)
+
+
+def test_nearest_across_the_antimeridian():
+    # Fiji-side point at 179.9°E is ~20 km from -179.9°E, ~40 000 km the long way round
+    grid = NasaGrid(nasa_frame([(-17.0, -179.9), (-17.0, 170.0)]))
+    sites, km = grid.nearest(-17.0, 179.9)
+    assert sites.tolist() == [0]
+    assert km[0] == pytest.approx(21.3, abs=0.5)
+
+
+def test_max_km_drops_far_systems():
+    grid = NasaGrid(nasa_frame([(39.75, -105.0)]))
+    sites, km = nearest_sites(grid, [0, 1], [39.74, 51.5], [-104.99, -0.12], max_km=100)
+    assert sites.tolist() == [0, -1]
+    assert km[1] > 7000
+
+
+def test_grid_cell_wraps_longitude():
+    lat, lon = grid_cell([37.77, -17.0], [-122.42, 179.9])
+    assert lat.tolist() == [38.0, -17.0]
+    assert lon.tolist() == [-122.5, -180.0]
+
+
+def test_join_daily_reads_the_nearest_site_per_day():
+    grid = NasaGrid(nasa_frame([(39.75, -105.0), (37.75, -122.5)]))
+    telemetry = pd.DataFrame({
+        'system_id': ['sf', 'den', 'sf'],
+        'lat': [37.77, 39.74, 37.77],
+        'lon': [-122.42, -104.99, -122.42],
+        'timestamp_utc': pd.to_datetime(['2025-06-01 12:00', '2025-06-02 12:00', '2025-06-05 12:00']),
+    })
+    joined, stats = join_daily(telemetry, grid)
+    assert joined['Solar_Radiation'].tolist() == [1.0, 0.0]
+    assert stats['unmatched_rows'] == 1
+    assert stats['sites_used'] == 2
+
+
+def test_join_daily_names_the_ranges_when_nothing_matches():
+    grid = NasaGrid(nasa_frame([(39.75, -105.0)]))
+    telemetry = pd.DataFrame({'lat': [39.74], 'lon': [-104.99],
+                              'timestamp_utc': pd.to_datetime(['2024-01-01'])})
+    with pytest.raises(ValueError, match="2025-06-01..2025-06-02"):
+        join_daily(telemetry, grid)
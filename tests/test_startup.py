@@ -0,0 +1,76 @@
+# The pipeline package imports and starts without the scientific stack.
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ['pandas', 'numpy', 'sklearn', 'scipy', 'requests', 'joblib', 'pyarrow']
+BUDGET_SECONDS = 1.0
+
+# Runs a CLI command in-process and reports which heavy modules it loaded
+LOADED = """
+import json, sys
+from solar_pipeline.cli import main
+try:
+    code = main(sys.argv[1:])
+except SystemExit as e:
+    code = e.code
+heavy = sorted({name.split('.')[0] for name in sys.modules} & set(%r))
+print(json.dumps({'code': code, 'heavy': heavy}))
+""" % HEAVY
+
+
+def run(args, **kwargs):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    return subprocess.run([sys.executable, *args], cwd=kwargs.pop('cwd', ROOT), env=env, capture_output=True,
+                          text=True, **kwargs)
+
+
+def heavy_modules(cli_args, cwd=ROOT):
+    result = run(["-c", LOADED, *cli_args], cwd=cwd)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_has_no_side_effects():
+    before = sorted(os.listdir(ROOT))
+    result = run(["-c", "import solar_pipeline, merge2csv5, finalcode3; "
+                        "import sys; print(sorted(m for m in sys.modules if m.split('.')[0] in %r))" % HEAVY])
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+    # Nothing trained or written on import
+    assert sorted(os.listdir(ROOT)) == before
+
+
+@pytest.mark.parametrize("cli_args", [["--help"], ["train", "--help"], ["predict", "--help"], ["fetch", "--help"]])
+def test_help_imports_no_heavy_modules(cli_args):
+    loaded = heavy_modules(cli_args)
+    assert loaded == {'code': 0, 'heavy': []}
+
+
+@pytest.mark.parametrize("command", [["-m", "solar_pipeline", "--help"], ["finalcode3.py", "--help"],
+                                     ["merge2csv5.py", "--help"]])
+def test_help_starts_within_budget(command):
+    run(command)  # warm the OS file cache
+    seconds = []
+    for _ in range(3):
+        started = time.perf_counter()
+        result = run(command)
+        seconds.append(time.perf_counter() - started)
+        assert result.returncode == 0, result.stderr
+    assert min(seconds) < BUDGET_SECONDS
+
+
+def test_cached_prediction_needs_no_heavy_modules(tmp_path):
+    from benchmarks.bench_startup import seed_store
+
+    store = str(tmp_path / "store")
+    seed_store(store)
+    result = run(["-m", "solar_pipeline", "predict", "--max-age", "3600", "--store", store])
+    assert result.returncode == 0, result.stderr
+    assert "Reusing run" in result.stdout
+    assert heavy_modules(["predict", "--max-age", "3600", "--store", store]) == {'code': 0, 'heavy': []}